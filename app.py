@@ -2,8 +2,13 @@
 
 import streamlit as st
 import pandas as pd
+import cards
+import queries
+import search_index
+from config import DASHBOARD_MODE, DASHBOARD_MAX_ROWS, DASHBOARD_CARDS, DASHBOARD_PAGE_SIZE
 from database import init_db_client
-from datetime import timedelta
+from filter_index import JobIndex
+from live_dataset import LiveDataset
 
 # --- Page Configuration: Must be the first Streamlit command ---
 st.set_page_config(
@@ -13,105 +18,234 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+PAGE_SIZE_OPTIONS = sorted({10, 25, 50, 100, DASHBOARD_PAGE_SIZE})
+
 # --- Caching: A critical performance feature ---
+# The client is created once per server process; query results are cached
+# briefly per (filters, page) so paging back and forth stays instant.
+@st.cache_resource
+def get_db_client():
+    return init_db_client()
+
+def clean_cards(df):
+    """Parses dates and fills/strips the text fields of a frame of job cards."""
+    if df.empty:
+        return df
+
+    # --- Data Cleaning and Standardization ---
+    df['published_date'] = pd.to_datetime(df['published_date'], errors='coerce', utc=True)
+    df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce', utc=True)
+    # Fill missing values and strip whitespace from text fields for reliable filtering
+    for col in ['job_role', 'experience_level', 'location', 'company', 'title']:
+        df[col] = df[col].fillna('Not Specified').str.strip()
+    return df
+
 @st.cache_data(ttl=600)
-def load_data():
-    """Connects to the database, fetches all jobs, and cleans the data."""
-    db_client = init_db_client()
+def load_page(role, experience, location, freshness, page, page_size):
+    """Fetches one page of job cards from the database ("server" mode)."""
+    db_client = get_db_client()
     if not db_client:
-        return pd.DataFrame() # Return empty on failure
-    
+        return None # Signal a connection failure
+
     try:
-        response = db_client.table('jobs').select('*').order('created_at', desc=True).limit(5000).execute()
-        df = pd.DataFrame(response.data)
-        
-        # --- Data Cleaning and Standardization ---
-        df['published_date'] = pd.to_datetime(df['published_date'], errors='coerce', utc=True)
-        df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce', utc=True)
-        # Fill missing values and strip whitespace from text fields for reliable filtering
-        for col in ['job_role', 'experience_level', 'location', 'company', 'description', 'title']:
-            df[col] = df[col].fillna('Not Specified').str.strip()
-        return df
+        return clean_cards(queries.cards_frame(queries.fetch_job_page(db_client, role, experience, location, freshness,
+                                                                      page=page, page_size=page_size)))
+    except Exception as e:
+        print(f"Data loading error: {e}")
+        return None
+
+# cache_resource hands back the same index object on every rerun instead of
+# copying it, which matters once it holds hundreds of thousands of rows.
+@st.cache_resource(ttl=600)
+def load_index():
+    """Loads every job card once per cache window and indexes it ("memory" mode)."""
+    db_client = get_db_client()
+    if not db_client:
+        return None
+
+    try:
+        df = clean_cards(queries.cards_frame(queries.fetch_all_cards(db_client, DASHBOARD_MAX_ROWS)))
+        return JobIndex(df) if not df.empty else None
     except Exception as e:
         print(f"Data loading error: {e}")
-        return pd.DataFrame()
+        return None
+
+# One dataset per server process, shared by every session and never
+# expired: it keeps itself current in a background thread.
+@st.cache_resource
+def load_live_dataset():
+    """Loads every job card once and starts the delta polls ("live" mode)."""
+    db_client = get_db_client()
+    if not db_client:
+        return None
+    return LiveDataset(db_client, prepare=clean_cards).start()
+
+@st.cache_data(ttl=600)
+def load_count(role, experience, location, freshness):
+    """Counts the jobs matching the filters without downloading them."""
+    db_client = get_db_client()
+    if not db_client:
+        return 0
+    try:
+        return queries.count_jobs(db_client, role, experience, location, freshness)
+    except Exception as e:
+        print(f"Count error: {e}")
+        return 0
+
+@st.cache_data(ttl=3600)
+def load_description(job_id):
+    """Fetches a job's description only when someone asks to read it."""
+    db_client = get_db_client()
+    if not db_client:
+        return None
+    try:
+        return queries.fetch_description(db_client, job_id)
+    except Exception as e:
+        print(f"Description loading error: {e}")
+        return None
+
+# One background sync per server process: the first (full) build of the
+# search index never runs inside someone's rerun.
+@st.cache_resource
+def start_search_index_sync():
+    """Starts keeping the local full-text index current in the background."""
+    db_client = get_db_client()
+    if not db_client:
+        return None
+    return search_index.BackgroundSync(db_client).start()
 
 # --- Initialize Session State for Pagination ---
 if 'page' not in st.session_state:
     st.session_state.page = 0
 
-# ====================================================================
-# --- Load Data First (Fixes the NameError bug) ---
-# ====================================================================
-# Use an animated spinner for a better loading experience
-with st.spinner("Fetching the latest jobs from the database..."):
-    main_df = load_data()
-
 # ====================================================================
 # --- Sidebar Filters ---
 # ====================================================================
+# In "server" mode the options come straight from the classifier's labels,
+# so the sidebar doesn't need any data loaded to render. In "memory" and
+# "live" mode they come from the prebuilt index.
+job_index = None
+if DASHBOARD_MODE == "memory":
+    # Use an animated spinner for a better loading experience
+    with st.spinner("Fetching the latest jobs from the database..."):
+        job_index = load_index()
+elif DASHBOARD_MODE == "live":
+    # Only the first session of the process waits for the full load.
+    with st.spinner("Fetching the latest jobs from the database..."):
+        live_dataset = load_live_dataset()
+    # Read the index once, so this rerun sees one consistent version of it.
+    job_index = live_dataset.index if live_dataset else None
+
+if job_index is not None:
+    role_options = [queries.ALL_ROLES] + job_index.options('job_role')
+    exp_options = [queries.ALL_EXPERIENCE] + job_index.options('experience_level')
+else:
+    role_options = queries.role_options()
+    exp_options = queries.experience_options()
+
 with st.sidebar:
     st.title("🧑‍💻 JobScout Pro")
     st.write("Your intelligent job aggregator.")
     st.divider()
 
     st.header("🔎 Advanced Filters")
-    
-    if main_df.empty:
-        st.warning("No data to filter.")
-    else:
-        # These filters can now safely use 'main_df' to get their options
-        role_options = ["All Roles"] + sorted(main_df['job_role'].unique())
-        selected_role = st.selectbox("**Job Role**", options=role_options)
-
-        exp_options = ["All Experience Levels"] + sorted(main_df['experience_level'].unique())
-        selected_exp = st.selectbox("**Experience Level**", options=exp_options)
-
-        location_query = st.text_input("**Location**", placeholder="e.g., Remote, London, IN")
-        
-        latest_options = ["All Time", "Today", "This Week", "This Month"]
-        selected_latest = st.selectbox("**Freshness**", options=latest_options)
+
+    search_query = st.text_input("**Keyword Search**", placeholder="e.g., python, data engineer, Django")
+    selected_role = st.selectbox("**Job Role**", options=role_options)
+    selected_exp = st.selectbox("**Experience Level**", options=exp_options)
+    location_query = st.text_input("**Location**", placeholder="e.g., Remote, London, IN",
+                                   help="Matches any part of the location, ignoring case.")
+    selected_latest = st.selectbox("**Freshness**", options=queries.freshness_options())
+    page_size = st.selectbox("**Jobs per Page**", options=PAGE_SIZE_OPTIONS,
+                             index=PAGE_SIZE_OPTIONS.index(DASHBOARD_PAGE_SIZE))
+
+filters = (selected_role, selected_exp, location_query.strip(), selected_latest)
+
+# Go back to the first page whenever the filters, the search or the page size change.
+if st.session_state.get('filters') != filters + (search_query.strip(), page_size):
+    st.session_state.filters = filters + (search_query.strip(), page_size)
+    st.session_state.page = 0
 
 # ====================================================================
 # --- Main Content Area ---
 # ====================================================================
 st.header("Live Job Opportunities")
 
-if main_df.empty:
-    st.error("Could not load job data. Please check the backend or try again later.")
-    st.stop()
-
-# --- Filtering Logic ---
-# This corrected logic ensures all filters are chained together correctly.
-filtered_df = main_df.copy() # Start with a copy of the full dataframe
-
-if selected_role != "All Roles":
-    filtered_df = filtered_df[filtered_df['job_role'] == selected_role]
+# --- Pagination Logic ---
+start_idx = st.session_state.page * page_size
+end_idx = start_idx + page_size
 
-if selected_exp != "All Experience Levels":
-    filtered_df = filtered_df[filtered_df['experience_level'] == selected_exp]
+if search_query.strip():
+    # --- Keyword Search: ranked matches from the local full-text index ---
+    index_sync = start_search_index_sync()
+    if search_index.size() == 0:
+        if index_sync is None or index_sync.ready.is_set():
+            st.error("Could not build the search index. Please check the backend or try again later.")
+        else:
+            st.info("The search index is being built for the first time. Please try again in a minute.")
+        st.stop()
+    if index_sync is not None and not index_sync.ready.is_set():
+        st.caption("The search index is still being built; some jobs may be missing from the results.")
 
-if location_query:
-    filtered_df = filtered_df[filtered_df['location'].str.contains(location_query, case=False)]
+    created_after = None
+    if selected_latest in queries.FRESHNESS_DAYS:
+        created_after = (pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=queries.FRESHNESS_DAYS[selected_latest])).isoformat()
+    total_matches, results = search_index.search(
+        search_query,
+        role=None if selected_role == queries.ALL_ROLES else selected_role,
+        experience=None if selected_exp == queries.ALL_EXPERIENCE else selected_exp,
+        location=location_query.strip() or None,
+        created_after=created_after,
+        limit=page_size,
+        offset=start_idx,
+    )
+    page_df = clean_cards(pd.DataFrame(results))
+elif DASHBOARD_MODE in ("memory", "live"):
+    if job_index is None:
+        st.error("Could not load job data. Please check the backend or try again later.")
+        st.stop()
 
-if selected_latest != "All Time":
-    now = pd.Timestamp.now(tz='UTC')
-    delta_map = {"Today": 1, "This Week": 7, "This Month": 30}
-    time_delta = timedelta(days=delta_map[selected_latest])
-    filtered_df = filtered_df[filtered_df['created_at'] >= (now - time_delta)]
+    # --- Filtering Logic: bitmap intersections on the prebuilt index ---
+    created_after = None
+    if selected_latest in queries.FRESHNESS_DAYS:
+        created_after = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=queries.FRESHNESS_DAYS[selected_latest])
+    positions = job_index.filter(
+        role=None if selected_role == queries.ALL_ROLES else selected_role,
+        experience=None if selected_exp == queries.ALL_EXPERIENCE else selected_exp,
+        location=location_query.strip() or None,
+        created_after=created_after,
+    )
+    total_matches = len(positions)
+    page_df = job_index.rows(positions[start_idx:end_idx])
+else:
+    # Use an animated spinner for a better loading experience
+    with st.spinner("Fetching the latest jobs from the database..."):
+        page_df = load_page(*filters, st.session_state.page, page_size)
+        total_matches = load_count(*filters)
 
-# --- Pagination Logic ---
-ITEMS_PER_PAGE = 10
-start_idx = st.session_state.page * ITEMS_PER_PAGE
-end_idx = start_idx + ITEMS_PER_PAGE
-page_df = filtered_df.iloc[start_idx:end_idx]
+    if page_df is None:
+        st.error("Could not load job data. Please check the backend or try again later.")
+        st.stop()
 
-st.write(f"Showing **{len(page_df)}** of **{len(filtered_df)}** matching jobs.")
+st.write(f"Showing **{len(page_df)}** of **{total_matches}** matching jobs.")
 st.divider()
 
 # --- Professional Card-Based Layout ---
 if page_df.empty:
     st.warning("No jobs match your current filter criteria. Try broadening your search!")
+elif DASHBOARD_CARDS == "html":
+    # The whole page of cards is one element, whatever the page size.
+    st.html(cards.render_cards(page_df))
+
+    # One picker for the page instead of a toggle per card; the description
+    # is only downloaded once a job is picked.
+    titles = dict(zip(page_df['id'], page_df['title']))
+    job_id = st.selectbox("**📄 Job Description**", options=[None] + list(titles),
+                          format_func=lambda job_id: "Choose a job to read its description..." if job_id is None
+                          else titles[job_id])
+    if job_id is not None:
+        with st.container(border=True):
+            st.markdown(load_description(job_id) or 'No description available.', unsafe_allow_html=True)
 else:
     for index, row in page_df.iterrows():
         with st.container(border=True):
@@ -121,9 +255,13 @@ else:
                 st.markdown(f"**🏢 Company:** {row.get('company', 'N/A')}")
             with col2:
                 st.link_button("Apply Now ↗", row['link'], use_container_width=True)
-            
+
+            # Keyword searches show where the words matched, highlighted.
+            if row.get('snippet'):
+                st.markdown(row['snippet'], unsafe_allow_html=True)
+
             st.divider()
-            
+
             tag_cols = st.columns(3)
             with tag_cols[0]:
                 st.markdown(f"**📍 Location:** `{row.get('location', 'N/A')}`")
@@ -131,11 +269,12 @@ else:
                 st.markdown(f"**📈 Experience:** `{row.get('experience_level', 'N/A')}`")
             with tag_cols[2]:
                 # Format the date nicely, checking if it exists first
-                published_str = row.get('published_date').strftime('%d %b, %Y') if pd.notna(row.get('published_date')) else 'N/A'
-                st.markdown(f"**🗓️ Published:** `{published_str}`")
-            
-            with st.expander("Show Job Description"):
-                st.markdown(row.get('description', 'No description available.'), unsafe_allow_html=True)
+                st.markdown(f"**🗓️ Published:** `{cards.format_published(row.get('published_date'))}`")
+
+            # The description is only downloaded once the toggle is switched on.
+            if st.toggle("Show Job Description", key=f"desc_{row['id']}"):
+                description = load_description(row['id'])
+                st.markdown(description or 'No description available.', unsafe_allow_html=True)
 
 # --- Pagination Buttons ---
 st.divider()
@@ -145,4 +284,4 @@ def next_page(): st.session_state.page += 1
 with page_cols[0]:
     st.button("⬅️ Previous Page", on_click=prev_page, disabled=(st.session_state.page == 0), use_container_width=True)
 with page_cols[2]:
-    st.button("Next Page ➡️", on_click=next_page, disabled=(end_idx >= len(filtered_df)), use_container_width=True)
+    st.button("Next Page ➡️", on_click=next_page, disabled=(end_idx >= total_matches), use_container_width=True)
@@ -0,0 +1,64 @@
+# benchmarks/bench_descriptions.py
+
+# Micro-benchmark for the description-normalizer stage: the old per-entry
+# BeautifulSoup path versus normalizer.normalize_description, run over the
+# summaries in the recorded feed fixtures.
+#
+#     python -m benchmarks.bench_descriptions [--repeat 200]
+
+"""Compare the old BeautifulSoup description cleanup with normalizer.normalize_description."""
+
+import argparse
+import glob
+import os
+import re
+import time
+import feedparser
+from normalizer import normalize_description
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "feeds")
+
+def load_summaries():
+    summaries = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*"))):
+        with open(path, "rb") as f:
+            feed = feedparser.parse(f.read())
+        summaries.extend(entry.get("summary", "") for entry in feed.entries)
+    return summaries
+
+def bs4_path(description):
+    """The cleanup rss_scraper.extract_details used to do for every entry."""
+    if '<' in description and '>' in description:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(description, 'html.parser')
+        description = soup.get_text(separator=' ', strip=True)
+    return description
+
+def time_per_entry(func, summaries, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for summary in summaries:
+            func(summary)
+    return (time.perf_counter() - started) / (repeat * len(summaries))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the fixture summaries.")
+    args = parser.parse_args()
+
+    summaries = load_summaries()
+    print(f"Benchmarking {len(summaries)} fixture summaries x {args.repeat} passes...")
+
+    # Both paths should agree on the text (ignoring whitespace placement).
+    squash = lambda text: re.sub(r"\s+", "", text)
+    mismatches = sum(squash(bs4_path(s)) != squash(normalize_description(s, max_length=None)) for s in summaries)
+
+    old = time_per_entry(bs4_path, summaries, args.repeat)
+    new = time_per_entry(normalize_description, summaries, args.repeat)
+    print(f"  BeautifulSoup path : {old * 1e6:8.1f} µs/entry")
+    print(f"  normalizer         : {new * 1e6:8.1f} µs/entry")
+    print(f"  speed-up           : {old / new:8.1f}x  ({mismatches} text mismatches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+# benchmarks/bench_suite.py
+
+# Offline performance baseline for the whole pipeline. Every benchmark runs
+# against the fixture server and the in-memory Supabase from harness.py, in
+# its own subprocess (so peak RSS is per benchmark) with a throwaway state
+# directory, and reports throughput, latency percentiles and peak RSS.
+#
+#     python -m benchmarks.bench_suite                       # Run everything
+#     python -m benchmarks.bench_suite --only classify,rss_scrape
+#     python -m benchmarks.bench_suite --json bench.json     # Save the results
+#     python -m benchmarks.bench_suite --baseline bench.json # Fail on regressions
+#
+# Browser benchmarks need Chromium (`playwright install chromium`) and are
+# skipped when it can't be launched. Any other benchmark that errors or comes
+# back without a result fails the run (exit 1), with or without a baseline.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.harness import FixtureServer, InMemorySupabase, offline_sources, quiet, summarize
+
+DEFAULT_REPEATS = {
+    "startup": 10,
+    "classify": 20,
+    "parse": 3,
+    "parse_pool": 3,
+    "rss_scrape": 3,
+    "json_scrape": 3,
+    "save_jobs": 3,
+    "save_jobs_sqlite": 3,
+    "dashboard_sqlite": 50,
+    "dashboard_render_widgets": 20,
+    "dashboard_render_html": 20,
+    "browser_scrape": 2,
+    "engine_async": 3,
+    "engine_sequential": 1,
+}
+
+def _rss_feeds(server):
+    """(source, body) for every replayed feed."""
+    from config import SOURCES
+    feeds = []
+    for source in offline_sources(SOURCES, server.base_url, types=("rss",)):
+        _, body = server.body(source["url"][len(server.base_url):])
+        feeds.append((source, body.decode("utf-8", errors="replace")))  # The engine parses response.text
+    return feeds
+
+def _rss_jobs(server):
+    """Every job in the replayed feeds, parsed once, for the stages after the fetch."""
+    from scrapers import rss_scraper
+    jobs = []
+    with quiet():
+        for source, body in _rss_feeds(server):
+            jobs.extend(rss_scraper.parse_feed(source, body))
+    return jobs
+
+def chromium_available():
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Exception:
+        return False
+
+# --- Benchmarks: each takes the parsed args and returns summarize(...) ---
+def bench_startup(args):
+    """
+    Cold `import main` in a fresh interpreter, like the hourly cron job pays
+    before doing anything; latency is per interpreter. Also reports the
+    slowest imports main pulls in, from `python -X importtime`.
+    """
+    latencies = []
+    cumulative = {}
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                                   capture_output=True, text=True, check=True)
+        latencies.append(time.perf_counter() - t0)
+        # Lines look like "import time:  self | cumulative |   name"; direct
+        # imports of main are indented by two spaces.
+        for line in completed.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].startswith("   ") and not parts[2].startswith("    "):
+                name = parts[2].strip()
+                cumulative.setdefault(name, []).append(int(parts[1]) / 1000)
+    result = summarize("startup", latencies, len(latencies), sum(latencies), "starts")
+    slowest = sorted(cumulative.items(), key=lambda item: -sorted(item[1])[len(item[1]) // 2])[:5]
+    result["slowest_imports_ms"] = {name: round(sorted(ms)[len(ms) // 2], 1) for name, ms in slowest}
+    return result
+
+def bench_classify(args):
+    """utils.classify_job on every title in the replayed feeds, one call at a time."""
+    from utils import classify_job, classify_jobs
+    with FixtureServer() as server:
+        jobs = _rss_jobs(server)
+    titles = [job["title"] for job in jobs]
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for title in titles:
+            t0 = time.perf_counter()
+            classify_job(title)
+            latencies.append(time.perf_counter() - t0)
+        classify_jobs([{"title": title} for title in titles])
+    return summarize("classify", latencies, len(titles) * args.repeat * 2, time.perf_counter() - started, "titles")
+
+def bench_parse(args):
+    """rss_scraper.parse_feed on every replayed feed, one after another in this process; latency is per feed."""
+    from scrapers import rss_scraper
+    with FixtureServer(synthetic_items=args.items) as server:
+        feeds = _rss_feeds(server)
+    latencies = []
+    jobs = 0
+    with quiet():
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for source, body in feeds:
+                t0 = time.perf_counter()
+                jobs += len(rss_scraper.parse_feed(source, body))
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    return summarize("parse", latencies, jobs, elapsed, "jobs")
+
+def bench_parse_pool(args):
+    """The same feeds, all at once through the engine's ParsePool (at least one process)."""
+    import asyncio
+    from config import PARSE_WORKERS
+    from scrapers.parse_pool import ParsePool
+    with FixtureServer(synthetic_items=args.items) as server:
+        feeds = _rss_feeds(server)
+    workers = max(PARSE_WORKERS, 1)
+    latencies = []
+
+    async def parse_all(pool):
+        async def parse_one(source, body):
+            t0 = time.perf_counter()
+            jobs = await pool.parse(source, body)
+            latencies.append(time.perf_counter() - t0)
+            return len(jobs)
+        return sum(await asyncio.gather(*(parse_one(source, body) for source, body in feeds)))
+
+    async def run():
+        async with ParsePool(workers) as pool:
+            await parse_all(pool)  # Warm-up: start the workers and import the parsers
+            latencies.clear()
+            started = time.perf_counter()
+            jobs = 0
+            for _ in range(args.repeat):
+                jobs += await parse_all(pool)
+            return jobs, time.perf_counter() - started
+
+    with quiet():
+        jobs, elapsed = asyncio.run(run())
+    result = summarize("parse_pool", latencies, jobs, elapsed, "jobs")
+    result["workers"] = workers
+    return result
+
+def bench_rss_scrape(args):
+    """rss_scraper.scrape for every rss source, one feed at a time; latency is per feed."""
+    import fetch_state
+    from config import SOURCES
+    from scrapers import rss_scraper
+    latencies = []
+    jobs = 0
+    with FixtureServer(latency_ms=args.latency_ms, synthetic_items=args.items) as server, quiet():
+        sources = offline_sources(SOURCES, server.base_url, types=("rss",))
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fetch_state.reset()
+            for source in sources:
+                t0 = time.perf_counter()
+                jobs += len(rss_scraper.scrape(source))
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    return summarize("rss_scrape", latencies, jobs, elapsed, "jobs")
+
+def bench_json_scrape(args):
+    """json_scraper.scrape for every json source, one API at a time; latency is per source."""
+    import fetch_state
+    from config import SOURCES
+    from scrapers import json_scraper
+    latencies = []
+    jobs = 0
+    with FixtureServer(latency_ms=args.latency_ms, synthetic_items=args.items) as server, quiet():
+        sources = offline_sources(SOURCES, server.base_url, types=("json",))
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fetch_state.reset()
+            for source in sources:
+                t0 = time.perf_counter()
+                jobs += len(json_scraper.scrape(source))
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    return summarize("json_scrape", latencies, jobs, elapsed, "jobs")
+
+def _sqlite_client(name):
+    """A fresh local database in the benchmark's state directory."""
+    from config import STATE_DIR
+    from local_db import LocalClient
+    path = os.path.join(STATE_DIR, f"{name}.sqlite3")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return LocalClient(path)
+
+def _save_jobs(args, name, new_client):
+    import seen_index
+    from config import STREAM_BATCH_SIZE
+    from database import save_jobs
+    with FixtureServer(synthetic_items=args.items) as server:
+        jobs = _rss_jobs(server)
+    latencies = []
+    elapsed = 0
+    for i in range(args.repeat):
+        client = new_client(i)
+        seen_index.reset()
+        with quiet():
+            started = time.perf_counter()
+            for i in range(0, len(jobs), STREAM_BATCH_SIZE):
+                t0 = time.perf_counter()
+                save_jobs(client, jobs[i:i + STREAM_BATCH_SIZE])
+                latencies.append(time.perf_counter() - t0)
+            elapsed += time.perf_counter() - started
+    return summarize(name, latencies, len(jobs) * args.repeat, elapsed, "rows")
+
+def bench_save_jobs(args):
+    """save_jobs in STREAM_BATCH_SIZE batches into an empty database; latency is per batch."""
+    return _save_jobs(args, "save_jobs", lambda i: InMemorySupabase(latency_ms=args.db_latency_ms))
+
+def bench_save_jobs_sqlite(args):
+    """The same, into an empty local SQLite database (JOBSCOUT_DB_BACKEND=sqlite)."""
+    return _save_jobs(args, "save_jobs_sqlite", lambda i: _sqlite_client(f"save-{i}"))
+
+def bench_dashboard_sqlite(args):
+    """The dashboard's page and count queries for every role filter on a local SQLite database."""
+    import queries
+    import writer
+    with FixtureServer(synthetic_items=args.items) as server:
+        jobs = _rss_jobs(server)
+    client = _sqlite_client("dashboard")
+    with quiet():
+        writer.write_now(client, [{key: job.get(key) for key in ("title", "link", "published_date", "source", "company",
+                                                                  "description", "job_role", "experience_level")}
+                                  for job in jobs])
+    latencies = []
+    started = time.perf_counter()
+    for i in range(args.repeat):
+        for role in queries.role_options():
+            t0 = time.perf_counter()
+            queries.fetch_job_page(client, role=role, freshness="This Week", page=i % 3)
+            queries.count_jobs(client, role=role, freshness="This Week")
+            latencies.append(time.perf_counter() - t0)
+    return summarize("dashboard_sqlite", latencies, len(latencies), time.perf_counter() - started, "pages")
+
+def _dashboard_render(args, layout):
+    """
+    app.py under Streamlit's AppTest on a local SQLite database, clicking
+    "Next Page" once per repetition; latency is per rerun. Also reports what
+    each rerun sends to the browser: the number of element messages (deltas)
+    and their serialized size.
+    """
+    import config
+    import database
+    import writer
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1 import local_script_runner
+    with FixtureServer(synthetic_items=args.items) as server:
+        jobs = _rss_jobs(server)
+    client = _sqlite_client("dashboard-render")
+    with quiet():
+        writer.write_now(client, [{key: job.get(key) for key in ("title", "link", "published_date", "source", "company",
+                                                                  "description", "job_role", "experience_level")}
+                                  for job in jobs])
+    database.init_db_client = lambda: client
+    config.DASHBOARD_CARDS = layout
+
+    # Every rerun's messages pass through here on their way into the test tree.
+    reruns = []
+    parse_tree = local_script_runner.parse_tree_from_messages
+    local_script_runner.parse_tree_from_messages = lambda messages: reruns.append(list(messages)) or parse_tree(messages)
+
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app.py"), default_timeout=60)
+    with quiet():
+        app.run()  # First run: imports and the cold caches
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            next_page = next(button for button in app.button if button.label.startswith("Next Page"))
+            t0 = time.perf_counter()
+            next_page.click().run()
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    deltas = [[message for message in messages if message.HasField("delta")] for messages in reruns[1:]]
+    result = summarize(f"dashboard_render_{layout}", latencies, len(latencies), elapsed, "reruns")
+    result["deltas_per_rerun"] = round(sum(map(len, deltas)) / len(deltas), 1)
+    result["kb_per_rerun"] = round(sum(message.ByteSize() for rerun in deltas for message in rerun) / len(deltas) / 1024, 1)
+    return result
+
+def bench_dashboard_render_widgets(args):
+    return _dashboard_render(args, "widgets")
+
+def bench_dashboard_render_html(args):
+    return _dashboard_render(args, "html")
+
+def bench_browser_scrape(args):
+    """browser_scraper.scrape against the saved page snapshots; latency is per page."""
+    if not chromium_available():
+        return {"name": "browser_scrape", "skipped": "Chromium could not be launched"}
+    from config import SOURCES
+    from scrapers import browser_scraper
+    latencies = []
+    jobs = 0
+    with FixtureServer(latency_ms=args.latency_ms) as server, quiet():
+        sources = offline_sources(SOURCES, server.base_url, types=("browser",))
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for source in sources:
+                t0 = time.perf_counter()
+                jobs += len(browser_scraper.scrape(source))
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    return summarize("browser_scrape", latencies, jobs, elapsed, "jobs")
+
+def _bench_engine(args, mode):
+    """main.run_engine over every offline source; latency is per engine run."""
+    import fetch_state
+    import main
+    import seen_index
+    from config import SOURCES
+    types = ("rss", "json", "browser") if chromium_available() else ("rss", "json")
+    latencies = []
+    rows = 0
+    with FixtureServer(latency_ms=args.latency_ms, synthetic_items=args.items) as server:
+        main.SOURCES = offline_sources(SOURCES, server.base_url, types=types)
+        for _ in range(args.repeat):
+            client = InMemorySupabase(latency_ms=args.db_latency_ms)
+            main.init_db_client = lambda: client
+            fetch_state.reset()
+            seen_index.reset()
+            with quiet():
+                t0 = time.perf_counter()
+                main.run_engine(mode=mode, schedule="all")
+                latencies.append(time.perf_counter() - t0)
+            rows += client.row_count()
+    result = summarize(f"engine_{mode}", latencies, rows, sum(latencies), "rows")
+    result["sources"] = "+".join(types)
+    return result
+
+def bench_engine_async(args):
+    return _bench_engine(args, "async")
+
+def bench_engine_sequential(args):
+    return _bench_engine(args, "sequential")
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "classify": bench_classify,
+    "parse": bench_parse,
+    "parse_pool": bench_parse_pool,
+    "rss_scrape": bench_rss_scrape,
+    "json_scrape": bench_json_scrape,
+    "save_jobs": bench_save_jobs,
+    "save_jobs_sqlite": bench_save_jobs_sqlite,
+    "dashboard_sqlite": bench_dashboard_sqlite,
+    "dashboard_render_widgets": bench_dashboard_render_widgets,
+    "dashboard_render_html": bench_dashboard_render_html,
+    "browser_scrape": bench_browser_scrape,
+    "engine_async": bench_engine_async,
+    "engine_sequential": bench_engine_sequential,
+}
+
+# --- Runner ---
+def run_child(name, args):
+    """Runs one benchmark in a fresh interpreter with its own state directory."""
+    with tempfile.TemporaryDirectory(prefix="jobscout-bench-") as state_dir:
+        env = dict(os.environ, JOBSCOUT_STATE_DIR=state_dir, JOBSCOUT_SCHEDULE_MODE="all")
+        env.pop("JOBSCOUT_PROMETHEUS_TEXTFILE", None)
+        command = [sys.executable, "-m", "benchmarks.bench_suite", "--child", name,
+                   "--latency-ms", str(args.latency_ms), "--db-latency-ms", str(args.db_latency_ms),
+                   "--items", str(args.items)]
+        if args.repeat:
+            command += ["--repeat", str(args.repeat)]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"name": name, "error": completed.stderr.strip().splitlines()[-1:] or ["failed"]}
+    try:
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {"name": name, "error": ["no result on stdout"]}
+
+def failures(results):
+    """Benchmarks that errored or returned no throughput; ones marked skipped don't count."""
+    return [f"{row['name']}: {' '.join(row.get('error') or ['no result'])}"
+            for row in results if "skipped" not in row and ("error" in row or "throughput" not in row)]
+
+def compare(baseline, results, tolerance):
+    """Benchmarks whose throughput fell, or p95 latency rose, by more than `tolerance` times."""
+    before = {row["name"]: row for row in baseline.get("benchmarks", [])}
+    regressions = []
+    for row in results:
+        old = before.get(row["name"])
+        if not old or "throughput" not in row or "throughput" not in old:
+            continue
+        if old["throughput"] and row["throughput"] < old["throughput"] / tolerance:
+            regressions.append(f"{row['name']}: throughput {old['throughput']} -> {row['throughput']} {row['unit']}/s")
+        if old["p95_ms"] and row["p95_ms"] > old["p95_ms"] * tolerance:
+            regressions.append(f"{row['name']}: p95 {old['p95_ms']} -> {row['p95_ms']} ms")
+    return regressions
+
+def print_table(results):
+    print(f"\n{'benchmark':<26} {'items':>8} {'throughput':>16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak RSS':>10}")
+    for row in results:
+        if "skipped" in row or "error" in row:
+            print(f"{row['name']:<26} {'skipped: ' + row['skipped'] if 'skipped' in row else 'ERROR: ' + ' '.join(row['error'])}")
+            continue
+        rss = f"{row['peak_rss_mb']:.0f} MB" + (f" (+{row['child_peak_rss_mb']:.0f})" if row["child_peak_rss_mb"] else "")
+        print(f"{row['name']:<26} {row['items']:>8} {row['throughput']:>10} {row['unit'] + '/s':<5} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {rss:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for the JobScout engine.")
+    parser.add_argument("--only", help="Comma-separated benchmarks to run (default: all).")
+    parser.add_argument("--repeat", type=int, help="Repetitions per benchmark (default: per benchmark).")
+    parser.add_argument("--latency-ms", type=int, default=20, help="Delay the fixture server adds to every response.")
+    parser.add_argument("--db-latency-ms", type=int, default=20, help="Delay the fake database adds to every query.")
+    parser.add_argument("--items", type=int, default=50, help="Items per synthetic feed.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare with an earlier --json file and exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Slowdown factor that counts as a regression.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.repeat = args.repeat or DEFAULT_REPEATS[args.child]
+        print(json.dumps(BENCHMARKS[args.child](args)))
+        return
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = []
+    for name in names:
+        print(f"Running {name}...")
+        results.append(run_child(name, args))
+    print_table(results)
+    for row in results:
+        if "deltas_per_rerun" in row:
+            print(f"\n{row['name']}: {row['deltas_per_rerun']} element messages, {row['kb_per_rerun']} KB per rerun")
+        if row.get("slowest_imports_ms"):
+            print("\nSlowest imports at startup: " + ", ".join(f"{name} {ms} ms" for name, ms in row["slowest_imports_ms"].items()))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "settings": {"latency_ms": args.latency_ms, "db_latency_ms": args.db_latency_ms, "items": args.items},
+                "benchmarks": results,
+            }, f, indent=1)
+
+    failed = failures(results)
+    if failed:
+        print(f"\n❌ {len(failed)} benchmarks failed:")
+        for line in failed:
+            print(f"  {line}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} regressions against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        if not failed:
+            print(f"\n✅ No regressions against {args.baseline}.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+# benchmarks/harness.py
+
+# Offline stand-ins for everything the engine talks to, so benchmarks are
+# reproducible and never touch the live sites or Supabase:
+#
+#   * FixtureServer   - a local HTTP server that replays a feed for every
+#                       "rss" source, an API response for every "json"
+#                       source and an HTML snapshot for every "browser"
+#                       source, with an optional per-request delay.
+#   * InMemorySupabase - just enough of the supabase-py query builder for
+#                       save_jobs, the seen-links index and the dedup stage.
+#   * offline_sources - config.SOURCES with every URL pointed at the server.
+#
+# Feeds come from fixtures/feeds/<slug>.rss, API responses from
+# fixtures/api/<slug>.json and pages from fixtures/pages/<slug>.html, where
+# <slug> is the source name in lower case with runs of other characters
+# turned into "-". Sources without a recording get a synthetic feed (or API
+# response, with the source's field mapping pointed at it), generated
+# deterministically from the slug.
+# `python -m benchmarks.record_fixtures` refreshes the recordings from the
+# live sites.
+
+import contextlib
+import http.server
+import json
+import math
+import os
+import random
+import re
+import resource
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FEED_DIR = os.path.join(FIXTURE_DIR, "feeds")
+API_DIR = os.path.join(FIXTURE_DIR, "api")
+PAGE_DIR = os.path.join(FIXTURE_DIR, "pages")
+SYNTHETIC_ITEMS = 50
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+# --- Synthetic feeds for sources without a recording ---
+_ROLES = ["Backend Engineer", "Frontend Developer", "Data Scientist", "Product Manager", "DevOps Engineer",
+          "UX Designer", "Customer Support Specialist", "Marketing Manager", "QA Engineer", "Data Analyst",
+          "Machine Learning Engineer", "Sales Development Representative", "Technical Writer", "SRE",
+          "Full Stack Developer", "Android Developer", "iOS Engineer", "Content Writer", "Recruiter"]
+_LEVELS = ["Senior", "Junior", "Lead", "Staff", "Principal", "", "", "Intern", "Entry Level", "Mid-Level"]
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay", "Stark", "Wayne", "Tyrell",
+              "Cyberdyne", "Soylent", "Wonka", "Gringotts", "Monarch", "Oscorp", "Aperture", "Black Mesa"]
+_LOCATIONS = ["Remote", "Worldwide", "USA Only", "Europe", "London, UK"]
+_SUFFIXES = ["Labs", "Systems", "Analytics", "Health", "Robotics", "Pay", "Cloud", "Studio", "AI"]
+_WORDS = ("we build tools for teams that ship software across time zones and care about craft our "
+          "customers include hospitals banks retailers and startups you will design review deploy and "
+          "monitor services own features end to end mentor colleagues write documentation improve "
+          "reliability reduce latency talk to users run experiments analyse metrics with python sql "
+          "react typescript go kubernetes terraform postgres kafka spark airflow figma benefits include "
+          "remote work flexible hours equity learning budget parental leave home office stipend health "
+          "insurance paid time off annual retreat salary range depends on experience and location").split()
+
+def synthetic_postings(slug, items=SYNTHETIC_ITEMS):
+    """`items` distinct jobs (newest first) as dicts, the same every time for a slug."""
+    rng = random.Random(slug)
+    published = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    postings = []
+    for i in range(items):
+        role = " ".join(filter(None, [rng.choice(_LEVELS), rng.choice(_ROLES)]))
+        company = f"{rng.choice(_COMPANIES)} {rng.choice(_SUFFIXES)}"
+        paragraphs = "".join(
+            "<p>" + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(25, 60))) + ".</p>"
+            for _ in range(rng.randint(2, 5))
+        )
+        bullets = "".join(f"<li>{' '.join(rng.sample(_WORDS, 6))}</li>" for _ in range(4))
+        postings.append({
+            "id": i,
+            "title": f"{company}: {role}",
+            "url": f"https://{slug}.example/jobs/{i}-{slugify(role)}",
+            "company": company,
+            "location": _LOCATIONS[i % len(_LOCATIONS)],
+            "published": published - timedelta(hours=i * 3),
+            "description": f"<h2>About {company}</h2>{paragraphs}<ul>{bullets}</ul>",
+        })
+    return postings
+
+def synthetic_feed(slug, items=SYNTHETIC_ITEMS):
+    """A well-formed RSS 2.0 feed of `items` distinct jobs, the same every time for a slug."""
+    entries = []
+    for posting in synthetic_postings(slug, items):
+        entries.append(f"""    <item>
+      <title>{posting["title"]}</title>
+      <link>{posting["url"]}</link>
+      <guid>https://{slug}.example/jobs/{posting["id"]}</guid>
+      <pubDate>{format_datetime(posting["published"])}</pubDate>
+      <dc:creator>{posting["company"]}</dc:creator>
+      <description><![CDATA[{posting["description"]}]]></description>
+    </item>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel>
+    <title>{slug}</title>
+    <link>https://{slug}.example/</link>
+    <description>Synthetic benchmark feed</description>
+{chr(10).join(entries)}
+  </channel>
+</rss>
+""".encode("utf-8")
+
+# What offline_sources maps a JSON source without a recording onto.
+SYNTHETIC_API_SPEC = {
+    "items": "$.jobs[*]",
+    "fields": {"title": "title", "link": "url", "company": "company", "location": "location",
+               "description": "description", "published_date": "published"},
+    "since": {"field": "published"},
+}
+
+def synthetic_api(slug, items=SYNTHETIC_ITEMS):
+    """A JSON API response with the same jobs as synthetic_feed, shaped like SYNTHETIC_API_SPEC."""
+    postings = [dict(posting, published=posting["published"].isoformat())
+                for posting in synthetic_postings(slug, items)]
+    return json.dumps({"count": len(postings), "jobs": postings}).encode("utf-8")
+
+# --- Local HTTP server ---
+class FixtureServer:
+    """
+    Serves /feeds/<slug>.rss, /api/<slug>.json, /pages/<slug>.html and small /static/ assets
+    from a background thread. `latency_ms` delays every response, standing in
+    for the network round-trip to a real site.
+    """
+
+    def __init__(self, latency_ms=0, synthetic_items=SYNTHETIC_ITEMS):
+        self.latency_ms = latency_ms
+        self.synthetic_items = synthetic_items
+        self._cache = {}
+        self._httpd = None
+
+    def body(self, path):
+        """Returns (content type, bytes) for a request path, or None for a 404."""
+        if path not in self._cache:
+            self._cache[path] = self._load(path)
+        return self._cache[path]
+
+    def _load(self, path):
+        kind, _, name = path.lstrip("/").partition("/")
+        if kind == "feeds" and name.endswith(".rss"):
+            recorded = os.path.join(FEED_DIR, name)
+            if os.path.exists(recorded):
+                with open(recorded, "rb") as f:
+                    return "application/rss+xml", f.read()
+            return "application/rss+xml", synthetic_feed(name[:-4], self.synthetic_items)
+        if kind == "api" and name.endswith(".json"):
+            recorded = os.path.join(API_DIR, name)
+            if os.path.exists(recorded):
+                with open(recorded, "rb") as f:
+                    return "application/json", f.read()
+            return "application/json", synthetic_api(name[:-5], self.synthetic_items)
+        if kind == "pages" and name.endswith(".html"):
+            snapshot = os.path.join(PAGE_DIR, name)
+            if os.path.exists(snapshot):
+                with open(snapshot, "rb") as f:
+                    return "text/html; charset=utf-8", f.read()
+        if kind == "static":
+            return "application/octet-stream", b"\0" * 2048
+        return None
+
+    def start(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                found = server.body(self.path.split("?")[0])
+                if found is None:
+                    self.send_error(404)
+                    return
+                content_type, payload = found
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def offline_sources(sources, base_url, types=("rss", "json", "browser")):
+    """Copies of `sources` (of the given types) with every URL pointed at the fixture server."""
+    rewritten = []
+    for source in sources:
+        if source["type"] not in types:
+            continue
+        source = dict(source)
+        slug = slugify(source["name"])
+        if source["type"] == "rss":
+            source["url"] = f"{base_url}/feeds/{slug}.rss"
+        elif source["type"] == "json":
+            source["url"] = f"{base_url}/api/{slug}.json"
+            if not os.path.exists(os.path.join(API_DIR, f"{slug}.json")):
+                source.pop("cursor", None)
+                source.update(SYNTHETIC_API_SPEC)
+        elif source["type"] == "browser":
+            source["url"] = f"{base_url}/pages/{slug}.html"
+            source["base_url"] = base_url
+        rewritten.append(source)
+    return rewritten
+
+# --- In-memory Supabase stand-in ---
+class _Result:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class _Query:
+    """Records a chain of supabase-py builder calls and runs it on execute()."""
+
+    def __init__(self, db, table):
+        self._db = db
+        self._table = table
+        self._action = "select"
+        self._payload = None
+        self._columns = None
+        self._count = None
+        self._head = False
+        self._filters = []
+        self._order = None
+        self._slice = None
+        self._limit = None
+        self._on_conflict = None
+
+    def select(self, columns="*", count=None, head=False):
+        self._columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        self._count = count
+        self._head = head
+        return self
+
+    def upsert(self, records, on_conflict=None, **kwargs):
+        self._action, self._payload, self._on_conflict = "upsert", records, on_conflict
+        return self
+
+    def insert(self, records, **kwargs):
+        self._action, self._payload = "insert", records
+        return self
+
+    def update(self, values):
+        self._action, self._payload = "update", values
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def lt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] < value)
+        return self
+
+    def gte(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def range(self, start, end):
+        self._slice = (start, end + 1)
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def execute(self):
+        if self._db.latency_ms:
+            time.sleep(self._db.latency_ms / 1000)
+        with self._db.lock:
+            return getattr(self, f"_run_{self._action}")()
+
+    def _rows(self):
+        rows = [row for row in self._db.tables.setdefault(self._table, {}).values()
+                if all(check(row) for check in self._filters)]
+        if self._order:
+            column, desc = self._order
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        return rows
+
+    def _run_select(self):
+        rows = self._rows()
+        total = len(rows)
+        if self._slice:
+            rows = rows[self._slice[0]:self._slice[1]]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        if self._columns:
+            rows = [{c: row.get(c) for c in self._columns} for row in rows]
+        return _Result([] if self._head else [dict(row) for row in rows], total if self._count else None)
+
+    def _run_insert(self):
+        return self._write(self._payload, conflict_column=None)
+
+    def _run_upsert(self):
+        return self._write(self._payload, conflict_column=self._on_conflict)
+
+    def _write(self, records, conflict_column):
+        table = self._db.tables.setdefault(self._table, {})
+        written = []
+        for record in records if isinstance(records, list) else [records]:
+            existing = None
+            if conflict_column:
+                existing = self._db.unique.setdefault((self._table, conflict_column), {}).get(record.get(conflict_column))
+            if existing is not None:
+                table[existing].update(record)
+                written.append(dict(table[existing]))
+                continue
+            self._db.next_id += 1
+            row = dict(record, id=self._db.next_id)
+            table[row["id"]] = row
+            if conflict_column:
+                self._db.unique[(self._table, conflict_column)][record.get(conflict_column)] = row["id"]
+            written.append(dict(row))
+        self._db.writes += 1
+        return _Result(written)
+
+    def _run_update(self):
+        rows = self._rows()
+        for row in rows:
+            row.update(self._payload)
+        return _Result([dict(row) for row in rows])
+
+    def _run_delete(self):
+        rows = self._rows()
+        table = self._db.tables[self._table]
+        for row in rows:
+            del table[row["id"]]
+        for (name, column), index in self._db.unique.items():
+            if name == self._table:
+                for row in rows:
+                    index.pop(row.get(column), None)
+        return _Result([dict(row) for row in rows])
+
+class InMemorySupabase:
+    """
+    Drop-in for the supabase-py client in benchmarks. `latency_ms` delays
+    every execute(), standing in for the round-trip to the hosted database.
+    """
+
+    def __init__(self, latency_ms=0):
+        self.latency_ms = latency_ms
+        self.tables = {}
+        self.unique = {}
+        self.next_id = 0
+        self.writes = 0
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def row_count(self, name="jobs"):
+        return len(self.tables.get(name, {}))
+
+# --- Measurements ---
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its (finished) children, in MB."""
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2**20
+    return round(own, 1), round(children, 1)
+
+def summarize(name, latencies, items, seconds, unit):
+    """The result row every benchmark returns."""
+    own_rss, child_rss = peak_rss_mb()
+    return {
+        "name": name,
+        "samples": len(latencies),
+        "items": items,
+        "unit": unit,
+        "seconds": round(seconds, 4),
+        "throughput": round(items / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        "peak_rss_mb": own_rss,
+        "child_peak_rss_mb": child_rss,
+    }
+
+@contextlib.contextmanager
+def quiet():
+    """Sends the engine's progress output to /dev/null inside the block."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
@@ -0,0 +1,66 @@
+# benchmarks/record_fixtures.py
+
+# Refreshes the benchmark fixtures from the live sites: the raw body of every
+# "rss" source goes to fixtures/feeds/<slug>.rss, the first page of every
+# "json" source to fixtures/api/<slug>.json and the rendered HTML of every
+# "browser" source to fixtures/pages/<slug>.html. Sources that fail to
+# download keep their old recording (or the synthetic feed).
+#
+#     python -m benchmarks.record_fixtures [--only rss|json|browser]
+
+import argparse
+import asyncio
+import os
+import httpx
+from config import SOURCES
+from benchmarks.harness import API_DIR, FEED_DIR, PAGE_DIR, slugify
+
+def record_feeds(sources, directory=FEED_DIR, extension="rss"):
+    from scrapers.rss_scraper import USER_AGENT, NETWORK_TIMEOUT
+    os.makedirs(directory, exist_ok=True)
+    with httpx.Client(headers={'User-Agent': USER_AGENT}, timeout=NETWORK_TIMEOUT, follow_redirects=True) as client:
+        for source in sources:
+            try:
+                response = client.get(source["url"], params=source.get("params"))
+                response.raise_for_status()
+            except Exception as e:
+                print(f"  [Warning] Skipped '{source['name']}': {e}")
+                continue
+            with open(os.path.join(directory, f"{slugify(source['name'])}.{extension}"), "wb") as f:
+                f.write(response.content)
+            print(f"  -> Recorded '{source['name']}' ({len(response.content) // 1024} KB)")
+
+async def record_pages(sources):
+    from scrapers.browser_pool import BrowserPool
+    os.makedirs(PAGE_DIR, exist_ok=True)
+    async with BrowserPool(max_pages=1) as pool:
+        for source in sources:
+            try:
+                async with pool.page() as page:
+                    await page.goto(source["url"], wait_until="domcontentloaded", timeout=60000)
+                    await page.wait_for_selector(source["selectors"]["job_card"], timeout=30000)
+                    html = await page.content()
+            except Exception as e:
+                print(f"  [Warning] Skipped '{source['name']}': {e}")
+                continue
+            with open(os.path.join(PAGE_DIR, f"{slugify(source['name'])}.html"), "w", encoding="utf-8") as f:
+                f.write(html)
+            print(f"  -> Recorded '{source['name']}' ({len(html) // 1024} KB)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record benchmark fixtures from the live sources.")
+    parser.add_argument("--only", choices=["rss", "json", "browser"], help="Only record one source type.")
+    args = parser.parse_args()
+
+    # Duplicate entries in SOURCES share a slug; record each one once.
+    unique = {slugify(source["name"]): source for source in SOURCES}.values()
+    if args.only in (None, "rss"):
+        record_feeds([source for source in unique if source["type"] == "rss"])
+    if args.only in (None, "json"):
+        record_feeds([source for source in unique if source["type"] == "json"], API_DIR, "json")
+    if args.only in (None, "browser"):
+        asyncio.run(record_pages([source for source in unique if source["type"] == "browser"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# cards.py
+
+# The dashboard's "html" card layout: a whole page of job cards rendered as
+# one block of HTML, sent to the browser as a single element. The "widgets"
+# layout builds every card from Streamlit widgets instead (a container, two
+# column sets, five markdown blocks, a link button and a toggle per card),
+# which costs dozens of messages per rerun. Everything that comes from a feed
+# is escaped here; only search snippets, which search_index.py has already
+# escaped and highlighted, are inserted as HTML.
+
+import html
+from urllib.parse import urlparse
+import pandas as pd
+
+# Colors are translucent so the cards work with the light and the dark theme.
+CARD_CSS = """
+<style>
+.js-cards { display: flex; flex-direction: column; gap: 0.75rem; }
+.js-card { border: 1px solid rgba(128, 128, 128, 0.3); border-radius: 0.5rem; padding: 0.9rem 1.1rem; }
+.js-card-head { display: flex; justify-content: space-between; align-items: flex-start; gap: 1rem; }
+.js-card h4 { margin: 0 0 0.25rem 0; padding: 0; font-size: 1.15rem; }
+.js-apply { white-space: nowrap; padding: 0.3rem 0.8rem; border: 1px solid rgba(128, 128, 128, 0.4);
+            border-radius: 0.5rem; text-decoration: none; }
+.js-snippet { margin: 0.5rem 0 0 0; opacity: 0.85; }
+.js-tags { display: flex; flex-wrap: wrap; gap: 0.4rem 1.5rem; margin-top: 0.6rem; padding-top: 0.6rem;
+           border-top: 1px solid rgba(128, 128, 128, 0.2); }
+.js-tags code { font-size: 0.85rem; }
+</style>
+"""
+
+def _text(value, default='N/A'):
+    """Escaped text for a card field, or the default if it's missing."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return default
+    return html.escape(str(value))
+
+def _href(link):
+    """The link, escaped, if it's a web URL (never javascript: or data:)."""
+    if isinstance(link, str) and urlparse(link).scheme in ("http", "https"):
+        return html.escape(link, quote=True)
+    return None
+
+def format_published(value):
+    return value.strftime('%d %b, %Y') if pd.notna(value) else 'N/A'
+
+def render_card(row):
+    """The HTML for one job card (a row of the page frame)."""
+    href = _href(row.get('link'))
+    apply = f'<a class="js-apply" href="{href}" target="_blank" rel="noopener noreferrer">Apply Now ↗</a>' if href else ''
+    # Keyword searches show where the words matched, highlighted.
+    snippet = f'<p class="js-snippet">{row["snippet"]}</p>' if row.get('snippet') else ''
+    return (
+        '<div class="js-card">'
+        f'<div class="js-card-head"><div><h4>{_text(row.get("title"))}</h4>'
+        f'<div><b>🏢 Company:</b> {_text(row.get("company"))}</div></div>{apply}</div>'
+        f'{snippet}'
+        '<div class="js-tags">'
+        f'<span><b>📍 Location:</b> <code>{_text(row.get("location"))}</code></span>'
+        f'<span><b>📈 Experience:</b> <code>{_text(row.get("experience_level"))}</code></span>'
+        f'<span><b>🗓️ Published:</b> <code>{format_published(row.get("published_date"))}</code></span>'
+        '</div></div>'
+    )
+
+def render_cards(page_df):
+    """One HTML block (styles included) with a card for every row of page_df."""
+    cards = "".join(render_card(row) for row in page_df.to_dict('records'))
+    return f'{CARD_CSS}<div class="js-cards">{cards}</div>'
@@ -3,14 +3,113 @@
 # This is the master list of high-yield, global RSS feeds, curated from
 # the provided list to maximize job collection on a global scale.
 
+import os
+
+# --- Engine Settings ---
+# "async" fetches every RSS source at once over one shared HTTP client;
+# "sequential" keeps the original one-source-at-a-time loop.
+ENGINE_MODE = os.environ.get("JOBSCOUT_ENGINE_MODE", "async")
+MAX_CONCURRENT_FETCHES = 20  # Global cap on in-flight feed downloads
+MAX_FETCHES_PER_HOST = 4     # Keeps us polite to hosts with many feeds (e.g. WWR)
+MAX_BROWSER_PAGES = 3        # Browser sources scraped in parallel on the shared Chromium
+# The async RSS engine is a pipeline: fetches (MAX_CONCURRENT_FETCHES) feed a
+# queue of raw feeds, PARSE_WORKERS processes parse and classify them into a
+# queue of jobs, and SAVE_WORKERS tasks dedupe and save those. Full queues
+# hold the stage before them back. PARSE_WORKERS=0 parses in a thread instead.
+PARSE_WORKERS = int(os.environ.get("JOBSCOUT_PARSE_WORKERS", max((os.cpu_count() or 1) - 1, 0)))
+SAVE_WORKERS = 1             # save_jobs only queues for the background writer, so one is plenty
+PARSE_QUEUE_SIZE = 8         # Downloaded feeds waiting for a parser
+SAVE_QUEUE_SIZE = 8          # Parsed feeds waiting to be saved
+STREAM_BATCH_SIZE = 200      # Jobs per save_jobs call for feeds marked "stream": True
+MAX_DESCRIPTION_LENGTH = 5000  # Descriptions are cleaned and cut to this many characters
+# Database writes are gathered from all sources into chunks of at most this
+# many rows / bytes and sent by a background writer (see writer.py).
+WRITE_BATCH_ROWS = 500
+WRITE_BATCH_BYTES = 1_000_000
+WRITE_FLUSH_SECONDS = 1.0    # Send a partial chunk after this long without new jobs
+WRITE_MAX_RETRIES = 4        # Retries (with backoff) before a chunk goes to the journal
+# Save every source a posting was seen on into the optional 'sources' column
+# (see README). Off by default so the engine works with the original schema.
+STORE_SOURCE_LISTS = os.environ.get("JOBSCOUT_STORE_SOURCE_LISTS", "0") == "1"
+
+# What a browser source with "page_load": "lightweight" skips. We only read
+# text from the selectors, so none of these are needed to find job cards.
+# A source can pass a dict instead to override any of these keys.
+LIGHTWEIGHT_PAGE_LOAD = {
+    "block_resource_types": ["image", "media", "font", "stylesheet"],
+    "block_third_party": True,   # Ads, analytics and trackers on other domains
+    "allowed_domains": [],       # Extra domains a source needs (e.g. its API host)
+    "wait_until": "domcontentloaded",
+}
+
+# --- Local State ---
+# Small on-disk files the engine keeps between runs (cached in CI).
+STATE_DIR = os.environ.get("JOBSCOUT_STATE_DIR", ".jobscout")
+FETCH_STATE_PATH = os.path.join(STATE_DIR, "fetch_state.json")
+SEEN_INDEX_PATH = os.path.join(STATE_DIR, "seen_links.sqlite3")
+SCHEDULE_STATE_PATH = os.path.join(STATE_DIR, "schedule.json")
+RUN_REPORT_PATH = os.path.join(STATE_DIR, "run_report.json")
+WRITE_JOURNAL_PATH = os.path.join(STATE_DIR, "write_journal.jsonl")
+SEARCH_INDEX_PATH = os.path.join(STATE_DIR, "search_index.sqlite3")  # Used by the dashboard
+SEARCH_SYNC_SECONDS = int(os.environ.get("JOBSCOUT_SEARCH_SYNC_SECONDS", "600"))  # Between background index syncs
+# --- Storage Backend ---
+# "supabase" writes to the hosted Postgres database (SUPABASE_URL/KEY in .env);
+# "sqlite" keeps the 'jobs' table in a local file instead (see local_db.py),
+# for single-node deployments and for running everything offline.
+DB_BACKEND = os.environ.get("JOBSCOUT_DB_BACKEND", "supabase")
+SQLITE_DB_PATH = os.environ.get("JOBSCOUT_SQLITE_PATH", os.path.join(STATE_DIR, "jobs.sqlite3"))
+# Optional path for a Prometheus textfile (node_exporter textfile collector).
+PROMETHEUS_TEXTFILE = os.environ.get("JOBSCOUT_PROMETHEUS_TEXTFILE")
+
+# --- Scheduling ---
+# "adaptive" only runs the sources that are due (see scheduler.py);
+# "all" runs every source on every run, like the original engine.
+SCHEDULE_MODE = os.environ.get("JOBSCOUT_SCHEDULE_MODE", "adaptive")
+MIN_INTERVAL_HOURS = 1        # Busy sources are polled on every (hourly) run
+MAX_INTERVAL_HOURS = 24       # Even the quietest healthy source is polled daily
+MAX_BACKOFF_HOURS = 48        # Longest wait between retries of a failing source
+CIRCUIT_BREAKER_FAILURES = 5  # Failures in a row before a source is parked
+PARK_DAYS = 7                 # How long a parked source waits for its next probe
+
+# --- Dashboard Settings ---
+# "server" pushes every filter down to Supabase and downloads one page at a
+# time; "memory" loads up to DASHBOARD_MAX_ROWS cards once per cache window
+# and filters them locally through a bitmap index (filter_index.py); "live"
+# loads them once per server process and then only polls for new jobs in
+# the background (live_dataset.py).
+DASHBOARD_MODE = os.environ.get("JOBSCOUT_DASHBOARD_MODE", "server")
+DASHBOARD_MAX_ROWS = int(os.environ.get("JOBSCOUT_DASHBOARD_MAX_ROWS", "300000"))
+DASHBOARD_REFRESH_SECONDS = int(os.environ.get("JOBSCOUT_DASHBOARD_REFRESH_SECONDS", "60"))
+# "live" mode drops jobs older than this (0 keeps them all, up to DASHBOARD_MAX_ROWS).
+DASHBOARD_RETENTION_DAYS = int(os.environ.get("JOBSCOUT_DASHBOARD_RETENTION_DAYS", "90"))
+# ...and reloads everything this often, to pick up deletions and relabels.
+DASHBOARD_FULL_RELOAD_HOURS = int(os.environ.get("JOBSCOUT_DASHBOARD_FULL_RELOAD_HOURS", "24"))
+# "html" draws each page of job cards as a single HTML block (cards.py);
+# "widgets" builds every card from Streamlit widgets, like the original app.
+DASHBOARD_CARDS = os.environ.get("JOBSCOUT_DASHBOARD_CARDS", "html")
+DASHBOARD_PAGE_SIZE = int(os.environ.get("JOBSCOUT_DASHBOARD_PAGE_SIZE", "10"))  # Default; the sidebar can change it
+
 SOURCES = [
     # --- Major Remote Job Aggregators ---
+    # "stream": True marks multi-MB feeds that are parsed and saved while downloading.
     { "name": "We Work Remotely - All Jobs", "url": "https://weworkremotely.com/remote-jobs.rss", "type": "rss" },
-    { "name": "RemoteOK", "url": "https://remoteok.com/remote-jobs.rss", "type": "rss" },
-    { "name": "Remotive", "url": "https://remotive.com/api/remote-jobs/feed", "type": "rss" },
+    # JSON APIs keep the location the feeds drop, and skip postings already saved
+    # (see scrapers/json_scraper.py for the spec). RemoteOK's list starts with a
+    # legal notice, which has no link and is skipped.
+    { "name": "RemoteOK", "url": "https://remoteok.com/api", "type": "json",
+      "items": "$[*]",
+      "fields": { "title": "position", "link": ["url", "apply_url"], "company": "company",
+                  "location": "location", "description": "description", "published_date": "date" },
+      "since": { "field": "date" } },
+    { "name": "Remotive", "url": "https://remotive.com/api/remote-jobs", "type": "json",
+      "items": "$.jobs[*]",
+      "fields": { "title": "title", "link": "url", "company": "company_name",
+                  "location": "candidate_required_location", "description": "description",
+                  "published_date": "publication_date" },
+      "since": { "field": "publication_date" } },
     { "name": "Jobspresso", "url": "https://jobspresso.co/feed/", "type": "rss" },
-    { "name": "Himalayas", "url": "https://himalayas.app/jobs/rss", "type": "rss" },
-    { "name": "Jobicy", "url": "https://jobicy.com/feed/job_feed", "type": "rss" },
+    { "name": "Himalayas", "url": "https://himalayas.app/jobs/rss", "type": "rss", "stream": True },
+    { "name": "Jobicy", "url": "https://jobicy.com/feed/job_feed", "type": "rss", "stream": True },
     { "name": "FlexJobs", "url": "https://www.flexjobs.com/rss-feeds.html", "type": "rss" }, # Note: This links to a page of feeds, direct scraping might be complex.
     { "name": "SkipTheDrive", "url": "https://www.skipthedrive.com/feed/", "type": "rss" },
     { "name": "EuropeRemotely", "url": "https://europeremotely.com/feed/", "type": "rss" },
@@ -75,6 +174,7 @@ SOURCES = [
         "name": "InternFreak",
         "url": "https://internfreak.co/internships",
         "type": "browser", # This tells the engine to use browser_scraper.py
+        "page_load": "lightweight",
         "base_url": "https://internfreak.co",
         "selectors": {
             "job_card": "div.if-internship-card",
@@ -92,6 +192,7 @@ SOURCES = [
         "name": "Indeed (Example: Python in Texas)",
         "url": "https://www.indeed.com/jobs?q=python&l=Texas",
         "type": "browser", # This tells the engine to use our new browser_scraper.py
+        "page_load": "lightweight",
         "base_url": "https://www.indeed.com",
         "selectors": {
             "job_card": "div.job_seen_beacon",
@@ -114,6 +215,7 @@ SOURCES = [
         "name": "InternFreak",
         "url": "https://internfreak.co/internships",
         "type": "browser",
+        "page_load": "lightweight",
         "base_url": "https://internfreak.co",
         "selectors": {
             "job_card": "div.if-internship-card",
@@ -127,6 +229,7 @@ SOURCES = [
         "name": "Freshers Jobs 24",
         "url": "https://freshersjobs24.com/",
         "type": "browser",
+        "page_load": "lightweight",
         "base_url": "https://freshersjobs24.com",
         "selectors": {
             "job_card": "article.post-item",
@@ -140,6 +243,7 @@ SOURCES = [
         "name": "FreshersVoice",
         "url": "https://www.freshersvoice.com/",
         "type": "browser",
+        "page_load": "lightweight",
         "base_url": "https://www.freshersvoice.com",
         "selectors": {
             "job_card": "article.jeg_post",
@@ -0,0 +1,3 @@
+# conftest.py
+
+# Lets pytest import the top-level modules (utils, dedup, ...) from tests/.
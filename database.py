@@ -2,13 +2,34 @@
 
 import os
 from dotenv import load_dotenv
-from supabase import create_client, Client
+import metrics
+import seen_index
+import writer
+from job_record import JobBatch, RECORD_FIELDS
+from config import STORE_SOURCE_LISTS, DB_BACKEND, SQLITE_DB_PATH
 
 # Load environment variables from .env file
 load_dotenv()
 
 def init_db_client():
-    """Initializes and returns the Supabase client."""
+    """
+    Initializes and returns the database client: the Supabase client, or
+    with JOBSCOUT_DB_BACKEND=sqlite a local SQLite database that answers
+    the same queries (see local_db.py).
+    """
+    if DB_BACKEND == "sqlite":
+        try:
+            from local_db import LocalClient
+            local_client = LocalClient(SQLITE_DB_PATH)
+            print(f"✅ Local database opened at {SQLITE_DB_PATH}.")
+            return local_client
+        except Exception as e:
+            print(f"[ERROR] Failed to open the local database: {e}")
+            return None
+    if DB_BACKEND != "supabase":
+        print(f"[ERROR] Unknown JOBSCOUT_DB_BACKEND '{DB_BACKEND}' (expected 'supabase' or 'sqlite').")
+        return None
+
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_KEY")
     
@@ -17,6 +38,9 @@ def init_db_client():
         return None
         
     try:
+        # supabase-py takes a good third of a second to import; only pay for
+        # it when it's the backend in use.
+        from supabase import create_client
         supabase_client = create_client(url, key)
         print("✅ Database client initialized successfully.")
         return supabase_client
@@ -24,53 +48,53 @@ def init_db_client():
         print(f"[ERROR] Failed to initialize database client: {e}")
         return None
 
-def save_jobs(client: Client, jobs: list):
+def save_jobs(client, jobs: list):
     """
-    Saves a list of job dictionaries to the Supabase 'jobs' table,
+    Saves a list of Job records (or job dictionaries) to the 'jobs' table,
     now including company and description details.
+
+    While the engine's background writer is running the records are only
+    queued (see writer.py); otherwise they are written right away in bounded
+    chunks. Either way, chunks that can't be written are kept in the write
+    journal for the next run. Returns False only if jobs were lost.
     """
     if not client or not jobs:
-        return
+        return False
 
-    print(f"  -> Attempting to save {len(jobs)} jobs to the database...")
-    
-    records_to_insert = []
-    for job in jobs:
-        # --- UPGRADED RECORD DICTIONARY ---
-        # This now includes all the new fields to match our upgraded database table.
-        # We use .get() to safely handle cases where a field might be missing.
-        record = {
-            "title": job.get("title"),
-            "link": job.get("link"),
-            "published_date": job.get("published_date"),
-            "source": job.get("source"),
-            "company": job.get("company"),
-            "description": job.get("description"),
-            "job_role": job.get("job_role"), # New field
-            "experience_level": job.get("experience_level") # New field
-            # The 'location' field will mostly be NULL for RSS feeds, which is fine.
-        }
-        # We only process jobs that have a valid link.
-        if record["link"]:
-            records_to_insert.append(record)
+    # Engine batches come from a single source; timings are charged to it.
+    source_name = jobs[0].get("source")
+
+    # --- NEW: Drop links we've already stored before they go over the wire ---
+    with metrics.timer(source_name, "seen_filter"):
+        new_jobs = seen_index.filter_new(client, jobs)
+    if not new_jobs:
+        print(f"  -> All {len(jobs)} jobs are already in the database. Nothing to upload.")
+        return True
+
+    print(f"  -> Attempting to save {len(new_jobs)} new jobs to the database ({len(jobs) - len(new_jobs)} already seen)...")
+
+    # --- UPGRADED RECORD BUILDING ---
+    # The jobs are turned into columns once (one pass per field) and the
+    # upsert rows are zipped straight out of them, with every field our
+    # database table expects. We only process jobs that have a valid link.
+    fields = RECORD_FIELDS + ("sources",) if STORE_SOURCE_LISTS else RECORD_FIELDS
+    batch = JobBatch.from_jobs([job for job in new_jobs if job.get("link")], fields)
+    if STORE_SOURCE_LISTS:
+        # A copy: dedup keeps adding to these lists while the writer waits.
+        batch.columns["sources"] = [list(sources) if sources else None for sources in batch.column("sources")]
+    records_to_insert = batch.to_records(fields)
 
     # If there are no valid records to insert, we can stop here.
     if not records_to_insert:
         print("  -> No valid jobs with links to save.")
-        return
+        return True
 
-    try:
-        # The 'upsert' command is the core of our logic. It will INSERT new jobs.
-        # If a job with the same 'link' (our unique column) already exists,
-        # the database will simply ignore it, preventing duplicates.
-        response = client.table('jobs').upsert(records_to_insert, on_conflict='link').execute()
-        
-        if response.data:
-            num_saved = len(response.data)
-            num_duplicates = len(records_to_insert) - num_saved
-            print(f"  -> 🎉 Success! Saved {num_saved} new jobs. Skipped {num_duplicates} duplicates.")
-        else:
-            print("  -> No new jobs to save. All entries were likely duplicates.")
-            
-    except Exception as e:
-        print(f"  [ERROR] Could not save jobs to database: {e}")
\ No newline at end of file
+    # The 'upsert' command is the core of our logic. It will INSERT new jobs.
+    # If a job with the same 'link' (our unique column) already exists,
+    # the database will simply ignore it, preventing duplicates.
+    if writer.is_running():
+        queued = writer.submit(records_to_insert)
+        print(f"  -> Queued {queued} new jobs for the background writer.")
+        return True
+
+    return writer.write_now(client, records_to_insert)
@@ -0,0 +1,211 @@
+# dedup.py
+
+# Collapses the same posting arriving from several sources into one row.
+#
+# Exact copies are caught by comparing normalised URLs (tracking parameters,
+# "www.", trailing slashes, plain #anchors); the normalised form is only a
+# lookup key, and every job keeps the link it was scraped with. Near-copies
+# -- the same job re-posted on another board with a different URL -- are
+# caught with MinHash signatures over word shingles of title + company +
+# description, bucketed with LSH so each job is only compared with a handful
+# of candidates. Jobs without a real description are only matched by URL:
+# a title alone ("Python Developer") says nothing about which posting it is.
+# Near-copies only count across sources: two postings from the same board
+# that share most of their text (the same role in London and in Berlin, with
+# the company's boilerplate) are different jobs.
+# Both the engine stage and the backlog pass are linear in the number of jobs.
+#
+# The engine's index only lives for one run, so a posting that turns up on
+# another board in a later run is saved again; the backlog pass merges those.
+#
+#     python dedup.py            # Report near-duplicates in the jobs table
+#     python dedup.py --apply    # ...and delete the non-canonical copies
+
+import argparse
+import re
+import zlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import numpy as np
+from config import STORE_SOURCE_LISTS
+
+NUM_PERM = 64
+BANDS = 8                 # 8 bands x 8 rows: candidates from ~0.75 similarity up
+ROWS_PER_BAND = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+MAX_DESCRIPTION_WORDS = 200  # The opening of a description is plenty to fingerprint it
+MIN_DESCRIPTION_WORDS = 10   # Fewer and a job is only matched by its URL
+# What the scrapers store when a posting has no description.
+_PLACEHOLDER_DESCRIPTIONS = {"no description available.", "no description"}
+
+_TRACKING_PARAMS = {"ref", "referrer", "source", "src", "fbclid", "gclid", "mc_cid", "mc_eid", "campaign"}
+_TOKEN = re.compile(r"\w+")
+_PRIME = 4294967291  # Largest prime below 2^32
+_rng = np.random.RandomState(1)  # Fixed seed: signatures must be stable across runs
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+def normalize_url(url):
+    """Canonical form of a job link, so trivially different URLs compare equal."""
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS]
+    path = parts.path.rstrip("/") or "/"
+    # Hash routes ("#/job/1", "#!/job/1") identify the job; plain anchors don't.
+    fragment = parts.fragment if parts.fragment.startswith(("/", "!")) else ""
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(sorted(query)), fragment))
+
+def signature(job):
+    """
+    MinHash signature (NUM_PERM uint64s) of a job's title, company and
+    description, or None if the description is missing or too short to tell
+    postings apart.
+    """
+    description = (job.get("description") or "").strip()
+    if description.lower() in _PLACEHOLDER_DESCRIPTIONS:
+        description = ""
+    description_words = _TOKEN.findall(description.lower())[:MAX_DESCRIPTION_WORDS]
+    if len(description_words) < MIN_DESCRIPTION_WORDS:
+        return None
+    words = (_TOKEN.findall((job.get("title") or "").lower())
+             + _TOKEN.findall((job.get("company") or "").lower())
+             + description_words)
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a * h + b) mod p for every permutation at once; with a, b, h < 2^32
+    # the arithmetic stays exact inside uint64.
+    return ((np.outer(hashes, _PERM_A) + _PERM_B) % np.uint64(_PRIME)).min(axis=0)
+
+class NearDuplicateIndex:
+    """
+    LSH index over canonical jobs. add() returns None for a new job, or the
+    key of the canonical job it duplicates: the same normalised URL, or a
+    near-copy from a source the canonical job hasn't come from yet. Only
+    canonical jobs are stored, so memory grows with the number of distinct
+    postings.
+    """
+
+    def __init__(self):
+        self._buckets = [{} for _ in range(BANDS)]
+        self._signatures = {}
+        self._links = {}
+        self.sources = {}  # canonical key -> every source the posting came from
+
+    def _band_keys(self, sig):
+        return [sig[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND].tobytes() for i in range(BANDS)]
+
+    def add(self, key, job):
+        link = normalize_url(job.get("link"))
+        canonical = self._links.get(link)
+        sig = None
+        band_keys = []
+        if canonical is None and (sig := signature(job)) is not None:
+            band_keys = self._band_keys(sig)
+            for band, band_key in enumerate(band_keys):
+                candidate = self._buckets[band].get(band_key)
+                if (candidate is not None and job.get("source") not in self.sources[candidate]
+                        and np.mean(self._signatures[candidate] == sig) >= SIMILARITY_THRESHOLD):
+                    canonical = candidate
+                    break
+
+        if canonical is not None:
+            sources = self.sources[canonical]
+            if job.get("source") not in sources:
+                sources.append(job.get("source"))
+            return canonical
+
+        self._signatures[key] = sig
+        self._links[link] = key
+        self.sources[key] = [job.get("source")]
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, key)
+        return None
+
+def collapse_duplicates(jobs, index):
+    """
+    The engine's dedup stage. Drops jobs that duplicate one already seen
+    this run and returns the rest, links untouched. Each kept job carries a
+    'sources' list that later duplicates are added to.
+    """
+    kept = []
+    for job in jobs:
+        if index.add(job.get("link"), job) is None:
+            job["sources"] = index.sources[job.get("link")]
+            kept.append(job)
+    dropped = len(jobs) - len(kept)
+    if dropped:
+        print(f"  -> Collapsed {dropped} duplicate jobs already seen this run.")
+    return kept
+
+def save_source_lists(client, index):
+    """
+    Writes the final source list of every posting that arrived from more
+    than one source. Needs the optional 'sources' column (see README).
+    """
+    if not STORE_SOURCE_LISTS or not client:
+        return
+    merged = {key: sources for key, sources in index.sources.items() if len(sources) > 1}
+    for link, sources in merged.items():
+        try:
+            client.table('jobs').update({"sources": sources}).eq('link', link).execute()
+        except Exception as e:
+            print(f"  [Warning] Could not update the source list for {link}: {e}")
+
+# --- Backlog pass over the whole jobs table ---
+PAGE_SIZE = 1000
+DELETE_BATCH_SIZE = 500
+
+def dedupe_backlog(apply=False):
+    """
+    Streams the jobs table oldest-first, keeps the first copy of every posting
+    as canonical and reports (or, with apply=True, deletes) the later copies.
+    """
+    from database import init_db_client
+    client = init_db_client()
+    if not client:
+        print("Dedup stopped due to database connection failure.")
+        return
+
+    index = NearDuplicateIndex()
+    duplicate_ids = []
+    scanned = 0
+    last_id = None
+    while True:
+        query = client.table('jobs').select('id, link, title, company, description, source').order('id').limit(PAGE_SIZE)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.execute().data or []
+        for row in rows:
+            if index.add(row["id"], row) is not None:
+                duplicate_ids.append(row["id"])
+        scanned += len(rows)
+        if len(rows) < PAGE_SIZE:
+            break
+        last_id = rows[-1]["id"]
+        print(f"  -> Scanned {scanned} jobs, {len(duplicate_ids)} duplicates so far...")
+
+    clusters = sum(1 for sources in index.sources.values() if len(sources) > 1)
+    print(f"\n🧹 {len(duplicate_ids)} of {scanned} jobs duplicate another posting ({clusters} multi-source clusters).")
+    if not apply or not duplicate_ids:
+        return
+
+    if STORE_SOURCE_LISTS:
+        for job_id, sources in index.sources.items():
+            if len(sources) > 1:
+                client.table('jobs').update({"sources": sources}).eq('id', job_id).execute()
+    for i in range(0, len(duplicate_ids), DELETE_BATCH_SIZE):
+        client.table('jobs').delete().in_('id', duplicate_ids[i:i + DELETE_BATCH_SIZE]).execute()
+    print(f"  -> Deleted {len(duplicate_ids)} duplicate rows.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate jobs in the jobs table.")
+    parser.add_argument("--apply", action="store_true", help="Delete the non-canonical copies.")
+    dedupe_backlog(apply=parser.parse_args().apply)
@@ -0,0 +1,101 @@
+# fetch_state.py
+
+# Remembers what every feed looked like the last time we fetched it
+# (ETag, Last-Modified and a hash of the body), so that unchanged feeds can
+# be skipped without re-parsing them or touching the database. JSON API
+# sources also keep the timestamp of the newest posting they have saved.
+
+import hashlib
+import json
+import os
+from config import FETCH_STATE_PATH
+
+_state = None   # url -> {"etag", "last_modified", "content_hash", ["since"]}, loaded lazily
+_pending = {}   # Validators for fresh responses, waiting for a successful save
+
+def _get_state():
+    global _state
+    if _state is None:
+        try:
+            with open(FETCH_STATE_PATH, encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+def conditional_headers(url):
+    """Returns the If-None-Match / If-Modified-Since headers for a URL, if we have any."""
+    entry = _get_state().get(url, {})
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def is_unchanged(url, response):
+    """
+    Checks a response against what we saw last time. Returns True on a 304 or
+    when the body hashes the same as before. Otherwise the new validators are
+    staged until commit() is called for the URL.
+    """
+    if response.status_code == 304:
+        return True
+
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    if _get_state().get(url, {}).get("content_hash") == content_hash:
+        return True
+
+    stage(url, response, content_hash)
+    return False
+
+def stage(url, response, content_hash):
+    """
+    Holds a response's validators until commit(). Streamed feeds call this
+    directly once their body (and so its hash) has been read in full.
+    """
+    _pending[url] = {
+        **_staged(url),
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "content_hash": content_hash,
+    }
+
+def _staged(url):
+    # What commit() would store for a URL so far, so staging one value keeps the others.
+    return dict(_pending.get(url) or _get_state().get(url, {}))
+
+def get_value(url, key):
+    """A value committed for a URL, e.g. a JSON source's "since" timestamp."""
+    return _get_state().get(url, {}).get(key)
+
+def stage_value(url, key, value):
+    """Holds one extra value for a URL until commit(), like the validators."""
+    _pending[url] = {**_staged(url), key: value}
+
+def commit(url):
+    """
+    Marks the staged response for a URL as processed. Only call this once its
+    jobs are safely saved, otherwise a failed run would hide them next time.
+    """
+    if url in _pending:
+        _get_state()[url] = _pending.pop(url)
+
+def reset():
+    """Forgets every stored validator (the offline benchmarks replay the same feeds)."""
+    global _state
+    _state = {}
+    _pending.clear()
+
+def save():
+    """Writes the fetch state back to disk."""
+    if _state is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(FETCH_STATE_PATH) or ".", exist_ok=True)
+        tmp_path = FETCH_STATE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_state, f)
+        os.replace(tmp_path, FETCH_STATE_PATH)
+    except OSError as e:
+        print(f"  [Warning] Could not save fetch state: {e}")
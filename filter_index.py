@@ -0,0 +1,189 @@
+# filter_index.py
+
+# A precomputed index over the dashboard's in-memory job frame. It is built
+# once (and extended with each delta load in "live" mode), after which every
+# filter combination is answered by intersecting boolean bitmaps instead of
+# scanning object-dtype columns:
+#
+#   * job_role / experience_level / source are stored as categorical codes,
+#     with one row bitmap per distinct value;
+#   * rows are kept sorted newest-first, so a freshness cut is a binary search
+#     that turns into a prefix of the frame;
+#   * location is stored as categorical codes too. A location filter is a
+#     case-insensitive substring match, like the ILIKE '%...%' of "server"
+#     mode, so the same text finds the same jobs in every DASHBOARD_MODE. It
+#     is checked once per distinct location, then turned into a row mask
+#     from the codes.
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_COLUMNS = ('job_role', 'experience_level', 'source')
+
+def _labels(df, col):
+    values = df[col] if col in df else pd.Series(['Not Specified'] * len(df))
+    return values.fillna('Not Specified')
+
+def _timestamps(df):
+    return pd.to_datetime(df['created_at'], utc=True, errors='coerce')
+
+def _locations(df):
+    return df['location'].fillna('') if 'location' in df else pd.Series([''] * len(df))
+
+def _recode(codes, old_categories, new_categories):
+    """Categorical codes re-pointed from one category list to another (-1 if dropped)."""
+    positions = {value: code for code, value in enumerate(new_categories)}
+    # The trailing -1 is what an old code of -1 (no category) looks up.
+    lookup = np.array([positions.get(value, -1) for value in old_categories] + [-1], dtype=np.int32)
+    return lookup[codes]
+
+class JobIndex:
+    """Bitmap index over a frame of job cards. Build once, query on every rerun."""
+
+    def __init__(self, df):
+        df = df.sort_values('created_at', ascending=False, na_position='last', kind='stable')
+        self.df = df.reset_index(drop=True)
+        self.size = len(self.df)
+
+        # Categorical codes plus one bitmap per distinct value.
+        self.codes = {}
+        self.categories = {}
+        self.bitmaps = {}
+        for col in CATEGORICAL_COLUMNS:
+            categorical = pd.Categorical(_labels(self.df, col))
+            self.codes[col] = categorical.codes
+            self.categories[col] = list(categorical.categories)
+            self.bitmaps[col] = {
+                value: categorical.codes == code for code, value in enumerate(categorical.categories)
+            }
+
+        # Timestamps ascending (oldest first) for binary search; the frame
+        # itself is newest-first, so "newer than X" is always a prefix.
+        self._created_asc = np.sort(_timestamps(self.df).dropna().to_numpy(dtype='datetime64[ns]'))
+
+        # Location codes; the lowercase distinct values are what queries scan.
+        locations = pd.Categorical(_locations(self.df))
+        self._location_codes = locations.codes
+        self._locations = list(locations.categories)
+        self._locations_lower = [value.lower() for value in self._locations]
+
+    # --- NEW: Incremental updates for the live dataset (live_dataset.py) ---
+    # Both return a new index and leave this one untouched, so sessions that
+    # are still reading it never see a half-updated index.
+
+    def extend(self, new_df, retain_after=None, max_rows=None):
+        """
+        Returns an index with new_df's rows added, minus the rows created
+        before retain_after and any beyond the newest max_rows.
+        """
+        index = self._prepend(new_df) if len(new_df) else self
+        keep = index.size
+        if retain_after is not None:
+            keep = min(keep, index.newer_than(retain_after))
+        if max_rows is not None:
+            keep = min(keep, max_rows)
+        return index.head(keep) if keep < index.size else index
+
+    def _prepend(self, new_df):
+        new_df = new_df.sort_values('created_at', ascending=False, na_position='last', kind='stable')
+        new_df = new_df.reset_index(drop=True)
+        created = _timestamps(new_df)
+        # A delta load only brings rows newer than everything indexed, which
+        # go in front of the frame: only they are categorized, and the
+        # existing bitmaps and codes are reused. Anything else (a timestamp
+        # older than the newest row, or none at all) is rebuilt from scratch.
+        if created.isna().any() or (len(self._created_asc) and
+                                    created.iloc[-1].to_datetime64() < self._created_asc[-1]):
+            return JobIndex(pd.concat([new_df, self.df], ignore_index=True))
+
+        index = JobIndex.__new__(JobIndex)
+        index.df = pd.concat([new_df, self.df], ignore_index=True)
+        index.size = len(index.df)
+
+        index.codes, index.categories, index.bitmaps = {}, {}, {}
+        for col in CATEGORICAL_COLUMNS:
+            values = _labels(new_df, col)
+            categories = sorted(set(self.categories[col]).union(values))
+            new_codes = pd.Categorical(values, categories=categories).codes
+            index.codes[col] = np.concatenate([new_codes, _recode(self.codes[col], self.categories[col], categories)])
+            index.categories[col] = categories
+            old_bitmaps = self.bitmaps[col]
+            index.bitmaps[col] = {
+                value: np.concatenate([new_codes == code,
+                                       old_bitmaps.get(value, np.zeros(self.size, dtype=bool))])
+                for code, value in enumerate(categories)
+            }
+
+        new_created = np.sort(created.to_numpy(dtype='datetime64[ns]'))
+        index._created_asc = np.concatenate([self._created_asc, new_created])
+
+        values = _locations(new_df)
+        locations = sorted(set(self._locations).union(values))
+        new_codes = pd.Categorical(values, categories=locations).codes
+        index._location_codes = np.concatenate([new_codes, _recode(self._location_codes, self._locations, locations)])
+        index._locations = locations
+        index._locations_lower = [value.lower() for value in locations]
+        return index
+
+    def head(self, n):
+        """Returns an index over only the newest n rows."""
+        index = JobIndex.__new__(JobIndex)
+        index.df = self.df.iloc[:n].reset_index(drop=True)
+        index.size = len(index.df)
+
+        index.codes, index.categories, index.bitmaps = {}, {}, {}
+        for col in CATEGORICAL_COLUMNS:
+            # Values whose last row was dropped disappear from the options.
+            bitmaps = {value: bitmap[:n] for value, bitmap in self.bitmaps[col].items() if bitmap[:n].any()}
+            index.categories[col] = [value for value in self.categories[col] if value in bitmaps]
+            index.codes[col] = _recode(self.codes[col][:n], self.categories[col], index.categories[col])
+            index.bitmaps[col] = bitmaps
+
+        # The kept rows are the newest ones, i.e. the end of the ascending array.
+        kept_timestamps = int(np.count_nonzero(self.df['created_at'].iloc[:n].notna()))
+        index._created_asc = self._created_asc[len(self._created_asc) - kept_timestamps:]
+
+        # Locations only found in dropped rows go, so a long-running live
+        # dataset doesn't keep scanning them.
+        codes = self._location_codes[:n]
+        index._locations = [self._locations[code] for code in np.unique(codes) if code >= 0]
+        index._locations_lower = [value.lower() for value in index._locations]
+        index._location_codes = _recode(codes, self._locations, index._locations)
+        return index
+
+    def options(self, col):
+        """The sorted distinct values of a categorical column."""
+        return sorted(self.categories[col])
+
+    def _location_bitmap(self, query):
+        # The rows whose location contains the query, ignoring case.
+        query = query.lower()
+        matching = [code for code, value in enumerate(self._locations_lower) if query in value]
+        return np.isin(self._location_codes, np.array(matching, dtype=self._location_codes.dtype))
+
+    def newer_than(self, cutoff):
+        """How many rows (a prefix of the frame) were created at or after the cutoff."""
+        cutoff = np.datetime64(pd.Timestamp(cutoff).tz_convert('UTC').tz_localize(None), 'ns')
+        return len(self._created_asc) - int(np.searchsorted(self._created_asc, cutoff, side='left'))
+
+    def filter(self, role=None, experience=None, source=None, location=None, created_after=None):
+        """
+        Returns the row positions (newest first) matching every given filter.
+        A filter of None means "no restriction".
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for col, value in (('job_role', role), ('experience_level', experience), ('source', source)):
+            if value is not None:
+                bitmap = self.bitmaps[col].get(value)
+                if bitmap is None:
+                    return np.empty(0, dtype=np.int64)
+                mask &= bitmap
+        if location:
+            mask &= self._location_bitmap(location)
+        if created_after is not None:
+            mask[self.newer_than(created_after):] = False
+        return np.flatnonzero(mask)
+
+    def rows(self, positions):
+        """The frame rows at the given positions, e.g. one page of results."""
+        return self.df.iloc[positions]
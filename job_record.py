@@ -0,0 +1,121 @@
+# job_record.py
+
+# The job record every stage of the engine passes along, from the scrapers
+# through dedup to save_jobs. A Job is a __slots__ object, so it carries no
+# per-instance dict, and its categorical fields (source, company, location
+# and the two labels) are interned: a run that sees the same source name or
+# "Not Specified" a hundred thousand times keeps one copy of each string.
+#
+# Job still answers job["link"], job.get("title") and job["sources"] = ...,
+# so code written against the old job dictionaries keeps working.
+#
+# A JobBatch holds many jobs column by column (one list per field). It is
+# built in one pass per field, turns into the upsert payload by zipping the
+# columns, and into a pandas DataFrame straight from the lists, so no
+# intermediate dict or object is built per row on the way. A few flat lists
+# also pickle far smaller than a dict per job, which is what reclassify.py
+# sends back from its worker processes.
+
+import sys
+
+FIELDS = ("title", "link", "published_date", "source", "company", "description", "location",
+          "job_role", "experience_level", "sources")
+# Repeated across many jobs, so worth interning.
+CATEGORICAL_FIELDS = ("source", "company", "location", "job_role", "experience_level")
+# What save_jobs writes to the 'jobs' table ('sources' is optional, see README).
+RECORD_FIELDS = ("title", "link", "published_date", "source", "company", "description", "location",
+                 "job_role", "experience_level")
+
+def intern_label(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Job:
+    """One scraped job. Fields not given are None."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, title=None, link=None, published_date=None, source=None, company=None,
+                 description=None, location=None, job_role=None, experience_level=None, sources=None):
+        self.title = title
+        self.link = link
+        self.published_date = published_date
+        self.source = intern_label(source)
+        self.company = intern_label(company)
+        self.description = description
+        self.location = intern_label(location)
+        self.job_role = intern_label(job_role)
+        self.experience_level = intern_label(experience_level)
+        self.sources = sources
+
+    # --- Dictionary-style access ---
+    def __getitem__(self, field):
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in FIELDS:
+            raise KeyError(field)
+        setattr(self, field, intern_label(value) if field in CATEGORICAL_FIELDS else value)
+
+    def __contains__(self, field):
+        return field in FIELDS
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in FIELDS else default
+
+    def keys(self):
+        return FIELDS
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __getstate__(self):
+        # Compact for the trip back from a parser process: values only.
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __setstate__(self, state):
+        for field, value in zip(FIELDS, state):
+            setattr(self, field, intern_label(value) if field in CATEGORICAL_FIELDS else value)
+
+    def __repr__(self):
+        return f"Job(title={self.title!r}, link={self.link!r}, source={self.source!r})"
+
+class JobBatch:
+    """Jobs stored column by column: {field: [value per job]}."""
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_jobs(cls, jobs, fields=FIELDS):
+        """Columns from Job objects or job/row dictionaries (missing fields become None)."""
+        jobs = list(jobs)
+        return cls({field: [job.get(field) for job in jobs] for field in fields})
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def column(self, field):
+        return self.columns[field]
+
+    def select(self, keep):
+        """A new batch with only the jobs whose entry in `keep` is true."""
+        return JobBatch({field: [value for value, wanted in zip(values, keep) if wanted]
+                         for field, values in self.columns.items()})
+
+    def to_records(self, fields=None):
+        """The upsert payload: one dict per job with the given (default: all) fields."""
+        names = [field for field in (fields or self.columns) if field in self.columns]
+        return [dict(zip(names, values)) for values in zip(*(self.columns[name] for name in names))]
+
+    def to_jobs(self):
+        names = [name for name in self.columns if name in FIELDS]
+        return [Job(**dict(zip(names, values))) for values in zip(*(self.columns[name] for name in names))]
+
+    def to_frame(self):
+        """A pandas DataFrame built straight from the columns."""
+        import pandas as pd
+        return pd.DataFrame(self.columns)
@@ -0,0 +1,109 @@
+# live_dataset.py
+
+# The dashboard's "live" mode: one process-wide set of job cards, kept
+# current by small delta loads instead of a full reload per cache window.
+#
+# The cards are downloaded in full once, when the first session opens the
+# dashboard. From then on a background thread asks the database every
+# DASHBOARD_REFRESH_SECONDS for the jobs saved since the last poll, adds them
+# to the index, and drops the jobs that have slid out of the retention
+# window. Each refresh builds a new JobIndex and swaps it in with a single
+# assignment, so a session always filters a complete index and never waits
+# on a reload. A refresh costs one query that returns only the new rows.
+#
+# Polls key on id rather than created_at: ids only grow, while jobs saved in
+# the same batch can share a timestamp, so "newer than the newest loaded"
+# could skip some of them. Deletions (dedup.py --apply) and new labels
+# (reclassify.py) are picked up by a full reload in the background every
+# DASHBOARD_FULL_RELOAD_HOURS.
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import queries
+from config import (DASHBOARD_MAX_ROWS, DASHBOARD_REFRESH_SECONDS, DASHBOARD_RETENTION_DAYS,
+                    DASHBOARD_FULL_RELOAD_HOURS)
+from filter_index import JobIndex
+
+class LiveDataset:
+    """
+    A JobIndex over the newest job cards that refreshes itself. Read
+    `dataset.index` on every rerun (None until the first load succeeds).
+    `prepare` turns a frame of raw rows into the frame the index is built on.
+    """
+
+    def __init__(self, client, prepare=lambda df: df, max_rows=DASHBOARD_MAX_ROWS,
+                 refresh_seconds=DASHBOARD_REFRESH_SECONDS, retention_days=DASHBOARD_RETENTION_DAYS,
+                 full_reload_hours=DASHBOARD_FULL_RELOAD_HOURS):
+        self.client = client
+        self.prepare = prepare
+        self.max_rows = max_rows
+        self.refresh_seconds = refresh_seconds
+        self.retention_days = retention_days
+        self.full_reload_hours = full_reload_hours
+        self.index = None
+        self.last_id = 0
+        self._loaded_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _retain_after(self):
+        if not self.retention_days:
+            return None
+        return datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+
+    def _advance(self, rows):
+        if rows:
+            self.last_id = max(self.last_id, max(row["id"] for row in rows))
+
+    def reload(self):
+        """Downloads every card again and replaces the index. Returns the number of rows kept."""
+        rows = queries.fetch_all_cards(self.client, self.max_rows)
+        last_id = max((row["id"] for row in rows), default=0)
+        index = JobIndex(self.prepare(queries.cards_frame(rows))) if rows else None
+        if index is not None:
+            index = index.extend(pd.DataFrame(), retain_after=self._retain_after())
+        self.index, self.last_id, self._loaded_at = index, last_id, time.monotonic()
+        return index.size if index is not None else 0
+
+    def refresh(self):
+        """Adds the jobs saved since the last load and applies the retention window. Returns how many were added."""
+        if self.index is None:
+            self.reload()
+            return 0
+        rows = queries.fetch_cards_since(self.client, self.last_id)
+        # Newest first, like the full load, so jobs saved together keep that order.
+        new_df = self.prepare(queries.cards_frame(rows[::-1])) if rows else pd.DataFrame()
+        self.index = self.index.extend(new_df, retain_after=self._retain_after(), max_rows=self.max_rows)
+        self._advance(rows)
+        return len(rows)
+
+    def start(self):
+        """Loads the cards (blocking, once) and starts the background polls."""
+        try:
+            print(f"  -> [Live] Loaded {self.reload()} job cards.")
+        except Exception as e:
+            # The polls keep retrying the full load.
+            print(f"Data loading error: {e}")
+        self._thread = threading.Thread(target=self._poll, name="live-dataset", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _poll(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                if self.full_reload_hours and time.monotonic() - self._loaded_at >= self.full_reload_hours * 3600:
+                    print(f"  -> [Live] Reloaded {self.reload()} job cards.")
+                else:
+                    added = self.refresh()
+                    if added:
+                        print(f"  -> [Live] Added {added} new job cards.")
+            except Exception as e:
+                # Keep serving the last good index; the next poll tries again.
+                print(f"Data refresh error: {e}")
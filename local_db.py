@@ -0,0 +1,266 @@
+# local_db.py
+
+# An embedded SQLite stand-in for the Supabase client, for single-node
+# deployments and for running the whole pipeline offline. It speaks the
+# small part of the supabase-py query builder the repo uses
+# (table().select/insert/upsert/update/delete with eq/in_/gt/lt/gte/lte/
+# ilike/order/range/limit), so database.py, queries.py, seen_index.py,
+# dedup.py and reclassify.py work against it unchanged.
+#
+# The database runs in WAL mode, so the dashboard can read while the engine
+# writes, and 'jobs' is indexed on every column the dashboard filters or
+# sorts by.
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+
+# Mirrors the Supabase table described in the README.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    link TEXT NOT NULL UNIQUE,
+    published_date TEXT,
+    source TEXT,
+    company TEXT,
+    description TEXT,
+    job_role TEXT,
+    experience_level TEXT,
+    location TEXT,
+    sources TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS jobs_job_role ON jobs (job_role, created_at);
+CREATE INDEX IF NOT EXISTS jobs_experience_level ON jobs (experience_level, created_at);
+CREATE INDEX IF NOT EXISTS jobs_source ON jobs (source);
+"""
+COLUMNS = {
+    "jobs": ("id", "title", "link", "published_date", "source", "company", "description",
+             "job_role", "experience_level", "location", "sources", "created_at"),
+}
+JSON_COLUMNS = {"sources"}  # Postgres arrays, kept as JSON text
+
+class LocalDBError(Exception):
+    """
+    A query the database rejected. `code` is the matching Postgres SQLSTATE,
+    so writer.is_transient treats it like the same error from Supabase.
+    """
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+class Result:
+    """What execute() returns: the rows and, for count='exact', the total."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+def _to_sql(value):
+    if isinstance(value, (list, tuple, set, dict)):
+        return json.dumps(list(value) if isinstance(value, (tuple, set)) else value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _from_sql(column, value):
+    if column in JSON_COLUMNS and value is not None:
+        return json.loads(value)
+    return value
+
+class _Query:
+    def __init__(self, client, table):
+        if table not in COLUMNS:
+            raise LocalDBError(f'relation "{table}" does not exist', "42P01")
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns = list(COLUMNS[table])
+        self._count = False
+        self._head = False
+        self._payload = None
+        self._on_conflict = None
+        self._where = []
+        self._params = []
+        self._order = None
+        self._limit = None
+        self._offset = None
+
+    def _column(self, name):
+        name = name.strip()
+        if name not in COLUMNS[self._table]:
+            raise LocalDBError(f'column {self._table}.{name} does not exist', "42703")
+        return name
+
+    # --- Actions ---
+    def select(self, *columns, count=None, head=False):
+        names = [name for spec in columns for name in spec.split(",") if name.strip()]
+        if names and names != ["*"]:
+            self._columns = [self._column(name) for name in names]
+        self._count = count == "exact"
+        self._head = head
+        return self
+
+    def insert(self, records):
+        self._action, self._payload = "insert", records
+        return self
+
+    def upsert(self, records, on_conflict="id"):
+        self._action, self._payload = "upsert", records
+        self._on_conflict = self._column(on_conflict)
+        return self
+
+    def update(self, values):
+        self._action, self._payload = "update", values
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # --- Filters and modifiers ---
+    def _filter(self, column, op, value):
+        self._where.append(f"{self._column(column)} {op} ?")
+        self._params.append(_to_sql(value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "=", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "!=", value)
+
+    def gt(self, column, value):
+        return self._filter(column, ">", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "<", value)
+
+    def gte(self, column, value):
+        return self._filter(column, ">=", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "<=", value)
+
+    def ilike(self, column, pattern):
+        # SQLite's LIKE is already case-insensitive for ASCII.
+        self._where.append(f"{self._column(column)} LIKE ? ESCAPE '\\'")
+        self._params.append(pattern)
+        return self
+
+    def in_(self, column, values):
+        values = [_to_sql(value) for value in values]
+        if not values:
+            self._where.append("0")
+            return self
+        self._where.append(f"{self._column(column)} IN ({', '.join('?' * len(values))})")
+        self._params.extend(values)
+        return self
+
+    def order(self, column, desc=False):
+        self._order = f"{self._column(column)} {'DESC' if desc else 'ASC'}"
+        return self
+
+    def range(self, start, end):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    # --- Execution ---
+    def _where_sql(self):
+        return f" WHERE {' AND '.join(self._where)}" if self._where else ""
+
+    def execute(self):
+        try:
+            with self._client.lock:
+                return getattr(self, f"_run_{self._action}")(self._client.conn)
+        except sqlite3.IntegrityError as e:
+            raise LocalDBError(str(e), "23000") from e
+        except (sqlite3.InterfaceError, sqlite3.DataError) as e:
+            raise LocalDBError(str(e), "22000") from e
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                raise  # Another process holds the write lock; worth retrying
+            raise LocalDBError(str(e), "42000") from e
+
+    def _run_select(self, conn):
+        total = None
+        if self._count:
+            total = conn.execute(f"SELECT COUNT(*) FROM {self._table}{self._where_sql()}", self._params).fetchone()[0]
+        if self._head:
+            return Result([], total)
+
+        sql = f"SELECT {', '.join(self._columns)} FROM {self._table}{self._where_sql()}"
+        if self._order:
+            sql += f" ORDER BY {self._order}"
+        if self._limit is not None or self._offset:
+            sql += f" LIMIT {int(self._limit if self._limit is not None else -1)} OFFSET {int(self._offset or 0)}"
+        rows = conn.execute(sql, self._params).fetchall()
+        columns = self._columns
+        return Result([{c: _from_sql(c, v) for c, v in zip(columns, row)} for row in rows], total)
+
+    def _write(self, conn, conflict_sql):
+        records = self._payload if isinstance(self._payload, list) else [self._payload]
+        # Records can carry different keys (e.g. the optional 'sources');
+        # each shape gets its own statement.
+        shapes = {}
+        for record in records:
+            shapes.setdefault(tuple(record), []).append(record)
+        with conn:
+            for keys, group in shapes.items():
+                columns = [self._column(key) for key in keys]
+                sql = (f"INSERT INTO {self._table} ({', '.join(columns)}) "
+                       f"VALUES ({', '.join('?' * len(columns))}){conflict_sql(columns)}")
+                conn.executemany(sql, [[_to_sql(record[key]) for key in keys] for record in group])
+        return Result(records)
+
+    def _run_insert(self, conn):
+        return self._write(conn, lambda columns: "")
+
+    def _run_upsert(self, conn):
+        def on_conflict(columns):
+            updates = [f"{c} = excluded.{c}" for c in columns if c != self._on_conflict]
+            if not updates:
+                return f" ON CONFLICT ({self._on_conflict}) DO NOTHING"
+            return f" ON CONFLICT ({self._on_conflict}) DO UPDATE SET {', '.join(updates)}"
+        return self._write(conn, on_conflict)
+
+    def _run_update(self, conn):
+        columns = [self._column(key) for key in self._payload]
+        sql = f"UPDATE {self._table} SET {', '.join(f'{c} = ?' for c in columns)}{self._where_sql()}"
+        with conn:
+            conn.execute(sql, [_to_sql(self._payload[key]) for key in self._payload] + self._params)
+        return Result([])
+
+    def _run_delete(self, conn):
+        with conn:
+            conn.execute(f"DELETE FROM {self._table}{self._where_sql()}", self._params)
+        return Result([])
+
+class LocalClient:
+    """A Supabase-compatible client backed by one SQLite file."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # One connection shared by the engine's threads (the write-behind
+        # writer, asyncio.to_thread saves) and Streamlit's script threads.
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; skips an fsync per commit
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.path = path
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def close(self):
+        self.conn.close()
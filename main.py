@@ -1,57 +1,397 @@
 # main.py
 
-import importlib
-from config import SOURCES
+import asyncio
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import httpx
+
+import fetch_state
+import metrics
+import scheduler
+import seen_index
+import writer
+from config import (SOURCES, ENGINE_MODE, SCHEDULE_MODE, MAX_CONCURRENT_FETCHES, MAX_FETCHES_PER_HOST,
+                    STREAM_BATCH_SIZE, PARSE_WORKERS, SAVE_WORKERS, PARSE_QUEUE_SIZE, SAVE_QUEUE_SIZE)
 from database import init_db_client, save_jobs
+from scrapers import registry
+
+def new_jobs_since(source, new_before, found):
+    """
+    How many of a source's jobs were new this time, for the scheduler. Falls
+    back to the number found if the seen-links index isn't available.
+    """
+    if seen_index.is_warm():
+        return seen_index.new_count(source["name"]) - new_before
+    return found
+
+def record_failure(source, error):
+    """Counts a failed source in both the run report and its schedule."""
+    metrics.error(source["name"], error)
+    scheduler.record_failure(source, error)
+
+def dedupe_and_save(db_client, jobs, dedup_index):
+    """
+    Runs the dedup stage and saves whatever is left. Returns True if nothing
+    was lost, i.e. the save worked or every job was a duplicate.
+    """
+    import dedup
+    with metrics.timer(jobs[0].get("source"), "dedup"):
+        jobs = dedup.collapse_duplicates(jobs, dedup_index)
+    return save_jobs(db_client, jobs) if jobs else True
+
+def process_stream(db_client, source, dedup_index):
+    """
+    Saves a streamed feed (or JSON API) in STREAM_BATCH_SIZE batches as its
+    items arrive, so the first rows land before the download has finished.
+    """
+    found = 0
+    all_saved = True
+    batch = []
+    for job in registry.get_scraper(source["type"]).scrape_stream(source):
+        batch.append(job)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            found += len(batch)
+            all_saved = dedupe_and_save(db_client, batch, dedup_index) and all_saved
+            batch = []
+    if batch:
+        found += len(batch)
+        all_saved = dedupe_and_save(db_client, batch, dedup_index) and all_saved
+
+    print(f"  -> Streamed {found} jobs.")
+    if all_saved:
+        fetch_state.commit(source["url"])
+    return found, all_saved
 
-def run_engine():
+def process_source(db_client, source, dedup_index):
+    """
+    Runs the scraper for a single source and saves whatever it finds.
+    """
+    source_name = source["name"]
+    source_type = source["type"]
+
+    print(f"\n🔎 Processing Source: '{source_name}' (Type: {source_type})")
+    new_before = seen_index.new_count(source_name)
+
+    try:
+        # Big feeds marked "stream" (and JSON APIs) are parsed and saved batch by batch.
+        if registry.is_streamed(source):
+            found, all_saved = process_stream(db_client, source, dedup_index)
+            if all_saved:
+                scheduler.record_success(source, new_jobs_since(source, new_before, found), changed=found > 0)
+            return
+
+        # This is the core of our modular design. The registry finds the
+        # correct scraper module (e.g., "scrapers.rss_scraper" or
+        # "scrapers.browser_scraper") for the 'type' field, importing it the
+        # first time a source of that type runs.
+        scraper_module = registry.get_scraper(source_type)
+
+        # Now, we call the 'scrape' function that we know exists in that module.
+        jobs = scraper_module.scrape(source)
+
+        if not jobs:
+            print("  -> No jobs found for this source.")
+            scheduler.record_success(source, 0, changed=False)
+            return
+
+        print(f"  -> Found {len(jobs)} jobs.")
+
+        # Pass the collected jobs and the database client to our save function.
+        # Only once they're saved do we remember the feed as seen. A failed
+        # save leaves the source due, so it is retried next run.
+        if dedupe_and_save(db_client, jobs, dedup_index):
+            fetch_state.commit(source["url"])
+            scheduler.record_success(source, new_jobs_since(source, new_before, len(jobs)))
+
+    except ImportError as e:
+        print(f"  [ERROR] Could not find a scraper for type '{source_type}'. Please check your 'scrapers' folder.")
+        record_failure(source, e)
+    except Exception as e:
+        # This is a general catch-all to ensure one failed source doesn't crash the entire engine.
+        print(f"  [ERROR] An unexpected error occurred while processing {source_name}: {e}")
+        record_failure(source, e)
+
+async def save_in_background(db_client, jobs, save_lock):
+    """
+    Runs save_jobs off the event loop. The lock keeps saves one at a time,
+    since the RSS and browser stages both finish sources concurrently.
+    """
+    async with save_lock:
+        return await asyncio.to_thread(save_jobs, db_client, jobs)
+
+async def dedupe_and_save_async(db_client, jobs, dedup_index, save_lock):
+    """Async twin of dedupe_and_save: dedup on the loop, save in a thread."""
+    import dedup
+    with metrics.timer(jobs[0].get("source"), "dedup"):
+        jobs = dedup.collapse_duplicates(jobs, dedup_index)
+    return await save_in_background(db_client, jobs, save_lock) if jobs else True
+
+# --- NEW: Concurrent fetch engine for RSS (and JSON API) sources ---
+async def run_rss_sources_async(db_client, sources, save_lock, dedup_index):
+    """
+    Runs every RSS source through a three-stage pipeline over a single
+    shared httpx.AsyncClient:
+
+      fetch -> [raw feeds] -> parse (ParsePool processes) -> [jobs] -> dedupe + save
+
+    A global semaphore caps in-flight downloads and a per-host semaphore keeps
+    us from hammering hosts that serve many feeds. The queues between stages
+    are bounded, so when parsing or saving falls behind, the stage before it
+    waits instead of piling up feeds in memory. Total wall time is roughly
+    the slowest feed rather than the sum of all of them. Feeds marked
+    "stream", and JSON API sources, skip the pipeline: they are saved in
+    batches while they are still downloading.
+    """
+    if not sources:
+        return
+
+    # Imported here so the sequential engine never starts parser processes.
+    from scrapers.parse_pool import ParsePool
+    rss_scraper = registry.get_scraper("rss")
+
+    global_limit = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    host_limits = defaultdict(lambda: asyncio.Semaphore(MAX_FETCHES_PER_HOST))
+    raw_feeds = asyncio.Queue(maxsize=PARSE_QUEUE_SIZE)
+    parsed_feeds = asyncio.Queue(maxsize=SAVE_QUEUE_SIZE)
+
+    async def fetch(client, source):
+        # Take the host slot first so a source queued behind a busy host
+        # doesn't sit on one of the global slots while it waits.
+        host = urlparse(source["url"]).netloc
+        async with host_limits[host]:
+            async with global_limit:
+                try:
+                    content, error = await rss_scraper.fetch_async(client, source), None
+                except Exception as e:
+                    content, error = None, e
+                # Handing over inside the slot is the backpressure: while
+                # the parsers are behind, no new downloads start.
+                await raw_feeds.put((source, content, error))
+
+    async def parse_worker(pool):
+        while (item := await raw_feeds.get()) is not None:
+            source, content, error = item
+            print(f"\n🔎 Processing Source: '{source['name']}' (Type: rss)")
+
+            if error:
+                print(f"  [ERROR] An unexpected error occurred while fetching '{source['name']}': {error}")
+                record_failure(source, error)
+                continue
+
+            if content is None:
+                print("  -> Feed unchanged since last run, skipping.")
+                scheduler.record_success(source, 0, changed=False)
+                continue
+
+            try:
+                jobs = await pool.parse(source, content)
+            except Exception as e:
+                print(f"  [ERROR] An unexpected error occurred while parsing {source['name']}: {e}")
+                record_failure(source, e)
+                continue
+
+            if not jobs:
+                print(f"  -> No jobs found for '{source['name']}'.")
+                scheduler.record_success(source, 0, changed=False)
+                continue
+            await parsed_feeds.put((source, jobs))
+
+    async def save_worker():
+        while (item := await parsed_feeds.get()) is not None:
+            source, jobs = item
+            print(f"  -> Found {len(jobs)} jobs in '{source['name']}'.")
+            try:
+                new_before = seen_index.new_count(source["name"])
+                if await dedupe_and_save_async(db_client, jobs, dedup_index, save_lock):
+                    fetch_state.commit(source["url"])
+                    scheduler.record_success(source, new_jobs_since(source, new_before, len(jobs)))
+            except Exception as e:
+                print(f"  [ERROR] An unexpected error occurred while saving {source['name']}: {e}")
+                record_failure(source, e)
+
+    async def stream(client, source):
+        host = urlparse(source["url"]).netloc
+        async with host_limits[host]:
+            async with global_limit:
+                found = 0
+                all_saved = True
+                batch = []
+                new_before = seen_index.new_count(source["name"])
+                try:
+                    async for job in registry.get_scraper(source["type"]).stream_async(client, source):
+                        batch.append(job)
+                        if len(batch) >= STREAM_BATCH_SIZE:
+                            found += len(batch)
+                            all_saved = await dedupe_and_save_async(db_client, batch, dedup_index, save_lock) and all_saved
+                            batch = []
+                    if batch:
+                        found += len(batch)
+                        all_saved = await dedupe_and_save_async(db_client, batch, dedup_index, save_lock) and all_saved
+                except Exception as e:
+                    print(f"\n  [ERROR] An unexpected error occurred while streaming '{source['name']}': {e}")
+                    record_failure(source, e)
+                    return
+
+                print(f"\n🔎 Streamed Source: '{source['name']}' (Type: {source['type']}) -> {found} jobs.")
+                if all_saved:
+                    fetch_state.commit(source["url"])
+                    scheduler.record_success(source, new_jobs_since(source, new_before, found), changed=found > 0)
+
+    headers = {'User-Agent': rss_scraper.USER_AGENT}
+    limits = httpx.Limits(max_connections=MAX_CONCURRENT_FETCHES)
+    async with httpx.AsyncClient(headers=headers, timeout=rss_scraper.NETWORK_TIMEOUT,
+                                 follow_redirects=True, limits=limits) as client, ParsePool() as pool:
+        print(f"  -> [RSS] Fetching {len(sources)} feeds concurrently...")
+        stream_tasks = [asyncio.create_task(stream(client, source)) for source in sources if registry.is_streamed(source)]
+        fetch_tasks = [asyncio.create_task(fetch(client, source)) for source in sources if not registry.is_streamed(source)]
+        parsers = [asyncio.create_task(parse_worker(pool)) for _ in range(max(PARSE_WORKERS, 1))]
+        savers = [asyncio.create_task(save_worker()) for _ in range(SAVE_WORKERS)]
+
+        # Each stage is shut down once the one before it has drained.
+        await asyncio.gather(*fetch_tasks)
+        for _ in parsers:
+            await raw_feeds.put(None)
+        await asyncio.gather(*parsers)
+        for _ in savers:
+            await parsed_feeds.put(None)
+        await asyncio.gather(*savers)
+        await asyncio.gather(*stream_tasks)
+
+# --- NEW: Browser sources on one shared Chromium ---
+async def run_browser_sources_async(db_client, sources, save_lock, dedup_index):
+    """
+    Scrapes all browser sources in parallel pages of a single shared browser,
+    which is launched once here and shut down when the last source is done.
+    """
+    if not sources:
+        return
+
+    # Loaded here so RSS-only runs never import Playwright.
+    browser_scraper = registry.get_scraper("browser")
+    from scrapers.browser_pool import BrowserPool
+
+    finished = set()  # Sources whose scrape ran, whatever the outcome
+
+    async def scrape_and_save(pool, source):
+        try:
+            jobs = await browser_scraper.scrape_async(source, pool)
+        except Exception as e:
+            print(f"  [ERROR] An error occurred during browser automation for '{source['name']}': {e}")
+            record_failure(source, e)
+            return
+        finally:
+            finished.add(source["name"])
+
+        print(f"\n🔎 Processing Source: '{source['name']}' (Type: browser)")
+        if not jobs:
+            print("  -> No jobs found for this source.")
+            scheduler.record_success(source, 0, changed=False)
+            return
+        print(f"  -> Found {len(jobs)} jobs.")
+        new_before = seen_index.new_count(source["name"])
+        if await dedupe_and_save_async(db_client, jobs, dedup_index, save_lock):
+            scheduler.record_success(source, new_jobs_since(source, new_before, len(jobs)))
+
+    try:
+        async with BrowserPool() as pool:
+            await asyncio.gather(*(scrape_and_save(pool, source) for source in sources))
+    except Exception as e:
+        print(f"  [ERROR] The shared browser pool failed: {e}")
+        # E.g. Chromium isn't installed: every source that didn't get to run
+        # has failed, for the scheduler and the run report alike.
+        for source in sources:
+            if source["name"] not in finished:
+                record_failure(source, e)
+
+async def run_sources_async(db_client, rss_sources, browser_sources, dedup_index):
+    """Runs the RSS fetches and the browser pool side by side."""
+    save_lock = asyncio.Lock()
+
+    async def timed(stage, coro):
+        with metrics.timer(metrics.ENGINE, stage):
+            await coro
+
+    await asyncio.gather(
+        timed("rss_stage", run_rss_sources_async(db_client, rss_sources, save_lock, dedup_index)),
+        timed("browser_stage", run_browser_sources_async(db_client, browser_sources, save_lock, dedup_index)),
+    )
+
+def run_engine(mode=ENGINE_MODE, schedule=SCHEDULE_MODE):
     """
     This is the main engine. It connects to the DB, loops through the
     massive list of sources in config.py, dynamically loads the correct
     scraper tool for each source, runs it, and saves the results.
+
+    In "async" mode all RSS and JSON sources are fetched concurrently while
+    the browser sources share one Chromium; any other source types then run
+    through the regular loop.
+
+    With schedule="adaptive" only the sources that scheduler.py says are
+    due are run; schedule="all" runs every source.
     """
     print("🚀 Starting JobScout AI Engine...")
-    
+    metrics.start_run()
+
     # Initialize the database client at the very start of the run.
     db_client = init_db_client()
     if not db_client:
         print("Engine stopped due to database connection failure.")
         return
 
-    # Loop through every source defined in our config file.
-    for source in SOURCES:
-        source_name = source["name"]
-        source_type = source["type"]
-        
-        print(f"\n🔎 Processing Source: '{source_name}' (Type: {source_type})")
-        
-        try:
-            # This is the core of our modular design. It dynamically finds and
-            # loads the correct scraper module (e.g., "scrapers.rss_scraper"
-            # or "scrapers.browser_scraper") based on the 'type' field.
-            scraper_module = importlib.import_module(f"scrapers.{source_type}_scraper")
-            
-            # Now, we call the 'scrape' function that we know exists in that module.
-            jobs = scraper_module.scrape(source)
-            
-            if not jobs:
-                print("  -> No jobs found for this source.")
-                continue
+    # One near-duplicate index for the whole run, so the same posting from
+    # several feeds is only saved once. dedup pulls in numpy, so it's only
+    # imported once a run actually starts, not by everything that imports main.
+    import dedup
+    dedup_index = dedup.NearDuplicateIndex()
 
-            print(f"  -> Found {len(jobs)} jobs.")
-            
-            # Pass the collected jobs and the database client to our save function.
-            save_jobs(db_client, jobs)
+    # Broken and repeated entries in config.SOURCES are dropped up front.
+    all_sources = registry.load_sources(SOURCES)
+    sources = scheduler.due_sources(all_sources) if schedule == "adaptive" else all_sources
+    metrics.count(metrics.ENGINE, "sources_total", len(all_sources))
+    metrics.count(metrics.ENGINE, "sources_run", len(sources))
 
-        except ImportError:
-            print(f"  [ERROR] Could not find a scraper for type '{source_type}'. Please check your 'scrapers' folder.")
-        except Exception as e:
-            # This is a general catch-all to ensure one failed source doesn't crash the entire engine.
-            print(f"  [ERROR] An unexpected error occurred while processing {source_name}: {e}")
-            
+    # Warm the seen-links index up front, so its one-off cost isn't charged
+    # to whichever source happens to save first.
+    with metrics.timer(metrics.ENGINE, "warm_seen_index"):
+        if not seen_index.is_warm():
+            seen_index.warm(db_client)
+
+    # Jobs a previous run couldn't write go out first; then the background
+    # writer takes every save until the scrapers are done.
+    with metrics.timer(metrics.ENGINE, "replay_journal"):
+        writer.replay_journal(db_client)
+    writer.start(db_client)
+
+    try:
+        remaining_sources = sources
+        if mode == "async":
+            by_type = registry.group_by_type(sources)
+            # JSON APIs share the RSS stage's client and download slots.
+            rss_sources = by_type.pop("rss", []) + by_type.pop("json", [])
+            browser_sources = by_type.pop("browser", [])
+            remaining_sources = [source for group in by_type.values() for source in group]
+            with metrics.timer(metrics.ENGINE, "async_sources"):
+                asyncio.run(run_sources_async(db_client, rss_sources, browser_sources, dedup_index))
+
+        # Loop through every (remaining) source defined in our config file.
+        with metrics.timer(metrics.ENGINE, "sequential_sources"):
+            for source in remaining_sources:
+                process_source(db_client, source, dedup_index)
+    finally:
+        with metrics.timer(metrics.ENGINE, "drain_writer"):
+            writer.close()
+
+    # Source lists are updated by link, so this has to wait for the writer.
+    with metrics.timer(metrics.ENGINE, "save_source_lists"):
+        dedup.save_source_lists(db_client, dedup_index)
+    fetch_state.save()
+    scheduler.save()
+    seen_index.report()
+    metrics.write_report()
     print("\n✅ Engine run complete.")
 
 
 # This ensures the code only runs when you execute "python main.py" from the terminal.
 if __name__ == "__main__":
-    run_engine()
\ No newline at end of file
+    run_engine()
@@ -0,0 +1,304 @@
+# metrics.py
+
+# Structured instrumentation for an engine run. The engine, both scrapers and
+# save_jobs record per-source phase timings and counters here; at the end of
+# the run they are written to a JSON run report (and, optionally, a
+# Prometheus textfile) and compared with the previous run's report.
+#
+# Phases are named "fetch", "parse", "dedup", "seen_filter" and "db_write".
+# Dotted names are sub-phases that are already included in their parent:
+#   fetch.connect / fetch.tls / fetch.wait / fetch.download  (httpx trace;
+#       DNS lookup is part of connect)
+#   parse.classify
+# Counters are "bytes", "entries" (items in the feed or cards on the page),
+# "jobs", "rows_written" and "errors"; "new" and "duplicate" come from the
+# seen-links index.
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import seen_index
+from config import RUN_REPORT_PATH, PROMETHEUS_TEXTFILE
+
+ENGINE = "_engine"  # Pseudo-source for engine-wide stages
+REGRESSION_RATIO = 1.5        # A phase this many times slower than last run...
+REGRESSION_MIN_SECONDS = 1.0  # ...and at least this much slower is a regression
+SLOWEST_SOURCES_SHOWN = 5
+
+_lock = threading.Lock()  # Parsing and saving record from worker threads
+_started_at = None
+_phases = defaultdict(lambda: defaultdict(float))
+_counters = defaultdict(lambda: defaultdict(int))
+_errors = defaultdict(list)
+
+def start_run():
+    """Starts a fresh run, dropping anything recorded before."""
+    global _started_at
+    with _lock:
+        _phases.clear()
+        _counters.clear()
+        _errors.clear()
+    _started_at = time.time()
+
+def add_time(source_name, phase, seconds):
+    with _lock:
+        _phases[source_name][phase] += seconds
+
+@contextmanager
+def timer(source_name, phase):
+    """Adds the time spent inside the block to a source's phase."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(source_name, phase, time.perf_counter() - started)
+
+def count(source_name, counter, n=1):
+    with _lock:
+        _counters[source_name][counter] += n
+
+def error(source_name, err):
+    with _lock:
+        _counters[source_name]["errors"] += 1
+        _errors[source_name].append(str(err)[:300])
+
+def snapshot():
+    """Everything recorded so far as plain dicts, e.g. to send back from a worker process."""
+    with _lock:
+        return {
+            "phases": {name: dict(phases) for name, phases in _phases.items()},
+            "counters": {name: dict(counters) for name, counters in _counters.items()},
+            "errors": {name: list(errors) for name, errors in _errors.items()},
+        }
+
+def merge(recorded):
+    """Adds a snapshot() taken in another process to this run."""
+    with _lock:
+        for name, phases in recorded["phases"].items():
+            for phase, seconds in phases.items():
+                _phases[name][phase] += seconds
+        for name, counters in recorded["counters"].items():
+            for counter, n in counters.items():
+                _counters[name][counter] += n
+        for name, errors in recorded["errors"].items():
+            _errors[name].extend(errors)
+
+def timed_iter(source_name, phase, iterable):
+    """Yields from iterable, charging the time spent waiting for each item to a phase."""
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            add_time(source_name, phase, time.perf_counter() - started)
+        yield item
+
+async def timed_aiter(source_name, phase, aiterable):
+    """Async twin of timed_iter()."""
+    iterator = aiterable.__aiter__()
+    while True:
+        started = time.perf_counter()
+        try:
+            item = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            add_time(source_name, phase, time.perf_counter() - started)
+        yield item
+
+# --- HTTP phase breakdown through httpx's "trace" request extension ---
+_TRACE_PHASES = {
+    "connect_tcp": "fetch.connect",
+    "start_tls": "fetch.tls",
+    "receive_response_headers": "fetch.wait",
+    "receive_response_body": "fetch.download",
+}
+
+def _trace_handler(source_name, include_body):
+    started = {}
+
+    def handle(event_name, info):
+        # Events look like "connection.connect_tcp.started" or
+        # "http11.receive_response_body.complete".
+        step, _, state = event_name.rpartition(".")
+        step = step.rpartition(".")[2]
+        phase = _TRACE_PHASES.get(step)
+        if phase is None or (phase == "fetch.download" and not include_body):
+            return
+        if state == "started":
+            started[step] = time.perf_counter()
+        elif step in started:
+            add_time(source_name, phase, time.perf_counter() - started.pop(step))
+
+    return handle
+
+def http_trace(source_name, include_body=True):
+    """Trace callback for a sync httpx request: pass as extensions={"trace": ...}."""
+    return _trace_handler(source_name, include_body)
+
+def async_http_trace(source_name, include_body=True):
+    """
+    Trace callback for an httpx.AsyncClient request. Streamed responses should
+    pass include_body=False, since their body is read while we parse and save.
+    """
+    handle = _trace_handler(source_name, include_body)
+
+    async def trace(event_name, info):
+        handle(event_name, info)
+
+    return trace
+
+# --- Run report ---
+def _round(values):
+    return {key: round(value, 4) for key, value in sorted(values.items())}
+
+def build_report():
+    """Collects everything recorded this run into one JSON-serialisable dict."""
+    finished_at = time.time()
+    seen_stats = seen_index.stats()
+    with _lock:
+        names = (set(_phases) | set(_counters) | set(_errors) | set(seen_stats)) - {ENGINE}
+        sources = {}
+        for name in sorted(names):
+            counters = dict(_counters.get(name, {}))
+            counters.update(seen_stats.get(name, {}))
+            phases = _round(_phases.get(name, {}))
+            sources[name] = {
+                "total_seconds": round(sum(v for k, v in phases.items() if "." not in k), 4),
+                "phases": phases,
+                "counters": dict(sorted(counters.items())),
+                "errors": list(_errors.get(name, [])),
+            }
+        engine = {"stages": _round(_phases.get(ENGINE, {})), "counters": dict(_counters.get(ENGINE, {}))}
+
+    totals = {"phases": defaultdict(float), "counters": defaultdict(int)}
+    for entry in sources.values():
+        for phase, seconds in entry["phases"].items():
+            totals["phases"][phase] += seconds
+        for counter, value in entry["counters"].items():
+            totals["counters"][counter] += value
+
+    started_at = _started_at or finished_at
+    return {
+        "started_at": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+        "duration_seconds": round(finished_at - started_at, 3),
+        "engine": engine,
+        "totals": {"phases": _round(totals["phases"]), "counters": dict(sorted(totals["counters"].items()))},
+        "sources": sources,
+    }
+
+def compare(previous, current):
+    """
+    Lists what got worse since the previous report: phases that slowed down by
+    REGRESSION_RATIO (and at least REGRESSION_MIN_SECONDS), and sources that
+    started failing.
+    """
+    regressions = []
+
+    def check(scope, metric, before, after):
+        if before is not None and after > before * REGRESSION_RATIO and after - before >= REGRESSION_MIN_SECONDS:
+            regressions.append({"scope": scope, "metric": metric, "previous": before, "current": after})
+
+    check("run", "duration_seconds", previous.get("duration_seconds"), current["duration_seconds"])
+    for stage, seconds in current["engine"]["stages"].items():
+        check("engine", stage, previous.get("engine", {}).get("stages", {}).get(stage), seconds)
+
+    previous_sources = previous.get("sources", {})
+    for name, entry in current["sources"].items():
+        before = previous_sources.get(name)
+        if before is None:
+            continue
+        check(name, "total_seconds", before.get("total_seconds"), entry["total_seconds"])
+        for phase, seconds in entry["phases"].items():
+            check(name, phase, before.get("phases", {}).get(phase), seconds)
+        if entry["counters"].get("errors") and not before.get("counters", {}).get("errors"):
+            regressions.append({"scope": name, "metric": "errors", "previous": 0, "current": entry["counters"]["errors"]})
+    return regressions
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text(report):
+    """Renders a report in the Prometheus text exposition format."""
+    lines = [
+        "# HELP jobscout_run_duration_seconds Wall time of the last engine run.",
+        "# TYPE jobscout_run_duration_seconds gauge",
+        f"jobscout_run_duration_seconds {report['duration_seconds']}",
+        "# HELP jobscout_run_timestamp_seconds When the last engine run finished.",
+        "# TYPE jobscout_run_timestamp_seconds gauge",
+        f"jobscout_run_timestamp_seconds {int(time.time())}",
+        "# HELP jobscout_engine_stage_seconds Wall time of each engine stage in the last run.",
+        "# TYPE jobscout_engine_stage_seconds gauge",
+    ]
+    for stage, seconds in report["engine"]["stages"].items():
+        lines.append(f'jobscout_engine_stage_seconds{{stage="{_escape_label(stage)}"}} {seconds}')
+
+    lines += [
+        "# HELP jobscout_source_phase_seconds Time spent per source and phase in the last run.",
+        "# TYPE jobscout_source_phase_seconds gauge",
+    ]
+    for name, entry in report["sources"].items():
+        for phase, seconds in entry["phases"].items():
+            lines.append(f'jobscout_source_phase_seconds{{source="{_escape_label(name)}",phase="{_escape_label(phase)}"}} {seconds}')
+
+    counters = sorted({counter for entry in report["sources"].values() for counter in entry["counters"]})
+    for counter in counters:
+        metric = f"jobscout_source_{counter}"
+        lines += [f"# HELP {metric} Per-source '{counter}' count in the last run.", f"# TYPE {metric} gauge"]
+        for name, entry in report["sources"].items():
+            if counter in entry["counters"]:
+                lines.append(f'{metric}{{source="{_escape_label(name)}"}} {entry["counters"][counter]}')
+    return "\n".join(lines) + "\n"
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def print_summary(report):
+    slowest = sorted(report["sources"].items(), key=lambda item: -item[1]["total_seconds"])[:SLOWEST_SOURCES_SHOWN]
+    if slowest:
+        print("\n⏱️ Slowest sources this run:")
+        for name, entry in slowest:
+            phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in entry["phases"].items() if "." not in phase)
+            print(f"  {name}: {entry['total_seconds']:.2f}s ({phases})")
+    if report.get("regressions"):
+        print("\n⚠️ Regressions since the previous run:")
+        for item in report["regressions"]:
+            print(f"  {item['scope']} / {item['metric']}: {item['previous']} -> {item['current']}")
+
+def write_report():
+    """
+    Writes the JSON run report (keeping the previous one next to it for
+    comparison) and, if JOBSCOUT_PROMETHEUS_TEXTFILE is set, a textfile for
+    node_exporter's textfile collector.
+    """
+    report = build_report()
+    previous = None
+    try:
+        with open(RUN_REPORT_PATH, encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        pass
+    report["regressions"] = compare(previous, report) if previous else []
+
+    try:
+        if previous:
+            os.replace(RUN_REPORT_PATH, RUN_REPORT_PATH.replace(".json", ".prev.json"))
+        _write_atomic(RUN_REPORT_PATH, json.dumps(report, indent=1))
+        if PROMETHEUS_TEXTFILE:
+            _write_atomic(PROMETHEUS_TEXTFILE, prometheus_text(report))
+    except OSError as e:
+        print(f"  [Warning] Could not write the run report: {e}")
+
+    print_summary(report)
+    return report
@@ -0,0 +1,79 @@
+# normalizer.py
+
+# Turns the HTML summaries that feeds ship with into clean, bounded plain
+# text before they are stored. A streaming tag stripper built on the standard
+# library's HTMLParser does the work. HTMLParser recovers from unclosed tags,
+# stray '<' and unknown entities by itself; the one input it still raises on
+# is a "<![" marked section it doesn't know, such as a CDATA keyword cut off
+# by a truncated summary ("<![CDAT") or a mangled conditional comment.
+# BeautifulSoup's 'html.parser' mode is the same parser and fails the same
+# way, so those sections are re-read as plain text instead.
+
+import html
+import re
+from html.parser import HTMLParser
+from config import MAX_DESCRIPTION_LENGTH
+
+_WHITESPACE = re.compile(r"\s+")
+# Tags whose text content is never shown to a reader.
+_SKIPPED_TAGS = {"script", "style", "head", "title", "noscript", "template"}
+
+class _TextExtractor(HTMLParser):
+    """Collects the text of a document, with a space wherever a tag was."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)  # Entities are decoded for us
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+def _extract_text(markup):
+    extractor = _TextExtractor()
+    extractor.feed(markup)
+    extractor.close()
+    return "".join(extractor.parts)
+
+def strip_html(markup):
+    """Returns the visible text of an HTML fragment with whitespace collapsed."""
+    try:
+        text = _extract_text(markup)
+    except AssertionError:
+        # An unknown "<![" section (see above): keep it as text.
+        text = _extract_text(markup.replace("<![", "&lt;!["))
+    return _WHITESPACE.sub(" ", text).strip()
+
+def truncate(text, max_length=MAX_DESCRIPTION_LENGTH):
+    """Cuts text to at most max_length characters, on a word boundary where possible."""
+    if not max_length or len(text) <= max_length:
+        return text
+    cut = text[:max_length - 1]
+    space = cut.rfind(" ")
+    if space > max_length // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+def normalize_description(text, max_length=MAX_DESCRIPTION_LENGTH):
+    """
+    The description-normalizer stage: strips HTML (if any), decodes entities,
+    collapses whitespace and truncates to max_length characters.
+    """
+    if not text:
+        return text
+    if "<" in text and ">" in text:
+        text = strip_html(text)
+    else:
+        text = _WHITESPACE.sub(" ", html.unescape(text)).strip()
+    return truncate(text, max_length)
@@ -0,0 +1,102 @@
+# queries.py
+
+# The dashboard's query layer. Filters and pagination are pushed down to
+# Supabase so the app only ever downloads the handful of rows it shows,
+# no matter how big the 'jobs' table gets.
+
+from datetime import datetime, timedelta, timezone
+from job_record import JobBatch
+from utils import ROLE_KEYWORDS, EXPERIENCE_KEYWORDS
+
+# Everything a job card needs. The description is fetched separately, on demand.
+CARD_COLUMNS = "id, title, link, company, location, job_role, experience_level, source, published_date, created_at"
+CARD_FIELDS = tuple(CARD_COLUMNS.split(", "))
+
+ALL_ROLES = "All Roles"
+ALL_EXPERIENCE = "All Experience Levels"
+ALL_TIME = "All Time"
+FRESHNESS_DAYS = {"Today": 1, "This Week": 7, "This Month": 30}
+
+def role_options():
+    """Every label classify_job can produce for job_role, plus the catch-all."""
+    return [ALL_ROLES] + sorted(list(ROLE_KEYWORDS) + ["Other"])
+
+def experience_options():
+    return [ALL_EXPERIENCE] + sorted(list(EXPERIENCE_KEYWORDS) + ["Not Specified"])
+
+def freshness_options():
+    return [ALL_TIME] + list(FRESHNESS_DAYS)
+
+def _apply_filters(query, role, experience, location, freshness):
+    if role and role != ALL_ROLES:
+        query = query.eq('job_role', role)
+    if experience and experience != ALL_EXPERIENCE:
+        query = query.eq('experience_level', experience)
+    if location:
+        # Escape the LIKE wildcards so the user's text is matched literally.
+        escaped = location.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.ilike('location', f"%{escaped}%")
+    if freshness in FRESHNESS_DAYS:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=FRESHNESS_DAYS[freshness])
+        query = query.gte('created_at', cutoff.isoformat())
+    return query
+
+def fetch_job_page(client, role=None, experience=None, location=None, freshness=None, page=0, page_size=10):
+    """
+    Returns one page of job cards (a list of dicts, newest first) matching
+    the filters, using LIMIT/OFFSET on the server.
+    """
+    start = page * page_size
+    query = client.table('jobs').select(CARD_COLUMNS)
+    query = _apply_filters(query, role, experience, location, freshness)
+    response = query.order('created_at', desc=True).range(start, start + page_size - 1).execute()
+    return response.data or []
+
+def count_jobs(client, role=None, experience=None, location=None, freshness=None):
+    """Returns how many jobs match the filters, without downloading any rows."""
+    query = client.table('jobs').select('id', count='exact', head=True)
+    response = _apply_filters(query, role, experience, location, freshness).execute()
+    return response.count or 0
+
+def cards_frame(rows):
+    """A DataFrame of card rows, built column by column through a JobBatch."""
+    return JobBatch.from_jobs(rows, CARD_FIELDS).to_frame()
+
+def fetch_description(client, job_id):
+    """Fetches a single job's description, for when a user asks to see it."""
+    response = client.table('jobs').select('description').eq('id', job_id).limit(1).execute()
+    if response.data:
+        return response.data[0].get('description')
+    return None
+
+def fetch_all_cards(client, max_rows, page_size=1000):
+    """
+    Downloads up to max_rows job cards (no descriptions), newest first, in
+    keyset-paginated pages. Used by the dashboard's in-memory mode.
+    """
+    rows = []
+    last_id = None
+    while len(rows) < max_rows:
+        query = client.table('jobs').select(CARD_COLUMNS).order('id', desc=True).limit(min(page_size, max_rows - len(rows)))
+        if last_id is not None:
+            query = query.lt('id', last_id)
+        page = query.execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        last_id = page[-1]["id"]
+    return rows
+
+def fetch_cards_since(client, last_id, page_size=1000):
+    """
+    Downloads the job cards saved after the one with id last_id, oldest
+    first, in keyset-paginated pages. Used by the dashboard's "live" mode.
+    """
+    rows = []
+    while True:
+        page = (client.table('jobs').select(CARD_COLUMNS).gt('id', last_id).order('id')
+                .limit(page_size).execute().data or [])
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        last_id = page[-1]["id"]
@@ -0,0 +1,129 @@
+# reclassify.py
+
+# Re-runs the classifiers in utils.py over every row already in the 'jobs'
+# table and writes back only the labels that changed. Use this after editing
+# the keyword lists instead of re-scraping everything:
+#
+#     python reclassify.py [--page-size 1000] [--workers 4] [--dry-run]
+#
+# The table is streamed in keyset-paginated pages (id > last_id), classified
+# in a process pool, and at most a few pages are held in memory at a time.
+
+import argparse
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from database import init_db_client
+from job_record import JobBatch
+from utils import classify_jobs
+
+PAGE_SIZE = 1000
+WRITE_BATCH_SIZE = 500
+PAGES_IN_FLIGHT_PER_WORKER = 2
+
+def relabel_page(rows):
+    """
+    Classifies one page of rows and returns only those whose labels changed,
+    trimmed down to the id and the new labels, as a JobBatch (a few flat
+    lists pickle back from the worker far smaller than a dict per row).
+    Runs in a worker process.
+    """
+    labels = classify_jobs(rows)
+    page = JobBatch.from_jobs(rows, ("id", "job_role", "experience_level"))
+    new_roles = [job_role for job_role, _, _ in labels]
+    new_levels = [experience_level for _, experience_level, _ in labels]
+    changed = [old_role != job_role or old_level != experience_level
+               for old_role, old_level, job_role, experience_level
+               in zip(page.columns["job_role"], page.columns["experience_level"], new_roles, new_levels)]
+    page.columns["job_role"] = new_roles
+    page.columns["experience_level"] = new_levels
+    return page.select(changed)
+
+def stream_pages(client, page_size):
+    """Yields the 'jobs' table one page at a time, ordered by id."""
+    last_id = None
+    while True:
+        query = client.table('jobs').select('id, title, job_role, experience_level').order('id').limit(page_size)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.execute().data or []
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]["id"]
+        if len(rows) < page_size:
+            return
+
+def write_changes(client, changed, dry_run):
+    """
+    Writes changed labels back by id, in fixed-size batches. Returns how many
+    rows were written. Rows are only ever updated, never upserted: a row that
+    was deleted since it was read (dedup.py --apply) simply isn't matched,
+    instead of coming back as a stub. Rows that get the same pair of labels
+    share one UPDATE ... WHERE id IN (...).
+    """
+    if dry_run:
+        return 0
+    ids_by_labels = defaultdict(list)
+    for job_id, job_role, experience_level in zip(changed.column("id"), changed.column("job_role"),
+                                                  changed.column("experience_level")):
+        ids_by_labels[(job_role, experience_level)].append(job_id)
+
+    written = 0
+    for (job_role, experience_level), ids in ids_by_labels.items():
+        for i in range(0, len(ids), WRITE_BATCH_SIZE):
+            batch = ids[i:i + WRITE_BATCH_SIZE]
+            try:
+                (client.table('jobs').update({"job_role": job_role, "experience_level": experience_level})
+                 .in_('id', batch).execute())
+                written += len(batch)
+            except Exception as e:
+                print(f"  [ERROR] Could not write a batch of {len(batch)} relabelled jobs: {e}")
+    return written
+
+def run_reclassification(page_size=PAGE_SIZE, workers=None, dry_run=False):
+    """
+    Streams the whole 'jobs' table through the classifiers and writes back
+    the rows whose job_role or experience_level changed.
+    """
+    print("🏷️ Starting JobScout reclassification...")
+    client = init_db_client()
+    if not client:
+        print("Reclassification stopped due to database connection failure.")
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * PAGES_IN_FLIGHT_PER_WORKER
+    scanned = changed_total = written_total = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+
+        def drain_oldest():
+            nonlocal changed_total, written_total
+            changed = in_flight.popleft().result()
+            changed_total += len(changed)
+            written_total += write_changes(client, changed, dry_run)
+
+        for rows in stream_pages(client, page_size):
+            scanned += len(rows)
+            in_flight.append(pool.submit(relabel_page, rows))
+            # Backpressure: never hold more than a few pages at once.
+            if len(in_flight) >= max_in_flight:
+                drain_oldest()
+            print(f"  -> Scanned {scanned} jobs, {changed_total} relabelled so far...")
+
+        while in_flight:
+            drain_oldest()
+
+    action = "would be relabelled (dry run)" if dry_run else "relabelled"
+    print(f"\n✅ Reclassification complete. Scanned {scanned} jobs; {changed_total} {action}, {written_total} written.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run the job classifiers over the whole jobs table.")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Rows fetched per keyset page.")
+    parser.add_argument("--workers", type=int, default=None, help="Classifier processes (default: CPU count).")
+    parser.add_argument("--dry-run", action="store_true", help="Count changes without writing them.")
+    args = parser.parse_args()
+    run_reclassification(page_size=args.page_size, workers=args.workers, dry_run=args.dry_run)
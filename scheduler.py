@@ -0,0 +1,124 @@
+# scheduler.py
+
+# Decides which sources are due on each (hourly) engine run. Every source
+# keeps a small history in a local state file -- how many new jobs it yields,
+# how often its content changes, and how often it fails -- and gets its own
+# next-due time from that:
+#
+#   * sources that keep producing new jobs are polled every run;
+#   * quiet or unchanged sources back off gradually, up to MAX_INTERVAL_HOURS;
+#   * failing sources back off exponentially, and after
+#     CIRCUIT_BREAKER_FAILURES failures in a row they are parked for
+#     PARK_DAYS, then probed once more (and re-parked if still dead).
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from config import (SCHEDULE_STATE_PATH, MIN_INTERVAL_HOURS, MAX_INTERVAL_HOURS, MAX_BACKOFF_HOURS,
+                    CIRCUIT_BREAKER_FAILURES, PARK_DAYS)
+
+# Cron doesn't fire at exactly the same second every hour.
+DUE_GRACE = timedelta(minutes=10)
+YIELD_SMOOTHING = 0.3  # Weight of the latest run in the moving average of new jobs
+
+_state = None
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def source_key(source):
+    return f"{source['type']}:{source['url']}"
+
+def _get_state():
+    global _state
+    if _state is None:
+        try:
+            with open(SCHEDULE_STATE_PATH, encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+def _entry(source):
+    return _get_state().setdefault(source_key(source), {
+        "interval_hours": MIN_INTERVAL_HOURS,
+        "next_due": None,
+        "runs": 0,
+        "changed_runs": 0,
+        "total_new": 0,
+        "avg_new": 0.0,
+        "consecutive_failures": 0,
+        "total_failures": 0,
+        "last_error": None,
+        "last_success": None,
+        "parked_until": None,
+    })
+
+def is_due(source, now=None):
+    now = now or _now()
+    next_due = _entry(source)["next_due"]
+    return next_due is None or datetime.fromisoformat(next_due) <= now + DUE_GRACE
+
+def due_sources(sources, now=None):
+    """Returns the sources that should run now, and prints a short summary."""
+    now = now or _now()
+    due = [source for source in sources if is_due(source, now)]
+    parked = sum(1 for source in sources if _entry(source)["parked_until"] and not is_due(source, now))
+    print(f"🗓️ {len(due)} of {len(sources)} sources are due this run ({parked} parked after repeated failures).")
+    return due
+
+def record_success(source, new_jobs, changed=True):
+    """
+    Records a run that reached the source. Sources that yielded new jobs are
+    polled more often; unchanged or empty ones are polled less often.
+    """
+    entry = _entry(source)
+    now = _now()
+    entry["runs"] += 1
+    entry["changed_runs"] += 1 if changed else 0
+    entry["total_new"] += new_jobs
+    entry["avg_new"] = (1 - YIELD_SMOOTHING) * entry["avg_new"] + YIELD_SMOOTHING * new_jobs
+    entry["consecutive_failures"] = 0
+    entry["parked_until"] = None
+    entry["last_success"] = now.isoformat()
+
+    if new_jobs:
+        interval = entry["interval_hours"] / 2
+    elif changed:
+        interval = entry["interval_hours"] * 1.25
+    else:
+        interval = entry["interval_hours"] * 1.5
+    entry["interval_hours"] = min(MAX_INTERVAL_HOURS, max(MIN_INTERVAL_HOURS, interval))
+    entry["next_due"] = (now + timedelta(hours=entry["interval_hours"])).isoformat()
+
+def record_failure(source, error):
+    """Records a failed run: exponential backoff, then the circuit breaker."""
+    entry = _entry(source)
+    now = _now()
+    entry["runs"] += 1
+    entry["consecutive_failures"] += 1
+    entry["total_failures"] += 1
+    entry["last_error"] = str(error)[:300]
+
+    if entry["consecutive_failures"] >= CIRCUIT_BREAKER_FAILURES:
+        parked_until = now + timedelta(days=PARK_DAYS)
+        entry["parked_until"] = parked_until.isoformat()
+        entry["next_due"] = parked_until.isoformat()
+        print(f"  -> 🔌 '{source['name']}' failed {entry['consecutive_failures']} times in a row; parked for {PARK_DAYS} days.")
+        return
+
+    backoff = min(MAX_BACKOFF_HOURS, MIN_INTERVAL_HOURS * 2 ** entry["consecutive_failures"])
+    entry["next_due"] = (now + timedelta(hours=backoff)).isoformat()
+
+def save():
+    """Writes the schedule state back to disk."""
+    if _state is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(SCHEDULE_STATE_PATH) or ".", exist_ok=True)
+        tmp_path = SCHEDULE_STATE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_state, f, indent=1)
+        os.replace(tmp_path, SCHEDULE_STATE_PATH)
+    except OSError as e:
+        print(f"  [Warning] Could not save the schedule state: {e}")
@@ -0,0 +1,56 @@
+# scrapers/browser_pool.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from config import MAX_BROWSER_PAGES
+
+class BrowserPool:
+    """
+    Launches a single headless Chromium for the whole engine run and hands
+    each browser source its own fresh context (cookies, cache and storage are
+    never shared between sites). At most `max_pages` sources scrape at once.
+
+    Use it as an async context manager so the browser is always shut down:
+
+        async with BrowserPool() as pool:
+            async with pool.page() as page:
+                await page.goto(...)
+    """
+
+    def __init__(self, max_pages=MAX_BROWSER_PAGES):
+        self.max_pages = max_pages
+        self._playwright = None
+        self._browser = None
+        self._slots = None
+
+    async def start(self):
+        print(f"  -> [Browser] Launching shared Chromium (up to {self.max_pages} pages in parallel)...")
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._slots = asyncio.Semaphore(self.max_pages)
+        return self
+
+    async def close(self):
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @asynccontextmanager
+    async def page(self):
+        """Yields a page in a brand-new context, closing the context afterwards."""
+        async with self._slots:
+            context = await self._browser.new_context()
+            try:
+                yield await context.new_page()
+            finally:
+                await context.close()
@@ -1,83 +1,262 @@
 # scrapers/browser_scraper.py
 
-from playwright.sync_api import sync_playwright
-from utils import classify_role, classify_experience
-from bs4 import BeautifulSoup # We might use this for cleaning descriptions
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import urlparse
+import metrics
+from job_record import Job
+from config import LIGHTWEIGHT_PAGE_LOAD
+from normalizer import normalize_description
+from scrapers.browser_pool import BrowserPool
+from utils import classify_job
 
-def scrape(source):
+# --- NEW: Bulk extraction script ---
+# Runs inside the page and reads every card in one go, so a whole page costs a
+# single Playwright round-trip instead of several per card. Missing optional
+# fields come back as null and get their defaults on the Python side.
+BULK_EXTRACT_JS = """
+([selectors, maxCards]) => {
+    const textOf = (root, selector) => {
+        if (!selector) return null;
+        const el = root.querySelector(selector);
+        return el ? el.innerText.trim() : null;
+    };
+    let cards = Array.from(document.querySelectorAll(selectors.job_card));
+    const total = cards.length;
+    if (maxCards) cards = cards.slice(0, maxCards);
+    const rows = [];
+    for (const card of cards) {
+        const titleEl = card.querySelector(selectors.title);
+        const linkEl = card.querySelector(selectors.link);
+        // Core data must exist, otherwise we skip the card.
+        if (!titleEl || !linkEl) continue;
+        rows.push({
+            title: titleEl.innerText.trim(),
+            link: linkEl.getAttribute("href"),
+            company: textOf(card, selectors.company),
+            description: textOf(card, selectors.description),
+            location: textOf(card, selectors.location),
+        });
+    }
+    return { total, rows };
+}
+"""
+
+def build_job(source, title, link, company=None, description=None, location=None):
+    """Turns the raw fields of one card into a Job record."""
+    if link and not link.startswith('http'):
+        link = source.get('base_url', '') + link
+
+    # Use our AI utility to classify the role and experience in one pass
+    with metrics.timer(source["name"], "parse.classify"):
+        job_role, experience_level, _ = classify_job(title)
+
+    return Job(
+        title=title,
+        link=link,
+        source=source["name"],
+        company=company or "Not Specified",
+        description=normalize_description(description) or "No description",
+        location=location or "Not Specified",
+        job_role=job_role,
+        experience_level=experience_level,
+    )
+
+async def extract_bulk(page, source):
+    """Reads every card's fields with a single evaluate() call."""
+    result = await page.evaluate(BULK_EXTRACT_JS, [source["selectors"], source.get("max_cards")])
+    print(f"  -> Found {result['total']} potential job cards on {source['name']}.")
+    metrics.count(source["name"], "entries", result["total"])
+    return [
+        build_job(source, row["title"], row["link"], row["company"], row["description"], row["location"])
+        for row in result["rows"]
+    ]
+
+async def extract_with_locators(page, source):
     """
-    Scrapes jobs using a headless browser, with more robust and defensive logic
-    to handle missing elements on individual job cards.
+    The original card-by-card extraction through Playwright locators. Several
+    round-trips per card, but it supports Playwright-only selector syntax.
     """
-    
     jobs_list = []
-    
-    print(f"  -> [Browser] Launching browser to scrape {source['name']}...")
-    
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            page.goto(source["url"], timeout=60000) # 60-second timeout to load the page
-            
-            # Wait for the main container of job listings to appear
-            page.wait_for_selector(source["selectors"]["job_card"], timeout=30000)
-            
-            job_cards = page.locator(source["selectors"]["job_card"]).all()
-            print(f"  -> Found {len(job_cards)} potential job cards on the page.")
-
-            # Limit to the first 20 cards to be respectful to the site and improve speed
-            for card in job_cards[:20]:
-                try:
-                    # --- UPGRADED: Defensive data extraction ---
-                    # For each piece of data, we check if the element exists before trying to get its text.
-                    # This prevents one bad card from stopping the whole scrape.
-                    
-                    title_element = card.locator(source["selectors"]["title"])
-                    link_element = card.locator(source["selectors"]["link"])
-                    
-                    # Core data must exist, otherwise we skip the card.
-                    if not title_element.count() or not link_element.count():
-                        continue
-
-                    title = title_element.inner_text().strip()
-                    link = link_element.get_attribute('href')
-                    
-                    if link and not link.startswith('http'):
-                        link = source.get('base_url', '') + link
-
-                    # Safely get optional details with default values
-                    company_selector = source["selectors"].get("company")
-                    company = card.locator(company_selector).inner_text().strip() if company_selector and card.locator(company_selector).count() > 0 else "Not Specified"
-
-                    desc_selector = source["selectors"].get("description")
-                    description = card.locator(desc_selector).inner_text().strip() if desc_selector and card.locator(desc_selector).count() > 0 else "No description"
-                    
-                    loc_selector = source["selectors"].get("location")
-                    location = card.locator(loc_selector).inner_text().strip() if loc_selector and card.locator(loc_selector).count() > 0 else "Not Specified"
-
-                    job = {
-                        "title": title,
-                        "link": link,
-                        "source": source["name"],
-                        "company": company,
-                        "description": description,
-                        "location": location,
-                        # Use our AI utility to classify the role and experience
-                        "job_role": classify_role(title),
-                        "experience_level": classify_experience(title)
-                    }
-                    jobs_list.append(job)
-
-                except Exception as e:
-                    print(f"    [Warning] Could not parse a job card for {source['name']}: {e}")
-                    continue
-
-            browser.close()
-            
-    except Exception as e:
-        print(f"  [ERROR] An error occurred during browser automation for '{source['name']}': {e}")
-        return []
-
-    return jobs_list
\ No newline at end of file
+    job_cards = await page.locator(source["selectors"]["job_card"]).all()
+    print(f"  -> Found {len(job_cards)} potential job cards on {source['name']}.")
+    metrics.count(source["name"], "entries", len(job_cards))
+
+    max_cards = source.get("max_cards")
+    for card in job_cards[:max_cards]:
+        try:
+            # --- UPGRADED: Defensive data extraction ---
+            # For each piece of data, we check if the element exists before trying to get its text.
+            # This prevents one bad card from stopping the whole scrape.
+
+            title_element = card.locator(source["selectors"]["title"])
+            link_element = card.locator(source["selectors"]["link"])
+
+            # Core data must exist, otherwise we skip the card.
+            if not await title_element.count() or not await link_element.count():
+                continue
+
+            title = (await title_element.inner_text()).strip()
+            link = await link_element.get_attribute('href')
+
+            # Safely get optional details with default values
+            company = await _optional_text(card, source["selectors"].get("company"))
+            description = await _optional_text(card, source["selectors"].get("description"))
+            location = await _optional_text(card, source["selectors"].get("location"))
+
+            jobs_list.append(build_job(source, title, link, company, description, location))
+
+        except Exception as e:
+            print(f"    [Warning] Could not parse a job card for {source['name']}: {e}")
+            continue
+
+    return jobs_list
+
+# --- NEW: Lightweight page loading ---
+def page_load_options(source):
+    """
+    Resolves a source's "page_load" option. "lightweight" uses the defaults
+    from config.py, a dict overrides them, and anything else means a full load.
+    """
+    option = source.get("page_load")
+    if option == "lightweight":
+        return dict(LIGHTWEIGHT_PAGE_LOAD)
+    if isinstance(option, dict):
+        return {**LIGHTWEIGHT_PAGE_LOAD, **option}
+    return None
+
+def _base_domain(host):
+    # Good enough for our sources: "cdn.indeed.com" and "www.indeed.com" both
+    # become "indeed.com".
+    return ".".join(host.split(".")[-2:]) if host else ""
+
+async def load_page(page, source, options):
+    """
+    Opens the source's URL and waits for its job cards. With lightweight
+    options, unneeded resource types and third-party requests are aborted and
+    we stop at DOMContentLoaded instead of the full load event.
+    Returns stats about the load: elapsed ms, bytes received and blocked requests.
+    """
+    stats = {"elapsed_ms": 0, "bytes": 0, "blocked": Counter()}
+    pending_sizes = []
+
+    async def add_sizes(request):
+        # Measured from the wire, so chunked responses (no content-length) count too.
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        stats["bytes"] += max(sizes["responseBodySize"], 0) + max(sizes["responseHeadersSize"], 0)
+
+    def count_bytes(request):
+        pending_sizes.append(asyncio.ensure_future(add_sizes(request)))
+
+    page.on("requestfinished", count_bytes)
+
+    wait_until = "load"
+    if options:
+        wait_until = options["wait_until"]
+        blocked_types = set(options["block_resource_types"])
+        allowed_domains = {_base_domain(urlparse(source["url"]).hostname)}
+        allowed_domains.update(options.get("allowed_domains", []))
+
+        async def handle_route(route):
+            request = route.request
+            if request.resource_type in blocked_types:
+                stats["blocked"][request.resource_type] += 1
+                return await route.abort()
+            if options["block_third_party"] and _base_domain(urlparse(request.url).hostname) not in allowed_domains:
+                stats["blocked"]["third-party"] += 1
+                return await route.abort()
+            await route.continue_()
+
+        await page.route("**/*", handle_route)
+
+    started = time.perf_counter()
+    await page.goto(source["url"], wait_until=wait_until, timeout=60000) # 60-second timeout to load the page
+
+    # Wait for the main container of job listings to appear
+    await page.wait_for_selector(source["selectors"]["job_card"], timeout=30000)
+    stats["elapsed_ms"] = int((time.perf_counter() - started) * 1000)
+    await asyncio.gather(*pending_sizes)
+    return stats
+
+def describe_load(source, stats):
+    blocked = sum(stats["blocked"].values())
+    details = ", ".join(f"{kind}: {count}" for kind, count in stats["blocked"].most_common())
+    line = f"  -> [Browser] {source['name']} ready in {stats['elapsed_ms']} ms, {stats['bytes'] // 1024} KB received"
+    if blocked:
+        line += f", blocked {blocked} requests ({details})"
+    return line
+
+async def scrape_async(source, pool):
+    """
+    Scrapes jobs using a page from the engine's shared browser pool.
+
+    By default every card is read in one bulk evaluate() call; set
+    "extraction": "locator" on a source to use per-card locators instead,
+    and "max_cards" to cap how many cards are taken (default: all of them).
+    Set "page_load": "lightweight" to skip images, fonts, trackers and friends.
+    Errors propagate, so the engine can count them against the source.
+    """
+    print(f"  -> [Browser] Opening a page to scrape {source['name']}...")
+
+    async with pool.page() as page:
+        stats = await load_page(page, source, page_load_options(source))
+        print(describe_load(source, stats))
+        metrics.add_time(source["name"], "fetch", stats["elapsed_ms"] / 1000)
+        metrics.count(source["name"], "bytes", stats["bytes"])
+
+        with metrics.timer(source["name"], "parse"):
+            if source.get("extraction", "bulk") == "locator":
+                jobs = await extract_with_locators(page, source)
+            else:
+                jobs = await extract_bulk(page, source)
+        metrics.count(source["name"], "jobs", len(jobs))
+        return jobs
+
+async def _optional_text(card, selector):
+    """Returns the stripped text of an optional element, or None if it's missing."""
+    if not selector:
+        return None
+    element = card.locator(selector)
+    if await element.count() > 0:
+        return (await element.inner_text()).strip()
+    return None
+
+def scrape(source):
+    """
+    Standalone entry point used by the sequential engine: starts a private
+    browser pool just for this one source.
+    """
+    async def run():
+        async with BrowserPool(max_pages=1) as pool:
+            return await scrape_async(source, pool)
+
+    return asyncio.run(run())
+
+# --- NEW: Measure what lightweight loading saves ---
+async def compare_page_load(source):
+    """Loads a source once fully and once lightweight, and prints the difference."""
+    async with BrowserPool(max_pages=1) as pool:
+        async with pool.page() as page:
+            full = await load_page(page, source, None)
+        async with pool.page() as page:
+            light = await load_page(page, source, page_load_options(source) or dict(LIGHTWEIGHT_PAGE_LOAD))
+
+    print(describe_load(source, full) + " [full]")
+    print(describe_load(source, light) + " [lightweight]")
+    print(f"  -> Saved {full['elapsed_ms'] - light['elapsed_ms']} ms and "
+          f"{(full['bytes'] - light['bytes']) // 1024} KB for {source['name']}.")
+
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.browser_scraper "FreshersVoice"
+    import sys
+    from config import SOURCES
+
+    names = sys.argv[1:] or [s["name"] for s in SOURCES if s["type"] == "browser"]
+    for source in SOURCES:
+        if source["type"] == "browser" and source["name"] in names:
+            asyncio.run(compare_page_load(source))
@@ -0,0 +1,489 @@
+# scrapers/json_scraper.py
+
+# Scraper for sources with a structured JSON API ("type": "json"). Instead of
+# rendering a page in Chromium or parsing a feed that has dropped fields like
+# the location, it reads the postings straight from the API's JSON, mapped
+# onto Job fields by a declarative spec in config.SOURCES:
+#
+#   "items":  where the postings are, e.g. "$.jobs[*]" (or "$[*]" for a
+#             top-level list)
+#   "fields": Job field -> selector relative to one posting, e.g.
+#             {"title": "position", "company": "company.name",
+#              "location": ["location", "candidate_required_location"]}.
+#             A list tries each selector in turn; "title" and "link" are
+#             required, and postings without them are skipped.
+#   "params": extra query parameters sent with every request (optional)
+#   "since":  {"field": selector, "param": name, "format": "iso"|"unix"|"date"}
+#             (optional). The timestamp of the newest posting saved is kept
+#             in fetch_state; the next run sends it as `param` (if the API has
+#             one) and skips postings that aren't newer.
+#   "cursor": how to get the next page (optional, default: one request):
+#             {"param": "cursor", "next": "$.meta.next"}  token from the body,
+#             {"next_url": "$.links.next"}               next page's URL,
+#             {"param": "page", "start": 1}              page number,
+#             {"param": "offset", "start": 0, "step": "items"}  offset.
+#             Paging stops at an empty page, at "max_pages" (default
+#             MAX_PAGES), or, with "since", at the first page that reaches
+#             postings already seen (APIs list the newest first).
+#
+# Selectors are a small JSONPath subset: "$" for the root, ".name" or
+# "['name']" for keys, "[0]" / "[-1]" for indexes, "[1:]" for slices and
+# "[*]" for every element. A selector that matches a list of plain values
+# (tags, location lists) is joined with ", ".
+#
+# Responses are decoded while they download: the postings array is read one
+# posting at a time, so memory does not grow with the response and jobs are
+# saved before the download has finished. Only when "items" needs more than
+# keys and "[*]" is the whole body decoded at once.
+
+import codecs
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+import httpx
+import fetch_state
+import metrics
+from job_record import Job
+from normalizer import normalize_description
+from utils import classify_job
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+NETWORK_TIMEOUT = 15.0
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_PAGES = 20
+TEXT_FIELDS = ("title", "link", "published_date", "company", "description", "location")
+
+# --- Selectors ---
+_SEGMENT = re.compile(r"""
+    \.?(?P<name>[A-Za-z_][\w-]*)                   # .name (or name at the start)
+  | \[(?:'(?P<single>[^']*)'|"(?P<double>[^"]*)")\]  # ['name'] / ["name"]
+  | \[(?P<index>-?\d+)\]                           # [0], [-1]
+  | \[(?P<slice>-?\d*:-?\d*)\]                     # [1:], [:10]
+  | \[\*\]|\.\*                                    # [*], .*
+""", re.VERBOSE)
+
+def parse_selector(selector):
+    """
+    Compiles a selector into steps: ("key", name), ("index", n),
+    ("slice", start, stop) or ("all",). Raises ValueError if it can't.
+    """
+    text = selector[1:] if selector.startswith("$") else selector
+    steps = []
+    pos = 0
+    while pos < len(text):
+        match = _SEGMENT.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Invalid selector '{selector}' at '{text[pos:]}'")
+        if match["name"] is not None:
+            steps.append(("key", match["name"]))
+        elif match["single"] is not None or match["double"] is not None:
+            steps.append(("key", match["single"] if match["single"] is not None else match["double"]))
+        elif match["index"] is not None:
+            steps.append(("index", int(match["index"])))
+        elif match["slice"] is not None:
+            start, stop = (int(part) if part else None for part in match["slice"].split(":"))
+            steps.append(("slice", start, stop))
+        else:
+            steps.append(("all",))
+        pos = match.end()
+    return steps
+
+_compiled = {}
+
+def _steps(selector):
+    if selector not in _compiled:
+        _compiled[selector] = parse_selector(selector)
+    return _compiled[selector]
+
+def select(data, selector):
+    """Every value the selector matches in data, in document order."""
+    values = [data]
+    for step in _steps(selector):
+        matched = []
+        for value in values:
+            if step[0] == "key":
+                if isinstance(value, dict) and step[1] in value:
+                    matched.append(value[step[1]])
+            elif isinstance(value, list):
+                if step[0] == "index":
+                    if -len(value) <= step[1] < len(value):
+                        matched.append(value[step[1]])
+                elif step[0] == "slice":
+                    matched.extend(value[step[1]:step[2]])
+                else:
+                    matched.extend(value)
+            elif step[0] == "all" and isinstance(value, dict):
+                matched.extend(value.values())
+        values = matched
+    return values
+
+def first(data, selectors):
+    """The first non-empty value matched by a selector or list of selectors, or None."""
+    for selector in [selectors] if isinstance(selectors, str) else selectors:
+        for value in select(data, selector):
+            if value not in (None, "", []):
+                return value
+    return None
+
+# --- Incremental decoding ---
+_MORE = object()  # Yielded by the parser when it needs more input
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+class ItemStream:
+    """
+    Incremental decoder for the array at a path of object keys (e.g. ["jobs"]
+    for {"jobs": [...]}, [] for a top-level array). feed() takes raw bytes and
+    returns the array elements completed so far; after close(), `document`
+    holds the rest of the body (the array replaced by None), for reading
+    pagination cursors. Everything outside the array is decoded whole, so it
+    should be small, as it is in paginated API responses.
+    """
+
+    def __init__(self, keys):
+        self.document = None
+        self._text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._final = False
+        self._parser = self._root(list(keys))
+
+    def feed(self, chunk):
+        # Drop what has been decoded already, so the buffer stays small.
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return self._run()
+
+    def close(self):
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b"", final=True)
+        self._pos = 0
+        self._final = True
+        items = self._run()
+        if self._parser is not None:
+            raise ValueError("Unexpected end of JSON response")
+        return items
+
+    def _run(self):
+        items = []
+        if self._parser is None:
+            return items
+        for item in self._parser:
+            if item is _MORE:
+                return items
+            items.append(item)
+        self._parser = None  # Done: the whole body has been read
+        return items
+
+    def _root(self, keys):
+        self.document = yield from self._member(keys)
+
+    def _peek(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._final:
+                raise ValueError("Unexpected end of JSON response")
+            yield _MORE
+
+    def _expect(self, chars):
+        char = yield from self._peek()
+        if char not in chars:
+            raise ValueError(f"Invalid JSON response: expected {' or '.join(chars)} at '{self._buffer[self._pos:self._pos + 20]}'")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        yield from self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number that ends the buffer may continue in the next chunk.
+                if end < len(self._buffer) or self._final:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._final:
+                    raise
+            yield _MORE
+
+    def _member(self, keys):
+        """Decodes one value, streaming out the array at `keys` inside it."""
+        char = yield from self._peek()
+        if not keys and char == "[":
+            self._pos += 1
+            if (yield from self._peek()) == "]":
+                self._pos += 1
+                return None
+            while True:
+                yield (yield from self._value())
+                if (yield from self._expect(",]")) == "]":
+                    return None
+        if not keys or char != "{":
+            # The path doesn't lead to an array here: no items.
+            return (yield from self._value())
+
+        self._pos += 1
+        document = {}
+        if (yield from self._peek()) == "}":
+            self._pos += 1
+            return document
+        while True:
+            key = yield from self._value()
+            yield from self._expect(":")
+            if key == keys[0]:
+                document[key] = yield from self._member(keys[1:])
+            else:
+                document[key] = yield from self._value()
+            if (yield from self._expect(",}")) == "}":
+                return document
+
+class BufferedItems:
+    """ItemStream's interface for item selectors it can't stream: decodes the body at the end."""
+
+    def __init__(self, selector):
+        self.selector = selector
+        self.document = None
+        self._chunks = []
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+        return []
+
+    def close(self):
+        self.document = json.loads(b"".join(self._chunks))
+        self._chunks = []
+        return _elements(self.document, self.selector)
+
+def _elements(document, selector):
+    # "$.jobs" means the postings in that list, like "$.jobs[*]".
+    matched = select(document, selector)
+    if len(matched) == 1 and isinstance(matched[0], list) and _steps(selector)[-1:] != [("all",)]:
+        return matched[0]
+    return matched
+
+def item_decoder(selector):
+    """An ItemStream if the selector is object keys (plus an optional "[*]"), otherwise a BufferedItems."""
+    steps = _steps(selector)
+    if steps[-1:] == [("all",)]:
+        steps = steps[:-1]
+    if all(step[0] == "key" for step in steps):
+        return ItemStream([step[1] for step in steps])
+    return BufferedItems(selector)
+
+# --- Postings -> jobs ---
+def _timestamp(value):
+    """A UTC datetime from an ISO string, a date or a Unix timestamp (s or ms); None if unreadable."""
+    if isinstance(value, bool) or value in (None, ""):
+        return None
+    try:
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+            seconds = float(value)
+            return datetime.fromtimestamp(seconds / 1000 if seconds > 1e11 else seconds, timezone.utc)
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, OverflowError, OSError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _format_since(moment, fmt):
+    if fmt == "unix":
+        return str(int(moment.timestamp()))
+    if fmt == "date":
+        return moment.date().isoformat()
+    return moment.isoformat().replace("+00:00", "Z")
+
+def _text(value):
+    if isinstance(value, list):
+        value = ", ".join(str(part) for part in value if isinstance(part, (str, int, float)) and part != "")
+    elif isinstance(value, dict):
+        return None
+    return str(value).strip() if value not in (None, "") else None
+
+def job_from_item(source, item):
+    """Maps one posting onto a Job record, or returns None if it has no title or link."""
+    fields = {field: _text(first(item, selector)) for field, selector in source["fields"].items()
+              if field in TEXT_FIELDS}
+    title, link = fields.get("title"), fields.get("link")
+    if not title or not link:
+        return None
+    published = fields.get("published_date")
+    if published and published.isdigit():
+        # Unix timestamps become ISO dates, like the other scrapers' dates.
+        # One out of range is dropped rather than sinking the whole source.
+        moment = _timestamp(published)
+        published = moment.isoformat() if moment else None
+
+    with metrics.timer(source["name"], "parse.classify"):
+        job_role, experience_level, _ = classify_job(title)
+    return Job(
+        title=title,
+        link=urljoin(source["url"], link),
+        published_date=published,
+        source=source["name"],
+        company=fields.get("company") or "Not Specified",
+        description=normalize_description(fields.get("description") or "No description available."),
+        location=fields.get("location") or "Not Specified",
+        job_role=job_role,
+        experience_level=experience_level,
+    )
+
+# --- Paging and the since-timestamp ---
+class Pager:
+    """
+    The request plan for one run of a JSON source: which page to ask for
+    next, with which parameters, and which postings are new. The sync and
+    async scrapers below drive it; it never touches the network itself.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.name = source["name"]
+        self.since = source.get("since") or {}
+        self.cursor = source.get("cursor") or {}
+        self.max_pages = source.get("max_pages", MAX_PAGES)
+        stored = fetch_state.get_value(source["url"], "since")
+        self.watermark = _timestamp(stored) if self.since and stored else None
+        self.newest = self.watermark
+        self.pages = 0
+        self.done = False
+        self._url = source["url"]
+        self._params = dict(source.get("params") or {})
+        if self.watermark and self.since.get("param"):
+            self._params[self.since["param"]] = _format_since(self.watermark, self.since.get("format", "iso"))
+        if "param" in self.cursor and "next" not in self.cursor:
+            self._params[self.cursor["param"]] = self.cursor.get("start", 1)
+        self._decoder = None
+        self._page_items = 0
+        self._reached_seen = False
+
+    def next_request(self):
+        """(url, params, headers) for the next page, or None when there are no more."""
+        if self.done or self.pages >= self.max_pages:
+            return None
+        headers = {"Accept": "application/json"}
+        # Validators only mean something while the first request never changes.
+        if self.pages == 0 and not (self.watermark and self.since.get("param")):
+            headers.update(fetch_state.conditional_headers(self.source["url"]))
+        self._decoder = item_decoder(self.source["items"])
+        self._page_items = 0
+        self._reached_seen = False
+        return self._url, self._params, headers
+
+    def feed(self, chunk):
+        return self._jobs(self._decoder.feed, chunk)
+
+    def finish_page(self, response, content_hash):
+        """Jobs still buffered at the end of a page; also works out the next page."""
+        jobs = self._jobs(self._decoder.close)
+        if self.pages == 0:
+            fetch_state.stage(self.source["url"], response, content_hash)
+        self.pages += 1
+        self._advance(self._decoder.document)
+        return jobs
+
+    def finish(self):
+        """Call after the last page: stages the newest timestamp seen for commit()."""
+        if self.newest and self.newest != self.watermark:
+            fetch_state.stage_value(self.source["url"], "since", self.newest.isoformat())
+
+    def _jobs(self, decoder_step, *args):
+        with metrics.timer(self.name, "parse"):
+            items = decoder_step(*args)
+            jobs = []
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                if self.since:
+                    posted = _timestamp(first(item, self.since["field"]))
+                    if posted and self.watermark and posted <= self.watermark:
+                        self._reached_seen = True
+                        continue
+                    if posted and (self.newest is None or posted > self.newest):
+                        self.newest = posted
+                job = job_from_item(self.source, item)
+                if job is not None:
+                    jobs.append(job)
+        self._page_items += len(items)
+        metrics.count(self.name, "entries", len(items))
+        metrics.count(self.name, "jobs", len(jobs))
+        return jobs
+
+    def _advance(self, document):
+        if not self.cursor or self._page_items == 0 or self._reached_seen:
+            self.done = True
+        elif "next_url" in self.cursor:
+            next_url = first(document, self.cursor["next_url"]) if document else None
+            if next_url:
+                self._url, self._params = urljoin(self._url, str(next_url)), {}
+            self.done = not next_url
+        elif "next" in self.cursor:
+            token = first(document, self.cursor["next"]) if document else None
+            if token not in (None, ""):
+                self._params[self.cursor["param"]] = token
+            self.done = token in (None, "")
+        else:
+            step = self._page_items if self.cursor.get("step") == "items" else self.cursor.get("step", 1)
+            self._params[self.cursor["param"]] = int(self._params[self.cursor["param"]]) + step
+
+# --- Scrapers ---
+def scrape_stream(source):
+    """
+    Generator that yields Job records as the API's pages download. Yields
+    nothing if the first page is unchanged (304). Errors propagate.
+    """
+    print(f"  -> [JSON] Streaming postings from {source['name']}...")
+    pager = Pager(source)
+    name = source["name"]
+    with httpx.Client(headers={'User-Agent': USER_AGENT}, timeout=NETWORK_TIMEOUT, follow_redirects=True) as client:
+        while (page := pager.next_request()) is not None:
+            url, params, headers = page
+            request = client.build_request("GET", url, params=params, headers=headers,
+                                           extensions={"trace": metrics.http_trace(name, include_body=False)})
+            with metrics.timer(name, "fetch"):
+                response = client.send(request, stream=True)
+            try:
+                if response.status_code == 304:
+                    print("  -> API unchanged since last run, skipping.")
+                    return
+                response.raise_for_status()
+                digest = hashlib.sha256()
+                for chunk in metrics.timed_iter(name, "fetch", response.iter_bytes(STREAM_CHUNK_SIZE)):
+                    digest.update(chunk)
+                    yield from pager.feed(chunk)
+                yield from pager.finish_page(response, digest.hexdigest())
+            finally:
+                metrics.count(name, "bytes", response.num_bytes_downloaded)
+                response.close()
+    pager.finish()
+
+def scrape(source):
+    """Returns every new Job record from a JSON API source."""
+    return list(scrape_stream(source))
+
+async def stream_async(client, source):
+    """Async generator version of scrape_stream() over the engine's shared client."""
+    pager = Pager(source)
+    name = source["name"]
+    while (page := pager.next_request()) is not None:
+        url, params, headers = page
+        request = client.build_request("GET", url, params=params, headers=headers,
+                                       extensions={"trace": metrics.async_http_trace(name, include_body=False)})
+        with metrics.timer(name, "fetch"):
+            response = await client.send(request, stream=True)
+        try:
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            async for chunk in metrics.timed_aiter(name, "fetch", response.aiter_bytes(STREAM_CHUNK_SIZE)):
+                digest.update(chunk)
+                for job in pager.feed(chunk):
+                    yield job
+            for job in pager.finish_page(response, digest.hexdigest()):
+                yield job
+        finally:
+            metrics.count(name, "bytes", response.num_bytes_downloaded)
+            await response.aclose()
+    pager.finish()
@@ -0,0 +1,80 @@
+# scrapers/parse_pool.py
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import metrics
+from config import PARSE_WORKERS
+from scrapers import rss_scraper
+
+def _warm_up():
+    """Runs once per worker so the imports happen while the feeds download."""
+    return True
+
+def _parse_in_worker(source, content):
+    # Each task starts from empty metrics and sends what it recorded back
+    # with the jobs, so parse and classify times still reach the run report.
+    metrics.start_run()
+    jobs = rss_scraper.parse_feed(source, content)
+    return jobs, metrics.snapshot()
+
+class ParsePool:
+    """
+    Parses (feedparser), cleans (normalizer.py) and classifies downloaded
+    feeds in a pool of `workers` processes, so the CPU-bound half of the RSS
+    engine scales with cores instead of queueing behind the GIL. With
+    workers=0 feeds are parsed in a thread of this process instead.
+
+    Use it as an async context manager so the workers are always shut down:
+
+        async with ParsePool() as pool:
+            jobs = await pool.parse(source, content)
+    """
+
+    def __init__(self, workers=PARSE_WORKERS):
+        self.workers = workers
+        self._executor = None
+
+    async def start(self):
+        if self.workers > 0:
+            print(f"  -> [Parse] Starting {self.workers} parser processes...")
+            # "spawn" rather than fork: the engine already runs threads (the
+            # background writer, asyncio.to_thread) whose locks a forked
+            # child could inherit in a held state.
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            loop = asyncio.get_running_loop()
+            for _ in range(self.workers):
+                warm_up = loop.run_in_executor(self._executor, _warm_up)
+                # A failed start surfaces in parse(); don't log it twice.
+                warm_up.add_done_callback(lambda future: future.cancelled() or future.exception())
+        return self
+
+    async def close(self):
+        if self._executor:
+            await asyncio.to_thread(self._executor.shutdown)
+            self._executor = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def parse(self, source, content):
+        """Returns the Job records in a downloaded feed."""
+        if self._executor is None:
+            return await asyncio.to_thread(rss_scraper.parse_feed, source, content)
+        loop = asyncio.get_running_loop()
+        try:
+            jobs, recorded = await loop.run_in_executor(self._executor, _parse_in_worker, source, content)
+        except BrokenProcessPool as e:
+            # A worker died (killed for memory, or could not start); keep the
+            # run going by parsing the remaining feeds in this process.
+            print(f"  [Warning] The parser processes stopped ({e}); parsing in-process from now on.")
+            executor, self._executor = self._executor, None
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+            return await self.parse(source, content)
+        metrics.merge(recorded)
+        return jobs
@@ -0,0 +1,91 @@
+# scrapers/registry.py
+
+# The one place that knows which scraper handles which source "type". The
+# engine checks config.SOURCES once at startup (dropping broken entries and
+# repeats of the same feed), groups what's left by type, and only imports a
+# scraper module the first time a due source actually needs it, so an RSS-only
+# run never loads Playwright and a run with nothing due loads neither.
+
+import importlib
+from urllib.parse import urlparse
+
+# type -> module with scrape(source) (and, for some types, async variants).
+SCRAPER_MODULES = {
+    "rss": "scrapers.rss_scraper",
+    "browser": "scrapers.browser_scraper",
+    "json": "scrapers.json_scraper",
+}
+# Types whose jobs are always saved in batches while they download
+# (scrape_stream / stream_async); RSS feeds opt in with "stream": True.
+STREAMING_TYPES = ("json",)
+REQUIRED_FIELDS = ("name", "url", "type")
+REQUIRED_SELECTORS = ("job_card", "title", "link")  # Browser sources
+REQUIRED_JSON_FIELDS = ("title", "link")  # JSON sources' "fields"
+
+_loaded = {}
+
+def validation_errors(source):
+    """What's wrong with a source entry, as a list of messages (empty if it's fine)."""
+    if not isinstance(source, dict):
+        return ["not a dict"]
+    errors = [f"missing '{field}'" for field in REQUIRED_FIELDS if not source.get(field)]
+    if errors:
+        return errors
+    if source["type"] not in SCRAPER_MODULES:
+        errors.append(f"unknown type '{source['type']}' (expected one of {', '.join(SCRAPER_MODULES)})")
+    url = urlparse(source["url"])
+    if url.scheme not in ("http", "https") or not url.netloc:
+        errors.append(f"invalid url '{source['url']}'")
+    if source["type"] == "browser":
+        selectors = source.get("selectors") or {}
+        errors.extend(f"missing selector '{name}'" for name in REQUIRED_SELECTORS if not selectors.get(name))
+    if source["type"] == "json":
+        if not source.get("items"):
+            errors.append("missing 'items'")
+        fields = source.get("fields") or {}
+        errors.extend(f"missing field '{name}'" for name in REQUIRED_JSON_FIELDS if not fields.get(name))
+    return errors
+
+def is_streamed(source):
+    """True if a source's jobs are saved in batches while it downloads."""
+    return source["type"] in STREAMING_TYPES or (source["type"] == "rss" and bool(source.get("stream")))
+
+def load_sources(sources):
+    """
+    Returns the usable sources, in their original order: entries that fail
+    validation are skipped, and a feed listed more than once (same type and
+    URL, even under another name) is only kept the first time.
+    """
+    valid = []
+    seen = {}
+    for source in sources:
+        errors = validation_errors(source)
+        if errors:
+            name = source.get("name", "?") if isinstance(source, dict) else "?"
+            print(f"  [Warning] Skipping source '{name}': {'; '.join(errors)}.")
+            continue
+        key = (source["type"], source["url"].rstrip("/"))
+        if key in seen:
+            print(f"  [Warning] Skipping source '{source['name']}': same feed as '{seen[key]}'.")
+            continue
+        seen[key] = source["name"]
+        valid.append(source)
+    return valid
+
+def group_by_type(sources):
+    """{type: [sources]} in the order the types first appear."""
+    groups = {}
+    for source in sources:
+        groups.setdefault(source["type"], []).append(source)
+    return groups
+
+def get_scraper(source_type):
+    """
+    The scraper module for a source type, imported on first use. Raises
+    ImportError for types nobody registered.
+    """
+    if source_type not in _loaded:
+        if source_type not in SCRAPER_MODULES:
+            raise ImportError(f"No scraper registered for type '{source_type}'")
+        _loaded[source_type] = importlib.import_module(SCRAPER_MODULES[source_type])
+    return _loaded[source_type]
@@ -1,8 +1,14 @@
 # scrapers/rss_scraper.py
 
+import hashlib
+import xml.etree.ElementTree as ET
 import httpx
 import feedparser
-from utils import classify_role, classify_experience
+import fetch_state
+import metrics
+from job_record import Job
+from normalizer import normalize_description
+from utils import classify_job
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 NETWORK_TIMEOUT = 15.0
@@ -18,53 +24,263 @@ def extract_details(entry):
     if company == 'Not Specified' and 'dc' in entry and 'creator' in entry.dc:
         company = entry.dc.creator
     
-    # Clean up the description to remove common RSS junk
-    description = entry.get('summary', 'No description available.')
-    if '<' in description and '>' in description:
-        # A simple way to strip basic HTML tags for cleaner display
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(description, 'html.parser')
-        description = soup.get_text(separator=' ', strip=True)
+    # Clean up the description to remove common RSS junk (HTML tags,
+    # entities, runs of whitespace) and keep it to a sensible length
+    description = normalize_description(entry.get('summary') or 'No description available.')
 
     return company.strip(), description
 
+def build_job(source, title, link, published, company, description, location):
+    """Assembles one Job record and classifies it."""
+    with metrics.timer(source["name"], "parse.classify"):
+        job_role, experience_level, _ = classify_job(title)
+    return Job(
+        title=title,
+        link=link,
+        published_date=published,
+        source=source["name"],
+        company=company,
+        description=description,
+        # Location is rarely available in RSS feeds, will default to "Not Specified"
+        location=location or 'Not Specified',
+        job_role=job_role,
+        experience_level=experience_level,
+    )
+
+def parse_feed(source, content):
+    """
+    Turns raw feed content into a list of Job records. Kept separate from
+    the fetch so the async engine can parse each feed as soon as it lands.
+    """
+    jobs_list = []
+    with metrics.timer(source["name"], "parse"):
+        feed = feedparser.parse(content)
+
+        for entry in feed.entries:
+            title = entry.get('title', 'No Title')
+
+            # --- UPGRADED: Use the helper function ---
+            company, description = extract_details(entry)
+
+            jobs_list.append(build_job(source, title, entry.get('link'), entry.get('published', None),
+                                       company, description, entry.get('location')))
+
+    metrics.count(source["name"], "entries", len(feed.entries))
+    metrics.count(source["name"], "jobs", len(jobs_list))
+    return jobs_list
+
 def scrape(source):
     """
     Scrapes an RSS feed, now using a helper function to extract richer data.
     """
     headers = {'User-Agent': USER_AGENT}
-    jobs_list = []
     
     print(f"  -> [RSS] Fetching content from {source['name']}...")
-    try:
-        with httpx.Client(headers=headers, timeout=NETWORK_TIMEOUT, follow_redirects=True) as client:
-            response = client.get(source["url"])
+    # Errors propagate, so the engine can count them against the source.
+    with httpx.Client(headers=headers, timeout=NETWORK_TIMEOUT, follow_redirects=True) as client:
+        with metrics.timer(source["name"], "fetch"):
+            response = client.get(source["url"], headers=fetch_state.conditional_headers(source["url"]),
+                                  extensions={"trace": metrics.http_trace(source["name"])})
+        metrics.count(source["name"], "bytes", response.num_bytes_downloaded)
+        if response.status_code != 304:
             response.raise_for_status()
+        if fetch_state.is_unchanged(source["url"], response):
+            print("  -> Feed unchanged since last run, skipping.")
+            return []
 
-        feed = feedparser.parse(response.text)
+    return parse_feed(source, response.text)
 
-        for entry in feed.entries:
-            title = entry.get('title', 'No Title')
-            
-            # --- UPGRADED: Use the helper function ---
-            company, description = extract_details(entry)
+# --- NEW: Async fetch for the concurrent engine ---
+async def fetch_async(client, source):
+    """
+    Downloads a feed over the engine's shared httpx.AsyncClient and returns the
+    body text, or None if the feed hasn't changed since the last run. Errors
+    are raised so the engine can report them per source.
+    """
+    with metrics.timer(source["name"], "fetch"):
+        response = await client.get(source["url"], headers=fetch_state.conditional_headers(source["url"]),
+                                    extensions={"trace": metrics.async_http_trace(source["name"])})
+    metrics.count(source["name"], "bytes", response.num_bytes_downloaded)
+    if response.status_code != 304:
+        response.raise_for_status()
+    if fetch_state.is_unchanged(source["url"], response):
+        return None
+    return response.text
+
+# --- NEW: Streaming path for very large feeds ---
+# Sources with "stream": True are read chunk by chunk and parsed with an
+# incremental XML parser, so jobs come out while the download is still
+# running and memory depends on the engine's batch size, not the feed size.
+# Unlike feedparser this needs well-formed XML, which the big aggregators
+# serve. A feed that turns out not to be (an HTML entity such as &nbsp; is
+# enough) is downloaded once more in full and handed to feedparser; only the
+# jobs the stream hadn't already produced are added.
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+class FeedItemParser:
+    """
+    Incremental RSS/Atom parser. feed() takes raw bytes and returns the raw
+    fields of every <item>/<entry> completed so far. Finished items are
+    detached from the tree, so only the current one is ever held in memory.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack = []
+
+    def feed(self, chunk):
+        self._parser.feed(chunk)
+        return self._read_items()
+
+    def close(self):
+        self._parser.close()
+        return self._read_items()
+
+    def _read_items(self):
+        items = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            if _local_name(elem.tag) in ("item", "entry"):
+                items.append(self._fields(elem))
+                if self._stack:
+                    self._stack[-1].remove(elem)
+        return items
+
+    @staticmethod
+    def _fields(item):
+        fields = {}
+        for child in item:
+            name = _local_name(child.tag)
+            if name == "link":
+                # RSS puts the URL in the text, Atom in href (prefer rel="alternate").
+                href = child.get("href")
+                if href and child.get("rel", "alternate") == "alternate":
+                    fields["link"] = href
+                elif child.text and "link" not in fields:
+                    fields["link"] = child.text.strip()
+            elif name == "author":
+                # Atom nests the name; RSS has plain text.
+                author_name = next((c.text for c in child if _local_name(c.tag) == "name"), None)
+                fields.setdefault("author", (author_name or child.text or "").strip())
+            elif child.text is not None:
+                fields.setdefault(name, child.text)
+        return fields
+
+def job_from_item(source, fields):
+    """Maps the raw fields of a streamed item onto a Job record."""
+    company = fields.get("author") or fields.get("creator") or "Not Specified"
+    summary = fields.get("description") or fields.get("summary") or fields.get("encoded") or fields.get("content")
+    return build_job(
+        source,
+        (fields.get("title") or "No Title").strip(),
+        fields.get("link"),
+        fields.get("pubDate") or fields.get("published") or fields.get("updated"),
+        company.strip(),
+        normalize_description(summary or 'No description available.'),
+        fields.get("location"),
+    )
+
+def _parse_chunk(source, parser_step, *args):
+    """
+    Runs one parser step (feed(chunk) or close()) and turns the items it
+    completed into jobs, all timed as "parse".
+    """
+    with metrics.timer(source["name"], "parse"):
+        jobs = [job_from_item(source, fields) for fields in parser_step(*args)]
+    metrics.count(source["name"], "entries", len(jobs))
+    metrics.count(source["name"], "jobs", len(jobs))
+    return jobs
+
+def _unseen_jobs(source, content, seen_links):
+    """The feedparser fallback: jobs from the whole body that the stream didn't yield."""
+    print(f"  -> [RSS] {source['name']} is not well-formed XML; parsing it with feedparser instead.")
+    return [job for job in parse_feed(source, content) if job.link not in seen_links]
+
+def scrape_stream(source):
+    """
+    Generator version of scrape() for large feeds: yields Job records as
+    the body downloads. Yields nothing if the feed is unchanged (304).
+    Errors propagate to the caller. Only the time spent waiting on the network
+    is charged to "fetch", not the time the caller spends saving batches.
+    """
+    headers = {'User-Agent': USER_AGENT}
+    print(f"  -> [RSS] Streaming content from {source['name']}...")
+    name = source["name"]
+    with httpx.Client(headers=headers, timeout=NETWORK_TIMEOUT, follow_redirects=True) as client:
+        request = client.build_request("GET", source["url"], headers=fetch_state.conditional_headers(source["url"]),
+                                       extensions={"trace": metrics.http_trace(name, include_body=False)})
+        with metrics.timer(name, "fetch"):
+            response = client.send(request, stream=True)
+        try:
+            if response.status_code == 304:
+                print("  -> Feed unchanged since last run, skipping.")
+                return
+            response.raise_for_status()
+
+            digest = hashlib.sha256()
+            parser = FeedItemParser()
+            body, seen_links = response, set()
+            try:
+                for chunk in metrics.timed_iter(name, "fetch", response.iter_bytes(STREAM_CHUNK_SIZE)):
+                    digest.update(chunk)
+                    for job in _parse_chunk(source, parser.feed, chunk):
+                        seen_links.add(job.link)
+                        yield job
+                for job in _parse_chunk(source, parser.close):
+                    yield job
+            except ET.ParseError:
+                response.close()
+                with metrics.timer(name, "fetch"):
+                    full = client.get(source["url"], extensions={"trace": metrics.http_trace(name)})
+                metrics.count(name, "bytes", full.num_bytes_downloaded)
+                full.raise_for_status()
+                yield from _unseen_jobs(source, full.text, seen_links)
+                body, digest = full, hashlib.sha256(full.content)
+            fetch_state.stage(source["url"], body, digest.hexdigest())
+        finally:
+            metrics.count(name, "bytes", response.num_bytes_downloaded)
+            response.close()
+
+async def stream_async(client, source):
+    """Async generator version of scrape_stream() over the engine's shared client."""
+    name = source["name"]
+    request = client.build_request("GET", source["url"], headers=fetch_state.conditional_headers(source["url"]),
+                                   extensions={"trace": metrics.async_http_trace(name, include_body=False)})
+    with metrics.timer(name, "fetch"):
+        response = await client.send(request, stream=True)
+    try:
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
 
-            job = {
-                "title": title,
-                "link": entry.get('link'),
-                "published_date": entry.get('published', None),
-                "source": source["name"],
-                "company": company,
-                "description": description,
-                # Location is rarely available in RSS feeds, will default to "Not Specified"
-                "location": entry.get('location', 'Not Specified'), 
-                "job_role": classify_role(title),
-                "experience_level": classify_experience(title)
-            }
-            jobs_list.append(job)
-            
-    except Exception as e:
-        print(f"  [ERROR] An unexpected error occurred while parsing '{source['name']}': {e}")
-        return []
-
-    return jobs_list
\ No newline at end of file
+        digest = hashlib.sha256()
+        parser = FeedItemParser()
+        body, seen_links = response, set()
+        try:
+            async for chunk in metrics.timed_aiter(name, "fetch", response.aiter_bytes(STREAM_CHUNK_SIZE)):
+                digest.update(chunk)
+                for job in _parse_chunk(source, parser.feed, chunk):
+                    seen_links.add(job.link)
+                    yield job
+            for job in _parse_chunk(source, parser.close):
+                yield job
+        except ET.ParseError:
+            await response.aclose()
+            with metrics.timer(name, "fetch"):
+                full = await client.get(source["url"], extensions={"trace": metrics.async_http_trace(name)})
+            metrics.count(name, "bytes", full.num_bytes_downloaded)
+            full.raise_for_status()
+            for job in _unseen_jobs(source, full.text, seen_links):
+                yield job
+            body, digest = full, hashlib.sha256(full.content)
+        fetch_state.stage(source["url"], body, digest.hexdigest())
+    finally:
+        metrics.count(name, "bytes", response.num_bytes_downloaded)
+        await response.aclose()
@@ -0,0 +1,274 @@
+# search_index.py
+
+# A local full-text index over job titles, companies and descriptions, for
+# the dashboard's keyword search. It lives in an SQLite FTS5 table next to a
+# copy of each job's card columns, so a search (plus the sidebar filters,
+# BM25 ranking, paging and highlighted snippets) is answered by one local
+# query instead of a LIKE scan over the 'jobs' table.
+#
+# The index is filled incrementally: sync() pulls only the rows whose id is
+# above the highest one already indexed, so keeping it current costs one
+# small query per sync. The dashboard runs the syncs in a background thread
+# (BackgroundSync), so nobody's page waits on the first, full build. Run
+# `python search_index.py --rebuild` after reclassify.py to pick up the new
+# labels.
+
+import argparse
+import html
+import os
+import re
+import sqlite3
+import threading
+from config import SEARCH_INDEX_PATH, SEARCH_SYNC_SECONDS
+
+SYNC_PAGE_SIZE = 1000  # Supabase's default max rows per request
+CARD_FIELDS = ("id", "title", "link", "company", "location", "job_role", "experience_level",
+               "source", "published_date", "created_at")
+# BM25 weights for title, company, description: a hit in the title counts most.
+COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+SNIPPET_TOKENS = 24
+# Marks the matched terms in snippets; replaced with <mark> after escaping.
+_HIGHLIGHT_START, _HIGHLIGHT_END = "\x02", "\x03"
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+_conn = None
+_lock = threading.Lock()  # Streamlit serves every session from its own thread
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(SEARCH_INDEX_PATH) or ".", exist_ok=True)
+        _conn = sqlite3.connect(SEARCH_INDEX_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+            "title, company, description, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        _conn.execute(f"CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY, {', '.join(CARD_FIELDS[1:])})")
+        _conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        _conn.commit()
+    return _conn
+
+def _meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+def size():
+    """Number of jobs in the index."""
+    with _lock:
+        return _get_conn().execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+def add(rows):
+    """Indexes job rows (dicts with an 'id', the card columns and 'description')."""
+    rows = [row for row in rows if row.get("id") is not None]
+    if not rows:
+        return
+    with _lock:
+        conn = _get_conn()
+        ids = [(row["id"],) for row in rows]
+        with conn:
+            # Re-adding a job replaces it instead of indexing it twice.
+            conn.executemany("DELETE FROM jobs_fts WHERE rowid = ?", ids)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO cards ({', '.join(CARD_FIELDS)}) VALUES ({', '.join('?' * len(CARD_FIELDS))})",
+                [tuple(row.get(field) for field in CARD_FIELDS) for row in rows],
+            )
+            conn.executemany(
+                "INSERT INTO jobs_fts (rowid, title, company, description) VALUES (?, ?, ?, ?)",
+                [(row["id"], row.get("title") or "", row.get("company") or "", row.get("description") or "")
+                 for row in rows],
+            )
+            last_id = max(int(_meta(conn, "last_id", 0)), max(row["id"] for row in rows))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_id', ?)", (str(last_id),))
+
+def reset():
+    """Empties the index."""
+    with _lock:
+        conn = _get_conn()
+        with conn:
+            conn.execute("DELETE FROM jobs_fts")
+            conn.execute("DELETE FROM cards")
+            conn.execute("DELETE FROM meta")
+
+def sync(client):
+    """
+    Indexes every job added to the 'jobs' table since the last sync. If the
+    table now holds fewer of the already indexed jobs (id <= last synced id)
+    than the index does, some were deleted (dedup.py --apply) and the index
+    is rebuilt from scratch. Comparing against the whole table would miss
+    deletions whenever at least as many new jobs arrived in the meantime.
+    Returns the number of jobs indexed.
+    """
+    with _lock:
+        last_id = int(_meta(_get_conn(), "last_id", 0))
+    indexed = size()
+    if indexed:
+        remaining = (client.table('jobs').select('id', count='exact', head=True)
+                     .lte('id', last_id).execute().count or 0)
+        if remaining < indexed:
+            print(f"  -> The search index has {indexed - remaining} deleted jobs; rebuilding it...")
+            reset()
+            last_id = 0
+
+    columns = ", ".join(CARD_FIELDS + ("description",))
+    added = 0
+    while True:
+        rows = (client.table('jobs').select(columns).gt('id', last_id).order('id')
+                .limit(SYNC_PAGE_SIZE).execute().data or [])
+        add(rows)
+        added += len(rows)
+        if len(rows) < SYNC_PAGE_SIZE:
+            break
+        last_id = rows[-1]["id"]
+    if added:
+        print(f"  -> Added {added} jobs to the search index.")
+    return added
+
+class BackgroundSync:
+    """
+    Keeps the index current from a daemon thread: one sync right away, then
+    one every `interval` seconds. `ready` is set once the first sync has
+    finished (or failed, see `error`).
+    """
+
+    def __init__(self, client, interval=SEARCH_SYNC_SECONDS):
+        self.client = client
+        self.interval = interval
+        self.ready = threading.Event()
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="search-index-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            try:
+                sync(self.client)
+                self.error = None
+            except Exception as e:
+                # Searches keep using what's indexed; the next sync tries again.
+                self.error = e
+                print(f"Search index error: {e}")
+            self.ready.set()
+            if self._stop.wait(self.interval):
+                return
+
+def match_expression(text):
+    """
+    Turns what someone typed into an FTS5 query in which every word must
+    match (as its Porter stem, so "engineers" finds "engineer"). Returns None
+    if there is nothing to search for.
+    """
+    words = _TOKEN_PATTERN.findall(text.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+def _highlight(snippet):
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_HIGHLIGHT_START, "<mark>").replace(_HIGHLIGHT_END, "</mark>")
+
+def search(text, role=None, experience=None, location=None, created_after=None, limit=10, offset=0):
+    """
+    Ranked keyword search, combined with the dashboard's filters. Returns
+    (total_matches, rows) where rows are card dicts, best match first, each
+    with a 'snippet' (HTML, matched terms in <mark>) and its BM25 'score'
+    (lower is better). Every match is ranked; only the requested page is
+    returned.
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return 0, []
+
+    where = ["jobs_fts MATCH ?"]
+    params = [expression]
+    if role:
+        where.append("c.job_role = ?")
+        params.append(role)
+    if experience:
+        where.append("c.experience_level = ?")
+        params.append(experience)
+    if location:
+        escaped = location.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("c.location LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if created_after:
+        where.append("c.created_at >= ?")
+        params.append(created_after)
+    condition = " AND ".join(where)
+
+    weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+    with _lock:
+        conn = _get_conn()
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM jobs_fts JOIN cards c ON c.id = jobs_fts.rowid WHERE {condition}", params
+        ).fetchone()[0]
+        # Every match is scored; SQLite only keeps the best offset + limit
+        # of them while it sorts, and the newest job wins a tie.
+        page = conn.execute(
+            f"SELECT jobs_fts.rowid, bm25(jobs_fts, {weights}) AS score "
+            f"FROM jobs_fts JOIN cards c ON c.id = jobs_fts.rowid WHERE {condition} "
+            f"ORDER BY score, jobs_fts.rowid DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        if not page:
+            return total, []
+
+        # Cards and snippets are only fetched for the page being shown. One
+        # rowid lookup per job: FTS5 can't push "rowid IN (...)" down and
+        # would walk every match instead.
+        ids = [rowid for rowid, _ in page]
+        cards = conn.execute(
+            f"SELECT {', '.join(CARD_FIELDS)} FROM cards WHERE id IN ({', '.join('?' * len(ids))})", ids
+        ).fetchall()
+        snippets = {
+            rowid: conn.execute(
+                f"SELECT snippet(jobs_fts, -1, '{_HIGHLIGHT_START}', '{_HIGHLIGHT_END}', ' … ', {SNIPPET_TOKENS}) "
+                f"FROM jobs_fts WHERE jobs_fts MATCH ? AND rowid = ?",
+                (expression, rowid),
+            ).fetchone()[0]
+            for rowid in ids
+        }
+
+    scores = dict(page)
+    results = []
+    for row in cards:
+        card = dict(zip(CARD_FIELDS, row))
+        card["snippet"] = _highlight(snippets[card["id"]])
+        card["score"] = scores[card["id"]]
+        results.append(card)
+    position = {rowid: i for i, (rowid, _) in enumerate(page)}
+    results.sort(key=lambda card: position[card["id"]])
+    return total, results
+
+
+if __name__ == "__main__":
+    from database import init_db_client
+
+    parser = argparse.ArgumentParser(description="Build or query the local full-text search index.")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every job (e.g. after reclassify.py).")
+    parser.add_argument("--query", help="Print the top matches for a search.")
+    args = parser.parse_args()
+
+    if args.rebuild or not args.query:
+        db_client = init_db_client()
+        if not db_client:
+            raise SystemExit(1)
+        if args.rebuild:
+            reset()
+        sync(db_client)
+        print(f"✅ The search index holds {size()} jobs.")
+    if args.query:
+        total, rows = search(args.query)
+        print(f"{total} jobs match '{args.query}':")
+        for row in rows:
+            print(f"  {row['score']:7.2f}  {row['title']} ({row['company']})")
@@ -0,0 +1,134 @@
+# seen_index.py
+
+# A local index of every job link we've already stored, so save_jobs only
+# uploads links the database hasn't seen. Links are kept as 64-bit hashes in
+# a small SQLite file; the index is warmed from the 'jobs' table once and
+# then updated incrementally after every successful save.
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from config import SEEN_INDEX_PATH
+
+WARM_PAGE_SIZE = 1000  # Supabase's default max rows per request
+LOOKUP_CHUNK_SIZE = 500  # Stay well under SQLite's bound-parameter limit
+
+_conn = None
+_lock = threading.Lock()  # The background writer marks links while the engine filters
+_stats = defaultdict(lambda: {"new": 0, "duplicate": 0})
+
+def link_hash(link):
+    """Hashes a link down to a signed 64-bit integer that SQLite stores natively."""
+    digest = hashlib.blake2b(link.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(SEEN_INDEX_PATH) or ".", exist_ok=True)
+        # The async engine calls save_jobs from worker threads, one at a time.
+        _conn = sqlite3.connect(SEEN_INDEX_PATH, check_same_thread=False)
+        _conn.execute("CREATE TABLE IF NOT EXISTS seen_links (link_hash INTEGER PRIMARY KEY) WITHOUT ROWID")
+        _conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        _conn.commit()
+    return _conn
+
+def is_warm():
+    row = _get_conn().execute("SELECT value FROM meta WHERE key = 'warmed'").fetchone()
+    return row is not None
+
+def warm(client):
+    """
+    Loads every link already in the 'jobs' table into the index, one page at a
+    time. Only marks the index as warm if the whole table was read, so an
+    interrupted warm-up is simply retried next run.
+    """
+    conn = _get_conn()
+    print("  -> Warming the seen-links index from the database...")
+    start = 0
+    try:
+        while True:
+            response = (client.table('jobs').select('link').order('id')
+                        .range(start, start + WARM_PAGE_SIZE - 1).execute())
+            rows = response.data or []
+            conn.executemany("INSERT OR IGNORE INTO seen_links (link_hash) VALUES (?)",
+                             [(link_hash(row["link"]),) for row in rows if row.get("link")])
+            start += len(rows)
+            if len(rows) < WARM_PAGE_SIZE:
+                break
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('warmed', ?)", (str(start),))
+        conn.commit()
+        print(f"  -> Seen-links index warmed with {start} links.")
+        return True
+    except Exception as e:
+        conn.commit()  # Keep whatever we got; the next run carries on warming
+        print(f"  [Warning] Could not warm the seen-links index: {e}")
+        return False
+
+def filter_new(client, jobs):
+    """
+    Returns only the jobs whose links aren't in the index yet (or repeated
+    within this batch), and tallies new/duplicate counts per source. If the
+    index couldn't be warmed, every job is passed through and the database's
+    own upsert takes care of duplicates.
+    """
+    if not is_warm() and not warm(client):
+        return jobs
+
+    conn = _get_conn()
+    hashes = [link_hash(job["link"]) if job.get("link") else None for job in jobs]
+    known = set()
+    unique_hashes = list({h for h in hashes if h is not None})
+    with _lock:
+        for i in range(0, len(unique_hashes), LOOKUP_CHUNK_SIZE):
+            chunk = unique_hashes[i:i + LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(f"SELECT link_hash FROM seen_links WHERE link_hash IN ({placeholders})", chunk)
+            known.update(row[0] for row in rows)
+
+    new_jobs = []
+    for job, h in zip(jobs, hashes):
+        if h is None:
+            continue
+        stats = _stats[job.get("source")]
+        if h in known:
+            stats["duplicate"] += 1
+        else:
+            known.add(h)  # Later copies of the same link in this batch are duplicates
+            stats["new"] += 1
+            new_jobs.append(job)
+    return new_jobs
+
+def mark_seen(links):
+    """Adds links to the index once they've been saved to the database."""
+    conn = _get_conn()
+    with _lock:
+        conn.executemany("INSERT OR IGNORE INTO seen_links (link_hash) VALUES (?)",
+                         [(link_hash(link),) for link in links if link])
+        conn.commit()
+
+def reset():
+    """Empties the index and this run's stats (the offline benchmarks start from scratch)."""
+    conn = _get_conn()
+    conn.execute("DELETE FROM seen_links")
+    conn.execute("DELETE FROM meta")
+    conn.commit()
+    _stats.clear()
+
+def new_count(source_name):
+    """New jobs counted for a source so far this run."""
+    return _stats[source_name]["new"] if source_name in _stats else 0
+
+def stats():
+    """Copy of this run's per-source new/duplicate counts."""
+    return {source: dict(counts) for source, counts in _stats.items()}
+
+def report():
+    """Prints the per-source new/duplicate counts gathered during this run."""
+    if not _stats:
+        return
+    print("\n📊 New vs. duplicate jobs per source:")
+    for source, stats in sorted(_stats.items(), key=lambda item: -item[1]["new"]):
+        print(f"  {source}: {stats['new']} new, {stats['duplicate']} duplicates")
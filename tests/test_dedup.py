@@ -0,0 +1,36 @@
+# tests/test_dedup.py
+
+from dedup import NearDuplicateIndex, collapse_duplicates
+
+BOILERPLATE = ("We are a fast growing fintech company building payment infrastructure for thousands of "
+               "merchants. You will design, build and run backend services in Python and Go, work closely "
+               "with product and own features end to end. We offer equity, remote flexibility and a "
+               "generous learning budget.")
+
+def job(title, link, source):
+    return {"title": title, "link": link, "company": "Acme", "description": BOILERPLATE, "source": source}
+
+def test_same_source_postings_sharing_boilerplate_are_kept():
+    jobs = [
+        job("Senior Backend Engineer - London", "https://board.example/jobs/1", "Board"),
+        job("Senior Backend Engineer - Berlin", "https://board.example/jobs/2", "Board"),
+    ]
+    kept = collapse_duplicates(jobs, NearDuplicateIndex())
+    assert [j["link"] for j in kept] == ["https://board.example/jobs/1", "https://board.example/jobs/2"]
+
+def test_near_copy_from_another_source_is_collapsed():
+    jobs = [
+        job("Senior Backend Engineer - London", "https://board.example/jobs/1", "Board"),
+        job("Senior Backend Engineer - London", "https://other.example/p/77", "Other"),
+    ]
+    kept = collapse_duplicates(jobs, NearDuplicateIndex())
+    assert [j["link"] for j in kept] == ["https://board.example/jobs/1"]
+    assert kept[0]["sources"] == ["Board", "Other"]
+
+def test_same_url_is_collapsed_and_link_kept_as_scraped():
+    jobs = [
+        job("Backend Engineer", "https://www.board.example/jobs/1/?utm_source=feed", "Board"),
+        job("Backend Engineer", "https://board.example/jobs/1", "Board"),
+    ]
+    kept = collapse_duplicates(jobs, NearDuplicateIndex())
+    assert [j["link"] for j in kept] == ["https://www.board.example/jobs/1/?utm_source=feed"]
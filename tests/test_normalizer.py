@@ -0,0 +1,10 @@
+# tests/test_normalizer.py
+
+from normalizer import strip_html
+
+def test_strip_html_recovers_from_broken_markup():
+    assert strip_html("<p>Build <b>APIs</p> x < y &bogus;") == "Build APIs x < y &bogus;"
+
+def test_strip_html_keeps_unknown_marked_sections_as_text():
+    # HTMLParser raises on these (and so does BeautifulSoup's html.parser).
+    assert strip_html("<p>Apply now</p><![CDAT truncated") == "Apply now <![CDAT truncated"
@@ -0,0 +1,44 @@
+# tests/test_utils.py
+
+from utils import classify_job, classify_jobs
+
+def test_classify_jobs_keeps_offsets_when_lowercasing_changes_length():
+    # "İ".lower() is two characters, which used to shift every later match
+    # onto the wrong job.
+    jobs = [
+        {"title": "İstanbul " + "İ" * 30 + " Backend Engineer"},
+        {"title": "Graphic Designer"},
+        {"title": "Sales Intern", "description": "Work from home"},
+    ]
+    assert classify_jobs(jobs) == [
+        ("Engineering", "Not Specified", "Global"),
+        ("Design/Creative", "Not Specified", "Global"),
+        ("Sales/Support", "Internship", "Remote"),
+    ]
+
+def test_first_listed_category_wins_regardless_of_word_order():
+    jobs = [
+        {"title": "Data Engineer"},
+        {"title": "Junior Team Lead"},
+        {"title": "Analyst", "description": "Based in India, fully remote"},
+    ]
+    expected = [
+        ("Engineering", "Not Specified", "Global"),
+        ("Product/Management", "Senior", "Global"),
+        ("Data Science", "Not Specified", "Remote"),
+    ]
+    assert classify_jobs(jobs) == expected
+    assert [classify_job(job["title"], job.get("description", "")) for job in jobs] == expected
+
+def test_abbreviations_match_without_a_space():
+    assert classify_job("Sr.Engineer")[1] == "Senior"
+    assert classify_job("Jr.Developer")[1] == "Junior/Entry-Level"
+    assert classify_jobs([{"title": "Sr.Engineer"}, {"title": "Jr. Developer"}]) == [
+        ("Engineering", "Senior", "Global"),
+        ("Engineering", "Junior/Entry-Level", "Global"),
+    ]
+
+def test_the_word_in_no_longer_means_india():
+    # "in" was dropped from the India keywords: it matched almost every description.
+    assert classify_job("Backend Engineer", "Experience in Python and Go")[2] == "Global"
+    assert classify_job("Backend Engineer", "Our office is in Pune")[2] == "India"
@@ -2,6 +2,9 @@
 
 # This file contains the "AI" logic to classify jobs.
 
+import bisect
+import re
+
 ROLE_KEYWORDS = {
     "Engineering": ["engineer", "developer", "dev", "software", "backend", "frontend", "full-stack", "programmer", "code", "architect"],
     "Data Science": ["data", "scientist", "analyst", "analytics", "machine learning", "ml", "ai", "intelligence"],
@@ -20,36 +23,117 @@ EXPERIENCE_KEYWORDS = {
 }
 
 # --- NEW: Keywords for Location Classification ---
+# Note: the two-letter code "in" used to live here, but even as a whole word
+# it matches almost every English description ("experience in ...").
 LOCATION_KEYWORDS = {
     "Remote": ["remote", "wfh", "work from home", "anywhere"],
-    "India": ["india", "bangalore", "bengaluru", "pune", "mumbai", "hyderabad", "chennai", "delhi", "gurgaon", "noida", "in"]
+    "India": ["india", "bangalore", "bengaluru", "pune", "mumbai", "hyderabad", "chennai", "delhi", "gurgaon", "noida"]
 }
 
+# --- NEW: Compiled single-pass classifier ---
+# All three keyword maps are compiled once into a single regex. Every keyword
+# knows which labels it votes for, and for each dimension the winning label is
+# the one listed first in its dict, exactly like the old category-by-category
+# loops. Keywords only match as whole words (plurals allowed), so "ai" no
+# longer hits "email". A keyword that ends in punctuation ("sr.", "jr.") ends
+# its own word, so "Sr.Engineer" still counts as Senior.
+
+_DIMENSIONS = (ROLE_KEYWORDS, EXPERIENCE_KEYWORDS, LOCATION_KEYWORDS)
+_DEFAULT_LABELS = ("Other", "Not Specified", "Global")
+_LOCATION_DIM = 2
+_WORD_END = r"s?(?!\w)"
+
+def _compile_keywords(dimensions):
+    # keyword -> {dimension index: best (lowest) category priority}
+    votes = {}
+    for dim, categories in enumerate(dimensions):
+        for priority, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                best = votes.setdefault(keyword.lower(), {})
+                best[dim] = min(best.get(dim, priority), priority)
+
+    # The scan reports one keyword per position (the longest). If a shorter
+    # keyword would also have matched there ("mid" inside "mid-level"), fold
+    # its votes into the longer one so nothing is lost.
+    for keyword, best in votes.items():
+        for other, other_best in votes.items():
+            if other != keyword and re.match(re.escape(other) + _WORD_END, keyword):
+                for dim, priority in other_best.items():
+                    best[dim] = min(best.get(dim, priority), priority)
+
+    alternation = "|".join(re.escape(k) + (f"(?={_WORD_END})" if k[-1].isalnum() else "")
+                           for k in sorted(votes, key=len, reverse=True))
+    # The lookahead lets matches overlap, so a multi-word keyword can't hide
+    # another keyword that starts later inside it.
+    pattern = re.compile(rf"(?<!\w)(?=({alternation}))")
+    return pattern, {keyword: tuple(best.items()) for keyword, best in votes.items()}
+
+_KEYWORD_PATTERN, _KEYWORD_VOTES = _compile_keywords(_DIMENSIONS)
+_LABELS = tuple(tuple(categories) for categories in _DIMENSIONS)
+
+def _vote(best, keyword, only_dim=None):
+    for dim, priority in _KEYWORD_VOTES[keyword]:
+        if only_dim is not None and dim != only_dim:
+            continue
+        if best[dim] is None or priority < best[dim]:
+            best[dim] = priority
+
+def _labels_from(best):
+    return tuple(
+        _LABELS[dim][best[dim]] if best[dim] is not None else _DEFAULT_LABELS[dim]
+        for dim in range(len(_DIMENSIONS))
+    )
+
+def classify_job(title, description=""):
+    """
+    Returns (job_role, experience_level, location) for a single job in one scan.
+    Role and experience come from the title; location looks at both.
+    """
+    best = [None, None, None]
+    for match in _KEYWORD_PATTERN.finditer((title or "").lower()):
+        _vote(best, match.group(1))
+    if description:
+        for match in _KEYWORD_PATTERN.finditer(description.lower()):
+            _vote(best, match.group(1), only_dim=_LOCATION_DIM)
+    return _labels_from(best)
+
+def classify_jobs(jobs):
+    """
+    Batch version of classify_job for a list of job dicts ('title' and an
+    optional 'description'). All titles go through one regex scan and all
+    descriptions through another, instead of several scans per job.
+    Returns a list of (job_role, experience_level, location) tuples.
+    """
+    best = [[None, None, None] for _ in jobs]
+
+    def scan(texts, only_dim=None):
+        # Jobs are joined with newlines, which keep the word boundaries intact;
+        # each match is mapped back to its job through the start offsets.
+        # Offsets come from the lower-cased texts: lowering can change a
+        # string's length ("İ" becomes two characters).
+        texts = [text.lower() for text in texts]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        for match in _KEYWORD_PATTERN.finditer("\n".join(texts)):
+            job_best = best[bisect.bisect_right(starts, match.start()) - 1]
+            _vote(job_best, match.group(1), only_dim)
+
+    scan([job.get("title") or "" for job in jobs])
+    scan([job.get("description") or "" for job in jobs], only_dim=_LOCATION_DIM)
+    return [_labels_from(job_best) for job_best in best]
+
 
 def classify_role(title):
-    title_lower = title.lower()
-    for role, keywords in ROLE_KEYWORDS.items():
-        if any(keyword in title_lower for keyword in keywords):
-            return role
-    return "Other"
+    return classify_job(title)[0]
 
 def classify_experience(title):
-    title_lower = title.lower()
-    for level, keywords in EXPERIENCE_KEYWORDS.items():
-        if any(keyword in title_lower for keyword in keywords):
-            return level
-    return "Not Specified"
+    return classify_job(title)[1]
 
 # --- NEW: The Location Classification Function ---
 def classify_location(title, description):
     """Classifies the location based on keywords in the title and description."""
-    text_to_search = (title + " " + description).lower()
-    
-    # Prioritize "Remote" as it's the most specific
-    if any(keyword in text_to_search for keyword in LOCATION_KEYWORDS["Remote"]):
-        return "Remote"
-        
-    if any(keyword in text_to_search for keyword in LOCATION_KEYWORDS["India"]):
-        return "India"
-        
-    return "Global"
\ No newline at end of file
+    # "Remote" is listed first in LOCATION_KEYWORDS, so it still wins over "India".
+    return classify_job(title, description)[2]
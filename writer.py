@@ -0,0 +1,241 @@
+# writer.py
+
+# Write-behind batching for the 'jobs' table. During an engine run save_jobs
+# only queues records; a background thread gathers them from every source
+# into chunks bounded by WRITE_BATCH_ROWS and WRITE_BATCH_BYTES and upserts
+# them while the scrapers keep working. Transient errors are retried with
+# exponential backoff; a chunk that still fails is appended to a local
+# journal (JSON lines) and replayed at the start of the next run, so a
+# database hiccup never loses a scrape.
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+import httpx
+import metrics
+import seen_index
+from config import WRITE_BATCH_ROWS, WRITE_BATCH_BYTES, WRITE_FLUSH_SECONDS, WRITE_MAX_RETRIES, WRITE_JOURNAL_PATH
+
+RETRY_BASE_DELAY = 0.5     # Seconds; doubled on every retry, plus jitter
+MAX_JOURNAL_REPLAYS = 5    # Runs a journaled chunk is retried before it's set aside
+DEAD_LETTER_PATH = WRITE_JOURNAL_PATH.replace(".jsonl", ".failed.jsonl")
+# Postgres error classes that won't go away on retry: data exceptions,
+# integrity constraint violations, syntax errors / undefined columns.
+_PERMANENT_PG_CLASSES = ("22", "23", "42")
+_STOP = object()
+
+_client = None
+_queue = None
+_thread = None
+_queued_links = set()  # Links already queued this run; a chunk can't upsert a link twice
+_links_lock = threading.Lock()
+
+def record_size(record):
+    """Approximate size of a record on the wire."""
+    return len(json.dumps(record, default=str))
+
+def chunked(records, max_rows=WRITE_BATCH_ROWS, max_bytes=WRITE_BATCH_BYTES):
+    """Splits records into lists of at most max_rows records and (roughly) max_bytes."""
+    chunk, size = [], 0
+    for record in records:
+        record_bytes = record_size(record)
+        if chunk and (len(chunk) >= max_rows or size + record_bytes > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(record)
+        size += record_bytes
+    if chunk:
+        yield chunk
+
+def is_transient(error):
+    """True for errors worth retrying: network trouble, timeouts, 5xx, 408 and 429."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status in (408, 429)
+    if isinstance(error, httpx.TransportError):
+        return True
+    code = str(getattr(error, "code", "") or "")
+    return not code.startswith(_PERMANENT_PG_CLASSES)
+
+# --- Sending one chunk ---
+def _record_success(chunk, seconds):
+    seen_index.mark_seen([record["link"] for record in chunk])
+    by_source = {}
+    for record in chunk:
+        by_source[record.get("source")] = by_source.get(record.get("source"), 0) + 1
+    for source_name, rows in by_source.items():
+        metrics.add_time(source_name, "db_write", seconds * rows / len(chunk))
+        metrics.count(source_name, "rows_written", rows)
+    metrics.count(metrics.ENGINE, "write_batches")
+    print(f"  -> 💾 Wrote a batch of {len(chunk)} jobs from {len(by_source)} sources.")
+
+def send(client, chunk, replays=0):
+    """
+    Upserts one chunk, retrying transient errors with backoff. A chunk that
+    hits a permanent error is split in half until the bad rows are isolated.
+    Whatever can't be written goes to the journal. Returns False only if
+    records were lost (i.e. the journal couldn't be written either).
+    """
+    for attempt in range(WRITE_MAX_RETRIES + 1):
+        started = time.perf_counter()
+        try:
+            client.table('jobs').upsert(chunk, on_conflict='link').execute()
+        except Exception as e:
+            if not is_transient(e):
+                if len(chunk) > 1:
+                    middle = len(chunk) // 2
+                    first_ok = send(client, chunk[:middle], replays)
+                    second_ok = send(client, chunk[middle:], replays)
+                    return first_ok and second_ok
+                return spill(chunk, e, replays)
+            if attempt == WRITE_MAX_RETRIES:
+                return spill(chunk, e, replays)
+            metrics.count(metrics.ENGINE, "write_retries")
+            delay = RETRY_BASE_DELAY * 2 ** attempt
+            print(f"  [Warning] Batch write failed ({e}); retrying in {delay:.1f}s...")
+            time.sleep(delay + random.uniform(0, delay / 2))
+            continue
+        _record_success(chunk, time.perf_counter() - started)
+        return True
+
+# --- Journal of chunks that couldn't be written ---
+def spill(chunk, error, replays=0):
+    """Appends a failed chunk to the journal (or, after too many replays, the dead-letter file)."""
+    path = WRITE_JOURNAL_PATH if replays < MAX_JOURNAL_REPLAYS else DEAD_LETTER_PATH
+    entry = {
+        "failed_at": datetime.now(timezone.utc).isoformat(),
+        "error": str(error)[:300],
+        "replays": replays,
+        "records": chunk,
+    }
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    except OSError as e:
+        print(f"  [ERROR] Could not journal {len(chunk)} unsaved jobs: {e}")
+        metrics.error(metrics.ENGINE, f"journal: {e}")
+        return False
+    metrics.count(metrics.ENGINE, "spilled_rows", len(chunk))
+    print(f"  [ERROR] Could not save {len(chunk)} jobs ({error}); kept them in {path} for the next run.")
+    return True
+
+def _set_aside(line, error):
+    """Moves an unreadable journal line to the dead-letter file as it is."""
+    try:
+        os.makedirs(os.path.dirname(DEAD_LETTER_PATH) or ".", exist_ok=True)
+        with open(DEAD_LETTER_PATH, "a", encoding="utf-8") as f:
+            f.write(line if line.endswith("\n") else line + "\n")
+    except OSError as e:
+        print(f"  [ERROR] Could not set aside an unreadable journal line: {e}")
+        metrics.error(metrics.ENGINE, f"journal: {e}")
+        return
+    print(f"  [Warning] Skipped an unreadable line in the write journal ({error}); kept it in {DEAD_LETTER_PATH}.")
+
+def replay_journal(client):
+    """Re-sends every journaled chunk. Chunks that fail again are journaled again."""
+    replaying_path = WRITE_JOURNAL_PATH + ".replaying"
+    # A leftover .replaying file means the last replay was interrupted.
+    if os.path.exists(WRITE_JOURNAL_PATH) and not os.path.exists(replaying_path):
+        os.replace(WRITE_JOURNAL_PATH, replaying_path)
+    if not os.path.exists(replaying_path):
+        return
+
+    entries = []
+    with open(replaying_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                # A line cut short (e.g. the runner was killed mid-spill) can't
+                # be replayed; set it aside instead of failing every run.
+                _set_aside(line, e)
+    rows = sum(len(entry["records"]) for entry in entries)
+    print(f"  -> Replaying {rows} jobs from the write journal...")
+    for entry in entries:
+        send(client, entry["records"], replays=entry.get("replays", 0) + 1)
+    metrics.count(metrics.ENGINE, "replayed_rows", rows)
+    os.remove(replaying_path)
+
+def write_now(client, records):
+    """Writes records in bounded chunks on the calling thread."""
+    all_kept = True
+    for chunk in chunked(records):
+        all_kept = send(client, chunk) and all_kept
+    return all_kept
+
+# --- Background writer ---
+def _flush(chunk):
+    try:
+        send(_client, chunk)
+    except Exception as e:
+        # Never let the worker die: producers would block on a full queue.
+        spill(chunk, e)
+
+def _worker():
+    chunk, size = [], 0
+    while True:
+        try:
+            record = _queue.get(timeout=WRITE_FLUSH_SECONDS)
+        except queue.Empty:
+            # Nothing new for a while: send what we have instead of waiting
+            # for a full chunk, so writes keep overlapping the scrape.
+            if chunk:
+                _flush(chunk)
+                chunk, size = [], 0
+            continue
+
+        if record is _STOP:
+            if chunk:
+                _flush(chunk)
+            return
+
+        record_bytes = record_size(record)
+        if chunk and size + record_bytes > WRITE_BATCH_BYTES:
+            _flush(chunk)
+            chunk, size = [], 0
+        chunk.append(record)
+        size += record_bytes
+        if len(chunk) >= WRITE_BATCH_ROWS:
+            _flush(chunk)
+            chunk, size = [], 0
+
+def start(client):
+    """Starts the background writer; save_jobs queues records until close()."""
+    global _client, _queue, _thread
+    _client = client
+    # Bounded, so a slow database holds the scrapers back instead of letting
+    # queued records pile up in memory.
+    _queue = queue.Queue(maxsize=WRITE_BATCH_ROWS * 4)
+    _queued_links.clear()
+    _thread = threading.Thread(target=_worker, name="jobscout-writer", daemon=True)
+    _thread.start()
+
+def is_running():
+    return _thread is not None
+
+def submit(records):
+    """Queues records for the background writer. Returns how many were queued."""
+    with _links_lock:
+        fresh = [record for record in records if record["link"] not in _queued_links]
+        _queued_links.update(record["link"] for record in fresh)
+    for record in fresh:
+        _queue.put(record)
+    return len(fresh)
+
+def close():
+    """Sends whatever is still queued and stops the background writer."""
+    global _client, _queue, _thread
+    if _thread is None:
+        return
+    _queue.put(_STOP)
+    _thread.join()
+    _client, _queue, _thread = None, None, None